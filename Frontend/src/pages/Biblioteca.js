@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { FaSync } from 'react-icons/fa';
 import GameCard from '../components/GameCard';
-import api from '../services/api';
+import api, { fetchGamesPage } from '../services/api';
 import { toast } from 'react-toastify'
 
 const Biblioteca = () => {
@@ -9,6 +9,9 @@ const Biblioteca = () => {
   const [loading, setLoading] = useState(true);
   const [userData, setUserData] = useState(null);
   const [syncing, setSyncing] = useState(false);
+  const [syncProgress, setSyncProgress] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   
   const getGameImage = (game) => {
     if (!game.appid) {
@@ -18,6 +21,27 @@ const Biblioteca = () => {
     return `https://cdn.akamai.steamstatic.com/steam/apps/${game.appid}/capsule_616x353.jpg`;
   };
 
+  const loadFirstPage = async (uid) => {
+    const page = await fetchGamesPage(uid);
+    setGames(page.games);
+    setNextCursor(page.next_cursor);
+  };
+
+  const loadMore = async () => {
+    if (!nextCursor || !userData) return;
+    setLoadingMore(true);
+
+    try {
+      const page = await fetchGamesPage(userData.id, { start_after: nextCursor });
+      setGames((current) => [...current, ...page.games]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Erro ao carregar mais jogos:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchData = async () => {
     try {
       const authResponse = await api.get('/auth/me');
@@ -26,8 +50,7 @@ const Biblioteca = () => {
       const userResponse = await api.get(`/users/${firebaseUid}`);
       setUserData(userResponse.data);
 
-      const gamesResponse = await api.get(`/games/${firebaseUid}`);
-      setGames(gamesResponse.data);
+      await loadFirstPage(firebaseUid);
 
     } catch (error) {
       console.error("Erro ao carregar:", error);
@@ -40,22 +63,38 @@ const Biblioteca = () => {
     fetchData();
   }, []);
 
+  // Acompanha o job de sincronização até terminar
+  const waitForSyncJob = async (jobId) => {
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+      const { data } = await api.get(`/steam/sync/${jobId}`);
+
+      if (data.status === 'done') return data;
+      if (data.status === 'failed') throw new Error(data.error || 'Falha na sincronização');
+
+      setSyncProgress(data.total ? `${data.processed}/${data.total}` : null);
+    }
+  };
+
   const handleSync = async () => {
     if (!userData) return;
     setSyncing(true);
 
     try {
-      await api.post(`/steam/sync/${userData.id}/${userData.steam_id}`);
+      const syncResponse = await api.post(`/steam/sync/${userData.id}/${userData.steam_id}`);
       toast("Iniciando sincronização. Pode levar algum tempo atualizar sua biblioteca.");
-      
-      const gamesResponse = await api.get(`/games/${userData.id}`);
-      setGames(gamesResponse.data);
+
+      await waitForSyncJob(syncResponse.data.job_id);
+
+      await loadFirstPage(userData.id);
+      toast.success("Biblioteca sincronizada!");
 
     } catch (error) {
       console.error("Erro no sync:", error);
       toast.error("Erro ao sincronizar. Tente novamente.");
     } finally {
       setSyncing(false);
+      setSyncProgress(null);
     }
   };
 
@@ -71,7 +110,7 @@ const Biblioteca = () => {
           disabled={syncing || !userData}
         >
           {syncing ? <span className="spinner-border spinner-border-sm"></span> : <FaSync />}
-          {syncing ? ' Sincronizando...' : ' Sincronizar Steam'}
+          {syncing ? ` Sincronizando${syncProgress ? ` (${syncProgress})` : '...'}` : ' Sincronizar Steam'}
         </button>
       </div>
 
@@ -96,6 +135,14 @@ const Biblioteca = () => {
           ))}
         </div>
       )}
+
+      {nextCursor && (
+        <div className="text-center mt-4">
+          <button className="btn btn-outline-light" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? <span className="spinner-border spinner-border-sm"></span> : 'Carregar mais'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { FaBullseye, FaPlus, FaCalendarAlt, FaGamepad, FaTrash } from 'react-icons/fa'; 
 import { toast } from 'react-toastify';
-import api from '../services/api';
+import api, { fetchAllGames } from '../services/api';
 
 const Metas = () => {
   const [goals, setGoals] = useState([]);
@@ -17,8 +17,7 @@ const Metas = () => {
         
         const response = await api.get(`/metas/${uid}`);
         setGoals(response.data);
-        const gamesResponse = await api.get(`/games/${uid}`);
-        const sortedGames = gamesResponse.data.sort((a, b) => a.name.localeCompare(b.name));
+        const sortedGames = await fetchAllGames(uid, { sort: 'name' });
         setLibraryGames(sortedGames);
 
       } catch (error) {
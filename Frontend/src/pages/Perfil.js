@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { FaSteam, FaEdit, FaGamepad, FaTrophy, FaClock, FaBan, FaPlayCircle, FaPauseCircle } from 'react-icons/fa';
-import api from '../services/api';
+import api, { fetchAllGames } from '../services/api';
 
 const Perfil = ({ onLogout }) => {
   const [loading, setLoading] = useState(true);
@@ -30,8 +30,8 @@ const Perfil = ({ onLogout }) => {
         const userResponse = await api.get(`/users/${firebaseUid}`);
         setProfile(userResponse.data);
 
-        const gamesResponse = await api.get(`/games/${firebaseUid}`);
-        calculateStats(gamesResponse.data);
+        const games = await fetchAllGames(firebaseUid);
+        calculateStats(games);
 
       } catch (error) {
         console.error("Erro ao carregar perfil:", error);
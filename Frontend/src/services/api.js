@@ -30,4 +30,24 @@ api.interceptors.response.use(
   }
 );
 
+// Página da biblioteca: { games, next_cursor }
+export const fetchGamesPage = async (uid, params = {}) => {
+  const { data } = await api.get(`/games/${uid}`, { params });
+  return data;
+};
+
+// Percorre todas as páginas da biblioteca (telas que precisam da lista inteira)
+export const fetchAllGames = async (uid, params = {}) => {
+  const games = [];
+  let cursor = null;
+
+  do {
+    const page = await fetchGamesPage(uid, { ...params, limit: 200, start_after: cursor || undefined });
+    games.push(...page.games);
+    cursor = page.next_cursor;
+  } while (cursor);
+
+  return games;
+};
+
 export default api;
\ No newline at end of file
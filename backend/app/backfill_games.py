@@ -0,0 +1,38 @@
+# app/backfill_games.py
+# Migração dos jogos gravados antes da listagem paginada: preenche `generos`
+# (filtro por gênero) e os campos usados na ordenação em documentos antigos
+# e em jogos manuais que não os têm, e remove os campos pesados da loja que
+# passaram a viver em apps/{appid}. Pode rodar mais de uma vez.
+#
+# Uso:   python -m app.backfill_games [--user USER_ID]
+import argparse
+from typing import Dict, List
+
+from .models import game_model, user_model
+
+
+def backfill_all_users(user_ids: List[str] = None) -> Dict[str, int]:
+    if user_ids is None:
+        user_ids = [user["id"] for user in user_model.get_all_users()]
+
+    updated: Dict[str, int] = {}
+    for user_id in user_ids:
+        try:
+            updated[user_id] = game_model.backfill_list_fields(user_id)
+            updated[user_id] += game_model.remove_heavy_store_fields(user_id)
+        except Exception as e:
+            print(f"[Migração] Erro em {user_id}: {e}")
+            continue
+        if updated[user_id]:
+            print(f"[Migração] {user_id}: {updated[user_id]} atualizações.")
+
+    print(f"[Migração] Concluída: {sum(updated.values())} atualizações em {len(updated)} usuários.")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preenche os campos da listagem nos jogos antigos.")
+    parser.add_argument("--user", action="append", default=None, help="só este usuário (pode repetir)")
+    args = parser.parse_args()
+
+    backfill_all_users(args.user)
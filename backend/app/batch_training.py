@@ -0,0 +1,134 @@
+# app/batch_training.py
+# Treino em lote dos modelos de todos os usuários (ex.: depois de mudar as
+# features ou o modelo). A leitura no Firestore roda em threads, com limite
+# de concorrência; os treinos rodam num pool de processos do tamanho dos
+# núcleos disponíveis. Cada modelo é gravado de forma atômica.
+#
+# Uso:   python -m app.batch_training [--full] [--workers N] [--n-jobs N]
+#        python -m app.batch_training --benchmark N   (compara as engines)
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List
+
+from .config import settings
+from .models import game_model, user_model
+from .services import ai_services
+
+# "spawn" evita herdar conexões gRPC do Firebase do processo pai via fork
+_mp_context = multiprocessing.get_context("spawn")
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def plan_workers(workers: int = None, n_jobs: int = None) -> tuple:
+    """
+    (processos, n_jobs por treino). Por padrão um processo por núcleo e uma
+    thread por treino: muitos modelos pequenos rendem mais em paralelo do
+    que um modelo por vez usando todos os núcleos.
+    """
+    cpus = available_cpus()
+    workers = workers or settings.ai_batch_workers or cpus
+    n_jobs = n_jobs or max(1, cpus // workers)
+    return workers, n_jobs
+
+
+def train_all_users(full: bool = False, workers: int = None, n_jobs: int = None,
+                    user_ids: List[str] = None, pool=None) -> Dict:
+    workers, n_jobs = plan_workers(workers, n_jobs)
+    if user_ids is None:
+        user_ids = [user["id"] for user in user_model.get_all_users()]
+
+    print(f"[Treino em lote] {len(user_ids)} usuários, {workers} processos, n_jobs={n_jobs}.")
+    started = time.monotonic()
+
+    # Bibliotecas lidas e ainda não treinadas ficam limitadas (memória constante)
+    in_memory = threading.BoundedSemaphore(workers * 2)
+
+    def fetch_and_submit(user_id: str):
+        in_memory.acquire()
+        try:
+            games = game_model.get_user_games(user_id, projection="features")
+            future = pool.submit(ai_services.train_from_games, user_id, games, full, n_jobs)
+        except Exception as e:
+            in_memory.release()
+            return {"status": "error", "message": str(e)}
+
+        future.add_done_callback(lambda _: in_memory.release())
+        return future
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context)
+
+    try:
+        with ThreadPoolExecutor(max_workers=settings.ai_batch_fetch_concurrency,
+                                thread_name_prefix="batch-fetch") as fetchers:
+            submitted = dict(zip(user_ids, fetchers.map(fetch_and_submit, user_ids)))
+
+        results: Dict[str, Dict] = {}
+        for user_id, item in submitted.items():
+            if isinstance(item, dict):
+                results[user_id] = item
+                continue
+            try:
+                results[user_id] = item.result()
+            except Exception as e:
+                results[user_id] = {"status": "error", "message": str(e)}
+    finally:
+        if own_pool:
+            pool.shutdown(wait=True)
+
+    summary: Dict[str, int] = {}
+    for result in results.values():
+        key = result.get("mode") or result.get("status")
+        summary[key] = summary.get(key, 0) + 1
+
+    elapsed = round(time.monotonic() - started, 1)
+    print(f"[Treino em lote] Concluído em {elapsed}s: {summary}")
+    return {"elapsed_seconds": elapsed, "summary": summary, "results": results}
+
+
+def benchmark_engines(max_users: int) -> Dict[str, Dict]:
+    """Média, por engine, de tempo de treino, latência de predição e tamanho do modelo."""
+    totals: Dict[str, Dict[str, float]] = {}
+    measured = 0
+
+    for user in user_model.get_all_users()[:max_users]:
+        games = game_model.get_user_games(user["id"], projection="features")
+        report = ai_services.benchmark_engines(games)
+        if not report:
+            continue
+        measured += 1
+        for engine, metrics in report.items():
+            engine_totals = totals.setdefault(engine, {})
+            for key, value in metrics.items():
+                engine_totals[key] = engine_totals.get(key, 0) + value
+
+    return {
+        engine: {key: round(value / measured, 3) for key, value in metrics.items()}
+        for engine, metrics in totals.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treina os modelos de todos os usuários.")
+    parser.add_argument("--full", action="store_true", help="ignora os modelos salvos e treina do zero")
+    parser.add_argument("--workers", type=int, default=None, help="processos de treino (padrão: núcleos)")
+    parser.add_argument("--n-jobs", type=int, default=None, help="threads por treino")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N",
+                        help="só compara as engines nas bibliotecas de N usuários, sem salvar")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(benchmark_engines(args.benchmark))
+    else:
+        train_all_users(full=args.full, workers=args.workers, n_jobs=args.n_jobs)
@@ -7,6 +7,108 @@ class Settings(BaseSettings):
     firebase_web_api_key: str = ""
     steam_api_key: str = ""
 
+    # Limite de requisições simultâneas por host durante a sincronização
+    steam_store_max_concurrency: int = 4
+    steam_api_max_concurrency: int = 16
+
+    # Cache compartilhado dos dados da loja (appdetails)
+    store_cache_ttl_seconds: int = 24 * 60 * 60
+    store_cache_max_entries: int = 5000
+
+    # Cache compartilhado dos schemas de conquistas (GetSchemaForGame)
+    achievement_cache_ttl_seconds: int = 7 * 24 * 60 * 60
+    achievement_cache_max_entries: int = 20000
+
+    # Cliente Steam: rate limit (token bucket por endpoint), retry/backoff e circuit breaker.
+    # Buckets e breakers ficam no SQLite local (local_db_path): os limites valem
+    # para o servidor inteiro, somando web e processos de sincronização.
+    steam_store_requests_per_second: float = 1.0
+    steam_store_burst: int = 10
+    steam_api_requests_per_second: float = 20.0
+    steam_api_burst: int = 40
+    steam_max_retries: int = 4
+    steam_backoff_base_seconds: float = 0.5
+    steam_backoff_max_seconds: float = 30.0
+    steam_breaker_failure_threshold: int = 10
+    steam_breaker_reset_seconds: float = 60.0
+    # Validação do Steam ID no cadastro: uma tentativa só, sem backoff
+    steam_validate_timeout_seconds: float = 5.0
+
+    # Pool de conexões HTTP compartilhado (keep-alive / HTTP/2)
+    http_enable_http2: bool = True
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_default_timeout_seconds: float = 10.0
+
+    # Banco local (SQLite): fila de sincronizações e versões das bibliotecas
+    local_db_path: str = "app/local_data/gametrack.sqlite3"
+    sync_worker_embedded: bool = True
+    sync_worker_processes: int = 2
+    # Tempo para o worker embutido terminar os jobs em andamento ao desligar
+    sync_worker_shutdown_seconds: float = 60.0
+    sync_job_poll_seconds: float = 1.0
+    sync_job_heartbeat_seconds: float = 15.0
+    sync_job_stale_seconds: float = 120.0
+    sync_job_max_attempts: int = 3
+
+    # Executores da IA (recomendação em threads, treino em processos)
+    ai_io_workers: int = 4
+    ai_io_max_pending: int = 16
+    ai_training_processes: int = 1
+    ai_training_max_pending: int = 8
+    ai_request_timeout_seconds: float = 30.0
+    ai_training_timeout_seconds: float = 120.0
+
+    # Modelo da recomendação: "random_forest" ou "xgboost_hist" (ai_services.ENGINES).
+    # Trocar a engine faz o próximo treino de cada usuário ser completo.
+    ai_model_engine: str = "random_forest"
+
+    # Cache em memória dos modelos carregados (por usuário)
+    model_cache_max_entries: int = 256
+    model_cache_max_bytes: int = 512 * 1024 * 1024
+
+    # Compressão (zlib, 0-9) dos modelos salvos: nível 3 deixa o arquivo ~5x menor
+    model_artifact_compress: int = 3
+
+    # Cache dos resultados de recomendação (invalidado pela versão da biblioteca)
+    recommendation_cache_max_entries: int = 1024
+    recommendation_cache_ttl_seconds: int = 60 * 60
+
+    # Treino incremental: árvores novas sobre o modelo salvo; modelo novo só
+    # quando o vocabulário muda, a floresta passa do limite ou muitos rótulos mudaram
+    ai_incremental_trees: int = 10
+    ai_incremental_max_changed_fraction: float = 0.1
+    ai_max_trees: int = 200
+
+    # Treino em lote de todos os usuários (python -m app.batch_training);
+    # ai_batch_workers = 0 usa um processo por núcleo disponível
+    ai_batch_workers: int = 0
+    ai_batch_fetch_concurrency: int = 8
+
+    # Retreino disparado por edições: espera a rajada acabar (debounce por
+    # usuário), junta pedidos e limita quantos treinos rodam ao mesmo tempo
+    ai_retrain_debounce_seconds: float = 30.0
+    ai_retrain_max_delay_seconds: float = 5 * 60
+    ai_retrain_max_concurrent: int = 1
+
+    # Escrita em massa no Firestore (lotes em paralelo, retry em contenção)
+    firestore_bulk_parallel_commits: int = 4
+    firestore_bulk_max_retries: int = 5
+    firestore_bulk_backoff_base_seconds: float = 0.2
+    firestore_bulk_backoff_max_seconds: float = 5.0
+    sync_write_flush_size: int = 500
+
+    # Cache de tokens Firebase já verificados (validade limitada pelo exp do token)
+    token_cache_max_entries: int = 10000
+
+    # Exportação dos dados da IA (jogos lidos e enviados em pedaços)
+    export_chunk_size: int = 500
+
+    # Listagem paginada da biblioteca
+    games_page_default_limit: int = 50
+    games_page_max_limit: int = 200
+
     model_config = ConfigDict(
         env_file=".env",
         extra="ignore"
@@ -1,9 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from . import database
 from .routers import steam_router, user_router, game_router, meta_router, recommendations_router, auth_router
+from .config import settings
+from .utils import http_client, executors
+from . import worker
+from .services import training_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pool de conexões HTTP compartilhado por todas as rotas e serviços
+    http_client.get_http_client()
+    http_client.get_async_http_client()
+
+    # Sincronizações rodam em um processo separado, fora dos workers web
+    if settings.sync_worker_embedded:
+        worker.start_embedded_worker()
+
+    yield
+
+    if settings.sync_worker_embedded:
+        worker.stop_embedded_worker()
+    training_service.retrain_scheduler.stop()
+    executors.shutdown_executors()
+    await http_client.aclose_async_http_client()
+    http_client.close_http_client()
+
 
-app = FastAPI(title="GameTrack API")
+app = FastAPI(title="GameTrack API", lifespan=lifespan)
 db = database.db
 
 origins = [
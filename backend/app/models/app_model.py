@@ -0,0 +1,110 @@
+# app/models/app_model.py
+# Coleção "apps": dados compartilhados entre todos os usuários (1 doc por appid)
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from ..database import db
+from .bulk_writer import BulkWriter
+
+APPS_COLLECTION = "apps"
+GET_ALL_CHUNK = 300
+
+# Campo do documento -> campo com o timestamp da última atualização
+STORE_FIELD = "dados_loja"
+ACHIEVEMENT_SCHEMA_FIELD = "schema_conquistas"
+
+
+def _timestamp_field(field: str) -> str:
+    return f"{field}_atualizado_em"
+
+
+def _get_field(field: str, appids: Iterable[int], max_age: Optional[float],
+               with_timestamp: bool = False) -> Dict[int, dict]:
+    appids = [int(a) for a in appids]
+    if not appids:
+        return {}
+
+    apps_ref = db.collection(APPS_COLLECTION)
+    now = time.time()
+    found = {}
+
+    for i in range(0, len(appids), GET_ALL_CHUNK):
+        refs = [apps_ref.document(str(a)) for a in appids[i:i + GET_ALL_CHUNK]]
+        for snap in db.get_all(refs):
+            if not snap.exists:
+                continue
+            data = snap.to_dict()
+            value = data.get(field)
+            updated_at = data.get(_timestamp_field(field), 0)
+            if value is None:
+                continue
+            if max_age is not None and now - updated_at > max_age:
+                continue
+            found[int(snap.id)] = (value, updated_at) if with_timestamp else value
+
+    return found
+
+
+def _save_field(field: str, entries: Dict[int, dict]) -> int:
+    if not entries:
+        return 0
+
+    apps_ref = db.collection(APPS_COLLECTION)
+    now = time.time()
+
+    # Payloads da loja são grandes: o BulkWriter também divide por tamanho
+    writer = BulkWriter(db)
+    for appid, value in entries.items():
+        writer.set(
+            apps_ref.document(str(appid)),
+            {field: value, _timestamp_field(field): now},
+            merge=True,
+        )
+
+    return writer.commit().written
+
+
+def get_store_details(appids: Iterable[int], max_age: Optional[float] = None) -> Dict[int, dict]:
+    """
+    Busca os dados da loja já persistidos para vários appids de uma vez.
+    Entradas mais antigas que max_age (segundos) são ignoradas.
+    """
+    try:
+        return _get_field(STORE_FIELD, appids, max_age)
+    except Exception as e:
+        print(f"Erro ao buscar cache de loja: {e}")
+        return {}
+
+
+def get_store_details_with_timestamp(appids: Iterable[int]) -> Dict[int, Tuple[dict, float]]:
+    """Dados da loja persistidos, de qualquer idade, com o timestamp da gravação."""
+    try:
+        return _get_field(STORE_FIELD, appids, None, with_timestamp=True)
+    except Exception as e:
+        print(f"Erro ao buscar cache de loja: {e}")
+        return {}
+
+
+def save_store_details(entries: Dict[int, dict]) -> int:
+    try:
+        return _save_field(STORE_FIELD, entries)
+    except Exception as e:
+        print(f"Erro ao salvar cache de loja: {e}")
+        return 0
+
+
+def get_achievement_schemas(appids: Iterable[int], max_age: Optional[float] = None) -> Dict[int, dict]:
+    """Schemas de conquistas ({"total", "nomes"}) persistidos por appid."""
+    try:
+        return _get_field(ACHIEVEMENT_SCHEMA_FIELD, appids, max_age)
+    except Exception as e:
+        print(f"Erro ao buscar cache de conquistas: {e}")
+        return {}
+
+
+def save_achievement_schemas(entries: Dict[int, dict]) -> int:
+    try:
+        return _save_field(ACHIEVEMENT_SCHEMA_FIELD, entries)
+    except Exception as e:
+        print(f"Erro ao salvar cache de conquistas: {e}")
+        return 0
@@ -0,0 +1,176 @@
+# app/models/bulk_writer.py
+# Escrita em massa no Firestore: lotes de até 500 operações (e poucos MiB),
+# commits em paralelo, retry em contenção e falhas reportadas por documento
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from google.api_core import exceptions as google_exceptions
+
+from ..config import settings
+
+FIRESTORE_MAX_BATCH = 500
+# O limite de uma requisição é 10 MiB; fica uma folga para o overhead do protocolo
+FIRESTORE_MAX_BATCH_BYTES = 9 * 1024 * 1024
+
+# Contenção e indisponibilidade momentânea: vale tentar o mesmo lote de novo
+RETRYABLE_ERRORS = (
+    google_exceptions.Aborted,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+)
+
+# Erros causados por um documento do lote: dividir o lote acha o culpado e
+# grava o resto. Os demais (PermissionDenied, Unauthenticated...) valem para
+# o lote inteiro e não adianta dividir.
+PER_DOCUMENT_ERRORS = (
+    google_exceptions.NotFound,
+    google_exceptions.InvalidArgument,
+    google_exceptions.FailedPrecondition,
+)
+
+
+def estimate_size(value) -> int:
+    """Tamanho aproximado de um valor no Firestore (mesma ideia da fórmula oficial)."""
+    if isinstance(value, dict):
+        return 32 + sum(len(str(k)) + 1 + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 32 + sum(estimate_size(v) for v in value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if isinstance(value, bytes):
+        return len(value)
+    return 8
+
+
+def _doc_path(ref) -> str:
+    return getattr(ref, "path", None) or getattr(ref, "id", str(ref))
+
+
+class BulkWriteResult:
+    def __init__(self):
+        self.written = 0
+        self.failures: Dict[str, str] = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def __repr__(self):
+        return f"BulkWriteResult(written={self.written}, failures={len(self.failures)})"
+
+
+class BulkWriter:
+    """
+    Acumula set/update/delete e grava tudo em commit(). As operações são
+    divididas em lotes respeitando o limite de 500 escritas e o tamanho da
+    requisição; os lotes vão em paralelo. Erros de contenção são repetidos
+    com backoff; outros erros fazem o lote (atômico) ser dividido ao meio até
+    isolar os documentos com problema, que aparecem em result.failures.
+    Não há ordem garantida entre lotes: não repita o mesmo documento.
+    """
+
+    def __init__(self, client, max_batch: int = FIRESTORE_MAX_BATCH,
+                 max_batch_bytes: int = FIRESTORE_MAX_BATCH_BYTES, parallel: int = None,
+                 max_retries: int = None):
+        self._client = client
+        self._max_batch = min(max_batch, FIRESTORE_MAX_BATCH)
+        self._max_batch_bytes = max_batch_bytes
+        self._parallel = parallel or settings.firestore_bulk_parallel_commits
+        self._max_retries = settings.firestore_bulk_max_retries if max_retries is None else max_retries
+        self._ops = []
+
+    def __len__(self):
+        return len(self._ops)
+
+    def set(self, ref, data: dict, merge: bool = False) -> None:
+        self._ops.append(("set", ref, data, merge))
+
+    def update(self, ref, data: dict) -> None:
+        self._ops.append(("update", ref, data, False))
+
+    def delete(self, ref) -> None:
+        self._ops.append(("delete", ref, None, False))
+
+    def _chunks(self) -> List[list]:
+        chunks, current, current_bytes = [], [], 0
+        for op in self._ops:
+            size = estimate_size(op[2]) + len(_doc_path(op[1]))
+            if current and (len(current) >= self._max_batch or current_bytes + size > self._max_batch_bytes):
+                chunks.append(current)
+                current, current_bytes = [], 0
+            current.append(op)
+            current_bytes += size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _build_batch(self, ops: list):
+        batch = self._client.batch()
+        for kind, ref, data, merge in ops:
+            if kind == "set":
+                batch.set(ref, data, merge=merge)
+            elif kind == "update":
+                batch.update(ref, data)
+            else:
+                batch.delete(ref)
+        return batch
+
+    def _commit_chunk(self, ops: list) -> BulkWriteResult:
+        result = BulkWriteResult()
+
+        for attempt in range(self._max_retries + 1):
+            try:
+                self._build_batch(ops).commit()
+                result.written = len(ops)
+                return result
+
+            except RETRYABLE_ERRORS as e:
+                if attempt == self._max_retries:
+                    result.failures = {_doc_path(op[1]): str(e) for op in ops}
+                    return result
+                cap = min(settings.firestore_bulk_backoff_max_seconds,
+                          settings.firestore_bulk_backoff_base_seconds * (2 ** attempt))
+                time.sleep(random.uniform(0, cap))
+
+            except PER_DOCUMENT_ERRORS as e:
+                if len(ops) == 1:
+                    result.failures = {_doc_path(ops[0][1]): str(e)}
+                    return result
+
+                # Lote é atômico: divide para gravar os bons e achar os ruins
+                middle = len(ops) // 2
+                for half in (ops[:middle], ops[middle:]):
+                    partial = self._commit_chunk(half)
+                    result.written += partial.written
+                    result.failures.update(partial.failures)
+                return result
+
+            except Exception as e:
+                result.failures = {_doc_path(op[1]): str(e) for op in ops}
+                return result
+
+        return result
+
+    def commit(self) -> BulkWriteResult:
+        chunks = self._chunks()
+        self._ops = []
+        result = BulkWriteResult()
+
+        if len(chunks) <= 1 or self._parallel <= 1:
+            partials = [self._commit_chunk(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self._parallel, len(chunks))) as pool:
+                partials = list(pool.map(self._commit_chunk, chunks))
+
+        for partial in partials:
+            result.written += partial.written
+            result.failures.update(partial.failures)
+
+        if result.failures:
+            print(f"[BulkWriter] {len(result.failures)} documentos falharam: "
+                  f"{list(result.failures.items())[:3]}")
+        return result
@@ -1,14 +1,82 @@
 # app/models/game_model.py
+from firebase_admin import firestore
+
 from ..database import db
 from ..schemas.game_schema import GameBase, GameUpdate
-from typing import List
+from .bulk_writer import BulkWriter
+from .library_version_model import bump_library_version
+from typing import Dict, List, Optional, Tuple
+
+# Campos comparados na sincronização incremental com o GetOwnedGames
+# (o nome vai junto para as metas usarem o mesmo estado sem nova leitura)
+SYNC_STATE_FIELDS = [
+    "name",
+    "playtime_forever",
+    "rtime_last_played",
+    "horas_jogadas",
+    "conquistas_totais",
+    "conquistas_obtidas",
+    "enriquecido",
+]
+FIRESTORE_MAX_IN_VALUES = 30
+
+# Campos preenchidos pela loja e pelas conquistas da Steam. Num jogo novo só
+# entram se vieram de fato (não salvamos 0/None quando a chamada falhou).
+STEAM_ENRICHED_FIELDS = {
+    "conquistas_totais", "conquistas_obtidas", "genero", "generos", "categorias",
+    "img_logo_url", "metacritic", "preco", "data_lancamento",
+}
+
+# Projeções de leitura (Firestore select): só os campos que cada caminho usa,
+# sem dados_loja e descricao_completa
+PROJECTIONS = {
+    # Treino e recomendações da IA
+    "features": [
+        "appid", "name", "status", "genero", "categorias", "playtime_forever",
+        "nota_pessoal", "metacritic", "preco.preco_final", "data_lancamento", "interesse",
+    ],
+    # Cards da biblioteca (listagem, perfil, metas)
+    "card": [
+        "appid", "name", "status", "genero", "nota_pessoal", "horas_jogadas",
+        "img_logo_url", "interesse",
+    ],
+    # Exportação dos dados da IA: campos simples do jogo + origem das features
+    "export": [
+        "appid", "name", "status", "tipo_cadastro", "interesse", "nota_pessoal",
+        "horas_jogadas", "playtime_forever", "conquistas_totais", "conquistas_obtidas",
+        "genero", "categorias", "metacritic", "preco.preco_final", "data_lancamento",
+    ],
+    # Só as tags (vocabulário de gêneros e categorias)
+    "tags": ["genero", "categorias"],
+}
+
+# Tamanho das páginas lidas em iter_user_games
+GAMES_READ_PAGE_SIZE = 500
+
+# Metadados da loja que não dependem do usuário: ficam só em apps/{appid}
+# (app_model) e são juntados no detalhe do jogo. Documentos antigos perdem
+# esses campos em qualquer sincronização que grave o jogo, e os que não mudam
+# pela migração (remove_heavy_store_fields / python -m app.backfill_games).
+HEAVY_STORE_FIELDS = [
+    "dados_loja", "descricao", "descricao_completa", "sobre", "linguas",
+    "requisitos_minimos", "requisitos_recomendados", "desenvolvedor", "publisher",
+]
+
+# Ordenações aceitas na listagem paginada (cada combinação com filtro tem
+# índice composto em firestore.indexes.json)
+LIST_SORT_FIELDS = ("name", "horas_jogadas", "status")
+
+# O Firestore deixa de fora da ordenação os documentos sem o campo ordenado:
+# todo jogo precisa destes campos para aparecer na listagem
+LIST_FIELD_DEFAULTS = {"status": "Não Iniciado", "horas_jogadas": 0}
+
 
 def sync_steam_games_batch(user_id: str, games_list: List[GameBase]):
     if not games_list:
         return 0
 
     try:
-        batch = db.batch()
+        writer = BulkWriter(db)
         games_collection_ref = db.collection("users").document(user_id).collection("games")
 
         # 1. OTIMIZAÇÃO: Busca todos os documentos de uma vez
@@ -50,25 +118,34 @@ def sync_steam_games_batch(user_id: str, games_list: List[GameBase]):
             if existe_no_banco:
                 # --- CENÁRIO: UPDATE SEGURO ---
                 
-                update_payload = game_data.model_dump()
+                # Só os campos que vieram da Steam nesta sincronização: se a Steam
+                # falhou em algum endpoint, o valor salvo é mantido (não vira 0/None)
+                update_payload = game_data.model_dump(exclude_unset=True)
                 
                 # Removemos chaves proibidas para não zerar dados do usuário
                 keys_to_remove = [k for k in update_payload if k in campos_proibidos_update]
                 for k in keys_to_remove:
                     del update_payload[k]
 
+                with_generos(update_payload)
+
+                # Payload pesado da loja sai do documento do usuário (vive em apps/{appid})
+                for field in HEAVY_STORE_FIELDS:
+                    update_payload[field] = firestore.DELETE_FIELD
+
                 # Debug opcional no primeiro item
                 if count == 0:
                     print(f"[UPDATE] Jogo: {game_data.name} | ID: {str_id}")
                     # print(f"   -> Mantendo dados do usuário. Atualizando apenas Steam.")
 
-                # batch.update só altera os campos enviados
-                batch.update(doc_ref, update_payload)
+                # update só altera os campos enviados
+                writer.update(doc_ref, update_payload)
 
             else:
                 # --- CENÁRIO: CREATE (JOGO NOVO) ---
                 
-                full_payload = game_data.model_dump()
+                missing = STEAM_ENRICHED_FIELDS - game_data.model_fields_set
+                full_payload = game_data.model_dump(exclude=set(HEAVY_STORE_FIELDS) | missing)
                 
                 # Garante valor padrão se estiver vazio
                 if "status" not in full_payload or not full_payload["status"]:
@@ -76,23 +153,68 @@ def sync_steam_games_batch(user_id: str, games_list: List[GameBase]):
                 
                 print(f"[NOVO] Criando: {game_data.name} | ID: {str_id}")
                 
-                # batch.set cria o documento do zero
-                batch.set(doc_ref, full_payload)
+                # set cria o documento do zero
+                writer.set(doc_ref, full_payload)
 
             count += 1
 
-        batch.commit()
-        print(f"Sincronização finalizada. {count} jogos processados.")
-        return count
+        result = writer.commit()
+        bump_library_version(user_id)
+        print(f"Sincronização finalizada. {result.written}/{count} jogos gravados.")
+        return result.written
 
     except Exception as e:
         print(f"Erro CRÍTICO ao salvar jogos em lote: {e}")
         return 0
 
-def get_user_games(user_id: str):
+def get_steam_sync_state(user_id: str) -> Dict[int, dict]:
+    """
+    Lê apenas os campos usados para detectar mudanças na sincronização
+    incremental. Jogos cadastrados manualmente (id não numérico) são ignorados.
+    """
+    try:
+        games_ref = db.collection("users").document(user_id).collection("games")
+        docs = games_ref.select(SYNC_STATE_FIELDS).stream()
+        return {int(doc.id): doc.to_dict() for doc in docs if doc.id.isdigit()}
+    except Exception as e:
+        print(f"Erro ao buscar estado de sincronização para {user_id}: {e}")
+        return {}
+
+
+def update_steam_games_fields(user_id: str, updates: Dict[int, dict]) -> int:
+    """Grava somente os campos alterados de cada jogo ({appid: {campo: valor}})."""
+    updates = {appid: fields for appid, fields in updates.items() if fields}
+    if not updates:
+        return 0
+
+    try:
+        games_collection_ref = db.collection("users").document(user_id).collection("games")
+        writer = BulkWriter(db)
+        for appid, fields in updates.items():
+            payload = with_generos(dict(fields))
+            # Jogo manual (id não numérico) não tem apps/{appid}: os campos são do usuário
+            if str(appid).isdigit():
+                for field in HEAVY_STORE_FIELDS:
+                    payload[field] = firestore.DELETE_FIELD
+            writer.update(games_collection_ref.document(str(appid)), payload)
+
+        result = writer.commit()
+        bump_library_version(user_id)
+        print(f"Sincronização incremental: {result.written} jogos atualizados.")
+        return result.written
+    except Exception as e:
+        print(f"Erro ao atualizar jogos alterados de {user_id}: {e}")
+        return 0
+
+
+def get_user_games(user_id: str, projection: str = None):
+    """Jogos do usuário; com `projection` ("features" ou "card") lê só aqueles campos."""
+    fields = PROJECTIONS[projection] if projection else None
+
     try:
         games_ref = db.collection("users").document(user_id).collection("games")
-        docs = games_ref.stream()
+        query = games_ref.select(fields) if fields else games_ref
+        docs = query.stream()
 
         games_list = []
         for doc in docs:
@@ -106,6 +228,155 @@ def get_user_games(user_id: str):
         print(f"Erro ao buscar jogos para {user_id}: {e}")
         return []
 
+def iter_user_games(user_id: str, projection: str = None, page_size: int = GAMES_READ_PAGE_SIZE):
+    """
+    Jogos do usuário em páginas (listas) de até `page_size`, na ordem dos ids.
+    Cada página é uma consulta própria com cursor, então a memória não cresce
+    com a biblioteca e nenhuma leitura fica aberta por muito tempo.
+    """
+    fields = PROJECTIONS[projection] if projection else None
+    games_ref = db.collection("users").document(user_id).collection("games")
+    query = games_ref.select(fields) if fields else games_ref
+
+    last = None
+    while True:
+        page_query = query.start_after(last) if last is not None else query
+        docs = list(page_query.limit(page_size).stream())
+        if not docs:
+            return
+
+        page = []
+        for doc in docs:
+            game_dict = doc.to_dict()
+            game_dict["appid"] = doc.id
+            page.append(game_dict)
+        yield page
+
+        if len(docs) < page_size:
+            return
+        last = docs[-1]
+
+def get_games_by_name(user_id: str, names, fields: List[str]) -> Dict[str, dict]:
+    """
+    Jogos com os nomes pedidos, lendo só `fields` ({nome: jogo}).
+    Usa filtros "in" (até 30 valores cada), normalmente uma consulta só.
+    """
+    names = sorted({n for n in names if n})
+    games_ref = db.collection("users").document(user_id).collection("games")
+    games = {}
+
+    for i in range(0, len(names), FIRESTORE_MAX_IN_VALUES):
+        chunk = names[i:i + FIRESTORE_MAX_IN_VALUES]
+        query = games_ref.select(fields).where(filter=firestore.FieldFilter("name", "in", chunk))
+        for doc in query.stream():
+            game_dict = doc.to_dict()
+            game_dict.setdefault("appid", doc.id)
+            games.setdefault(game_dict.get("name"), game_dict)
+
+    return games
+
+def split_generos(genero: Optional[str]) -> List[str]:
+    """"Ação, RPG" -> ["Ação", "RPG"] (campo usado no filtro array-contains)."""
+    if not genero:
+        return []
+    return [g.strip() for g in genero.split(",") if g.strip()]
+
+def with_generos(fields: dict) -> dict:
+    """Toda escrita de `genero` leva junto a lista `generos` do filtro."""
+    if "genero" in fields and "generos" not in fields:
+        fields["generos"] = split_generos(fields["genero"])
+    return fields
+
+def backfill_list_fields(user_id: str) -> int:
+    """
+    Migração dos documentos antigos: preenche `generos` a partir de `genero`
+    e os campos de LIST_FIELD_DEFAULTS que faltam, para o jogo entrar no
+    filtro por gênero e em todas as ordenações da listagem.
+    """
+    games_ref = db.collection("users").document(user_id).collection("games")
+    docs = games_ref.select(["genero", "generos", *LIST_FIELD_DEFAULTS]).stream()
+
+    writer = BulkWriter(db)
+    for doc in docs:
+        data = doc.to_dict()
+        fields = {k: v for k, v in LIST_FIELD_DEFAULTS.items() if k not in data}
+        if "generos" not in data:
+            fields["generos"] = split_generos(data.get("genero"))
+        if fields:
+            writer.update(games_ref.document(doc.id), fields)
+
+    if not len(writer):
+        return 0
+    result = writer.commit()
+    bump_library_version(user_id)
+    return result.written
+
+def remove_heavy_store_fields(user_id: str) -> int:
+    """
+    Migração: tira dos jogos da Steam os campos que vivem em apps/{appid}.
+    Jogos manuais (id não numérico) ficam como estão: lá esses campos foram
+    preenchidos pelo usuário e não há de onde juntá-los de volta.
+    """
+    games_ref = db.collection("users").document(user_id).collection("games")
+    docs = games_ref.select(HEAVY_STORE_FIELDS).stream()
+
+    writer = BulkWriter(db)
+    for doc in docs:
+        if not doc.id.isdigit():
+            continue
+        present = doc.to_dict().keys() & set(HEAVY_STORE_FIELDS)
+        if present:
+            writer.update(games_ref.document(doc.id), {f: firestore.DELETE_FIELD for f in present})
+
+    if not len(writer):
+        return 0
+    # Campos que a listagem e a IA não leem: a versão da biblioteca não muda
+    return writer.commit().written
+
+def list_user_games_page(user_id: str, limit: int, start_after: str = None,
+                         sort: str = "name", descending: bool = False,
+                         status: str = None, genero: str = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    Uma página da biblioteca (projeção "card"), ordenada no servidor.
+    `start_after` é o id do último jogo da página anterior; devolve
+    (jogos, cursor da próxima página ou None).
+    """
+    if sort not in LIST_SORT_FIELDS:
+        raise ValueError(f"Ordenação inválida: {sort}")
+
+    games_ref = db.collection("users").document(user_id).collection("games")
+    query = games_ref.select(PROJECTIONS["card"])
+
+    if status:
+        query = query.where(filter=firestore.FieldFilter("status", "==", status))
+    if genero:
+        query = query.where(filter=firestore.FieldFilter("generos", "array_contains", genero))
+
+    # Ordenar por um campo já fixado por igualdade não muda nada: usa o nome
+    if sort == "status" and status:
+        sort = "name"
+
+    direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+    query = query.order_by(sort, direction=direction)
+
+    if start_after:
+        cursor = games_ref.document(start_after).get()
+        if not cursor.exists:
+            raise ValueError("Cursor inválido.")
+        query = query.start_after(cursor)
+
+    # Um a mais para saber se existe próxima página
+    docs = list(query.limit(limit + 1).stream())
+
+    games = []
+    for doc in docs[:limit]:
+        game_dict = doc.to_dict()
+        game_dict["appid"] = doc.id
+        games.append(game_dict)
+
+    next_cursor = docs[limit - 1].id if len(docs) > limit else None
+    return games, next_cursor
+
 def update_user_game(user_id: str, appid: int, game_update_data: GameUpdate):
     try:
         doc_ref = db.collection("users").document(user_id).collection("games").document(str(appid))
@@ -116,6 +387,7 @@ def update_user_game(user_id: str, appid: int, game_update_data: GameUpdate):
             return None
 
         doc_ref.update(update_data)
+        bump_library_version(user_id)
         return update_data
     except Exception as e:
         print(f"Erro ao atualizar jogo {appid} para {user_id}: {e}")
@@ -0,0 +1,189 @@
+# app/models/job_model.py
+# Fila de jobs persistente em SQLite local (sobrevive a reinícios do servidor)
+import json
+import sqlite3
+import time
+import uuid
+from typing import Dict, Optional
+
+from .local_store import connect as _connect, register_schema
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+-- No máximo um job ativo (na fila ou rodando) por usuário e tipo
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_per_user
+    ON jobs (kind, user_id) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+register_schema(_SCHEMA)
+
+
+def _to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict]:
+    if row is None:
+        return None
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"] or "{}")
+    return job
+
+
+def enqueue_job(kind: str, user_id: str, payload: dict) -> tuple:
+    """
+    Cria um job na fila. Se o usuário já tiver um job ativo do mesmo tipo,
+    devolve o existente. Retorna (job, criado_agora).
+    """
+    now = time.time()
+    job_id = uuid.uuid4().hex
+    conn = _connect()
+    try:
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, user_id, payload, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, user_id, json.dumps(payload), STATUS_QUEUED, now, now),
+            )
+            return get_job(job_id, conn), True
+        except sqlite3.IntegrityError:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE kind = ? AND user_id = ? AND status IN (?, ?)",
+                (kind, user_id, STATUS_QUEUED, STATUS_RUNNING),
+            ).fetchone()
+            return _to_dict(row), False
+    finally:
+        conn.close()
+
+
+def get_job(job_id: str, conn: sqlite3.Connection = None) -> Optional[Dict]:
+    own_conn = conn is None
+    conn = conn or _connect()
+    try:
+        return _to_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def claim_next_job(kind: str) -> Optional[Dict]:
+    """Pega o job mais antigo da fila e marca como 'running' (atômico entre processos)."""
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE kind = ? AND status = ? ORDER BY created_at LIMIT 1",
+            (kind, STATUS_QUEUED),
+        ).fetchone()
+
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        now = time.time()
+        conn.execute(
+            "UPDATE jobs SET status = ?, started_at = ?, updated_at = ?, attempts = attempts + 1, "
+            "processed = 0, total = 0 WHERE id = ?",
+            (STATUS_RUNNING, now, now, row["id"]),
+        )
+        conn.execute("COMMIT")
+        return get_job(row["id"], conn)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def update_progress(job_id: str, processed: int = None, total: int = None) -> None:
+    """Atualiza o progresso; sem argumentos serve como heartbeat do worker."""
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET processed = COALESCE(?, processed), total = COALESCE(?, total), "
+            "updated_at = ? WHERE id = ?",
+            (processed, total, time.time(), job_id),
+        )
+    finally:
+        conn.close()
+
+
+def finish_job(job_id: str) -> None:
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, processed = total, updated_at = ?, finished_at = ? WHERE id = ?",
+            (STATUS_DONE, now, now, job_id),
+        )
+    finally:
+        conn.close()
+
+
+def release_job(job_id: str) -> None:
+    """Devolve à fila um job pego pelo worker que nem chegou a rodar (ex.: worker desligando)."""
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), updated_at = ? "
+            "WHERE id = ? AND status = ?",
+            (STATUS_QUEUED, time.time(), job_id, STATUS_RUNNING),
+        )
+    finally:
+        conn.close()
+
+
+def fail_job(job_id: str, error: str) -> None:
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+            (STATUS_FAILED, error, now, now, job_id),
+        )
+    finally:
+        conn.close()
+
+
+def requeue_stale_jobs(kind: str, stale_after: float, max_attempts: int) -> int:
+    """
+    Jobs 'running' sem heartbeat há mais de stale_after segundos (worker morreu
+    ou servidor reiniciou) voltam para a fila, até max_attempts tentativas.
+    """
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? "
+            "WHERE kind = ? AND status = ? AND updated_at < ? AND attempts >= ?",
+            (STATUS_FAILED, "Worker interrompido muitas vezes.", now, now,
+             kind, STATUS_RUNNING, now - stale_after, max_attempts),
+        )
+        cur = conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? "
+            "WHERE kind = ? AND status = ? AND updated_at < ?",
+            (STATUS_QUEUED, now, kind, STATUS_RUNNING, now - stale_after),
+        )
+        conn.execute("COMMIT")
+        return cur.rowcount
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
@@ -0,0 +1,43 @@
+# app/models/library_version_model.py
+# Versão da biblioteca de cada usuário: muda a cada alteração nos jogos e
+# invalida os resultados de recomendação em cache (vale para todos os processos)
+import time
+
+from .local_store import register_schema, thread_connection
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS library_versions (
+    user_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+register_schema(_SCHEMA)
+
+
+def get_library_version(user_id: str) -> int:
+    try:
+        row = thread_connection().execute(
+            "SELECT version FROM library_versions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return row["version"] if row else 0
+    except Exception as e:
+        print(f"Erro ao ler versão da biblioteca de {user_id}: {e}")
+        return -1
+
+
+def bump_library_version(user_id: str) -> int:
+    try:
+        conn = thread_connection()
+        conn.execute(
+            "INSERT INTO library_versions (user_id, version, updated_at) VALUES (?, 1, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+            (user_id, time.time()),
+        )
+        row = conn.execute(
+            "SELECT version FROM library_versions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return row["version"]
+    except Exception as e:
+        print(f"Erro ao atualizar versão da biblioteca de {user_id}: {e}")
+        return -1
@@ -0,0 +1,53 @@
+# app/models/local_store.py
+# Banco SQLite local compartilhado pelos processos do servidor (web + workers)
+import os
+import sqlite3
+import threading
+
+from ..config import settings
+
+_schemas = []
+_initialized_paths = set()
+_thread_state = threading.local()
+
+
+def register_schema(sql: str) -> None:
+    """Cada model registra suas tabelas; elas são criadas na primeira conexão."""
+    _schemas.append(sql)
+    _initialized_paths.clear()
+
+
+def connect() -> sqlite3.Connection:
+    path = settings.local_db_path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+
+    if path not in _initialized_paths:
+        conn.execute("PRAGMA journal_mode=WAL")
+        for sql in _schemas:
+            conn.executescript(sql)
+        _initialized_paths.add(path)
+
+    return conn
+
+
+def thread_connection() -> sqlite3.Connection:
+    """
+    Conexão da thread atual, aberta na primeira chamada e reaproveitada
+    depois (não fechar). Para consultas curtas no caminho quente (versão da
+    biblioteca, rate limit da Steam): sem abrir arquivo nem os.makedirs a
+    cada chamada.
+    """
+    path = settings.local_db_path
+    cached = getattr(_thread_state, "conn", None)
+    # Reabre se o caminho mudou ou se algum model registrou tabelas depois
+    if cached is not None and cached[0] == path and path in _initialized_paths:
+        return cached[1]
+
+    if cached is not None:
+        cached[1].close()
+    conn = connect()
+    _thread_state.conn = (path, conn)
+    return conn
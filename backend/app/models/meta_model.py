@@ -1,8 +1,15 @@
+from typing import Dict
+
 from .. import database
+from . import game_model
+from .bulk_writer import BulkWriter
 from ..utils.steam_achievements import fetch_player_achievements, fetch_total_achievements
 
 db = database.db
 
+# Campos do jogo usados no cálculo das metas
+GOAL_GAME_FIELDS = ["name", "appid", "horas_jogadas", "conquistas_totais", "conquistas_obtidas"]
+
 
 class MetaModel:
 
@@ -32,130 +39,147 @@ class MetaModel:
         ref.update(meta_data)
 
     @staticmethod
-    def update_goals(user_id: str):
-        metas = MetaModel.list_metas(user_id)
+    def evaluate_time_goal(meta: dict, game: dict):
+        """Progresso de uma meta TEMPO (ex.: "Chegar a 150 horas") ou None se inválida."""
+        objetivo_raw = meta.get("valor_meta") or ""
+        try:
+            objetivo_horas = int("".join(filter(str.isdigit, objetivo_raw)))
+        except:
+            print(f"[Meta] Erro ao interpretar objetivo: {objetivo_raw}")
+            return None
+
+        if objetivo_horas <= 0:
+            print(f"[Meta] Objetivo inválido na meta '{meta['id']}': {objetivo_raw}")
+            return None
+
+        horas_atual = int(game.get("horas_jogadas", 0))
+        percentual = min(100, round((horas_atual / objetivo_horas) * 100, 2))
+
+        if horas_atual >= objetivo_horas:
+            print(f"[Meta] Meta '{meta['id']}' concluída!")
+
+        return {
+            "progresso_atual": f"{horas_atual}h de {objetivo_horas}h",
+            "percentual": percentual,
+            "status": "CONCLUIDA" if horas_atual >= objetivo_horas else "EM ANDAMENTO",
+        }
 
-        for meta in metas:
+    @staticmethod
+    def evaluate_completion_goal(meta: dict, obtidas: int, totais: int) -> dict:
+        """Progresso de uma meta CONCLUSAO (platinar) a partir das conquistas."""
+        progresso = f"{obtidas}/{totais}"
 
-            meta_id = meta["id"]
-            tipo = meta.get("tipo", "").upper()
+        if totais > 0:
+            percentual = min(100, round((obtidas / totais) * 100, 2))
+        else:
+            percentual = 0
 
-            # =====================================================
-            #                   META DE TEMPO
-            # =====================================================
-            if tipo == "TEMPO":
+        if totais > 0 and obtidas >= totais:
+            print(f"[Meta] Meta '{meta['id']}' PLATINADA!")
+            status = "CONCLUIDA"
+        else:
+            status = "EM_ANDAMENTO"
 
-                # Agora usa game_name (igual a conclusão)
-                game_name = meta.get("game_name")
+        return {"progresso_atual": progresso, "percentual": percentual, "status": status}
 
-                if not game_name:
-                    print(f"[Meta] Meta '{meta_id}' TEMPO sem game_name.")
-                    continue
+    @staticmethod
+    def get_steam_id(user_id: str):
+        user_doc = db.collection("users").document(user_id).get()
+        return (user_doc.to_dict() or {}).get("steam_id")
 
-                # Buscar objetivo (ex.: "Chegar a 150 horas")
-                objetivo_raw = meta.get("valor_meta") or ""
-                try:
-                    objetivo_horas = int("".join(filter(str.isdigit, objetivo_raw)))
-                except:
-                    print(f"[Meta] Erro ao interpretar objetivo: {objetivo_raw}")
-                    continue
+    @staticmethod
+    def update_goals(user_id: str, snapshot: Dict[int, dict] = None) -> int:
+        """
+        Recalcula todas as metas do usuário: uma leitura das metas, cálculo em
+        memória e um único commit em lote. Retorna quantas metas mudaram.
+
+        `snapshot` ({appid: {name, horas_jogadas, conquistas_*}}) vem da
+        sincronização, que acabou de buscar esses números: os jogos citados
+        nele não são relidos e as conquistas não são pedidas à Steam de novo.
+        Sem snapshot (atualização avulsa), lê os jogos citados nas metas e
+        busca na Steam só os appids das metas de conclusão, uma vez cada.
+        """
+        metas = MetaModel.list_metas(user_id)
+        if not metas:
+            return 0
 
-                # Buscar jogo pelo nome
-                game_ref = (
-                    db.collection("users")
-                    .document(user_id)
-                    .collection("games")
-                    .where("name", "==", game_name)
-                    .get()
-                )
-
-                if not game_ref:
-                    print(f"[Meta] Jogo '{game_name}' não encontrado para TEMPO.")
-                    continue
+        names = {meta.get("game_name") for meta in metas} - {None, ""}
 
-                game_data = game_ref[0].to_dict()
-                horas_atual = int(game_data.get("horas_jogadas", 0))
+        games, from_sync = {}, set()
+        for appid, state in (snapshot or {}).items():
+            name = state.get("name")
+            if name in names and name not in games:
+                games[name] = {**state, "appid": appid}
+                from_sync.add(name)
 
-                progresso_str = f"{horas_atual}h de {objetivo_horas}h"
-                percentual = min(100, round((horas_atual / objetivo_horas) * 100, 2))
+        missing = names - games.keys()
+        if missing:
+            games.update(game_model.get_games_by_name(user_id, missing, GOAL_GAME_FIELDS))
 
-                MetaModel.update_one_meta(
-                    user_id,
-                    meta_id,
-                    {
-                        "progresso_atual": progresso_str,
-                        "percentual": percentual,
-                    },
-                )
+        steam_id = None
+        fetched = {}
 
-                if horas_atual >= objetivo_horas:
-                    MetaModel.update_one_meta(user_id, meta_id, {"status": "CONCLUIDA"})
-                    print(f"[Meta] Meta '{meta_id}' concluída!")
-                else:
-                    MetaModel.update_one_meta(user_id, meta_id, {"status": "EM ANDAMENTO"})
+        updates = {}
+        for meta in metas:
+            meta_id = meta["id"]
+            tipo = meta.get("tipo", "").upper()
 
-            # =====================================================
-            #            META DE CONCLUSÃO / PLATINAR
-            # =====================================================
-            elif tipo == "CONCLUSAO":
+            if tipo not in ("TEMPO", "CONCLUSAO"):
+                continue
 
-                game_name = meta.get("game_name")
+            game_name = meta.get("game_name")
+            if not game_name:
+                print(f"[Meta] Meta '{meta_id}' {tipo} sem game_name.")
+                continue
 
-                if not game_name:
-                    print(f"[Meta] Meta '{meta_id}' CONCLUSAO sem game_name.")
-                    continue
+            game = games.get(game_name)
+            if game is None:
+                print(f"[Meta] Jogo '{game_name}' não encontrado para {tipo}.")
+                continue
 
-                # Buscar steam_id
-                user_doc = db.collection("users").document(user_id).get()
-                steam_id = user_doc.to_dict().get("steam_id")
+            if tipo == "TEMPO":
+                result = MetaModel.evaluate_time_goal(meta, game)
 
-                if not steam_id:
-                    print("[Meta] Usuário sem steam_id cadastrado.")
+            else:
+                appid = game.get("appid")
+                if not appid:
+                    print(f"[Meta] Jogo '{game_name}' sem appid.")
                     continue
 
-                # Buscar jogo pelo nome
-                game_ref = (
-                    db.collection("users")
-                    .document(user_id)
-                    .collection("games")
-                    .where("name", "==", game_name)
-                    .get()
-                )
-
-                if not game_ref:
-                    print(f"[Meta] Jogo '{game_name}' não encontrado para CONCLUSAO.")
+                obtidas = game.get("conquistas_obtidas")
+                totais = game.get("conquistas_totais")
+
+                if game_name not in from_sync or obtidas is None or totais is None:
+                    if steam_id is None:
+                        steam_id = MetaModel.get_steam_id(user_id) or ""
+                    if not steam_id:
+                        print("[Meta] Usuário sem steam_id cadastrado.")
+                        continue
+
+                    if appid not in fetched:
+                        fetched[appid] = (
+                            fetch_player_achievements(steam_id, appid),
+                            fetch_total_achievements(appid),
+                        )
+                    obtidas, totais = fetched[appid]
+
+                # Falha na Steam: mantém o progresso salvo em vez de gravar 0
+                if obtidas is None or totais is None:
+                    print(f"[Meta] Steam indisponível para '{game_name}'. Progresso mantido.")
                     continue
 
-                game_data = game_ref[0].to_dict()
-                appid = game_data.get("appid")
+                result = MetaModel.evaluate_completion_goal(meta, obtidas, totais)
 
-                if not appid:
-                    print(f"[Meta] Jogo '{game_name}' sem appid.")
-                    continue
+            # Só grava o que mudou
+            if result and any(meta.get(k) != v for k, v in result.items()):
+                updates[meta_id] = result
+
+        if updates:
+            metas_ref = db.collection("users").document(user_id).collection("metas")
+            writer = BulkWriter(db)
+            for meta_id, fields in updates.items():
+                writer.update(metas_ref.document(meta_id), fields)
+            writer.commit()
 
-                # Buscar conquistas
-                obtidas = fetch_player_achievements(steam_id, appid)
-                totais = fetch_total_achievements(appid)
-
-                progresso = f"{obtidas}/{totais}"
-
-                if totais > 0:
-                    percentual = min(100, round((obtidas / totais) * 100, 2))
-                else:
-                    percentual = 0
-
-                MetaModel.update_one_meta(
-                    user_id,
-                    meta_id,
-                    {
-                        "progresso_atual": progresso,
-                        "percentual": percentual,
-                    },
-                )
-
-                if totais > 0 and obtidas >= totais:
-                    MetaModel.update_one_meta(user_id, meta_id, {"status": "CONCLUIDA"})
-                    print(f"[Meta] Meta '{meta_id}' PLATINADA!")
-                else:
-                    MetaModel.update_one_meta(user_id, meta_id, {"status": "EM_ANDAMENTO"})
-                    print(f"[Meta] Meta '{meta_id}' ainda não platinada ({progresso}).")
+        print(f"[Meta] {len(updates)} metas atualizadas ({len(fetched)} consultas à Steam).")
+        return len(updates)
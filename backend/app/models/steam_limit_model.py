@@ -0,0 +1,126 @@
+# app/models/steam_limit_model.py
+# Estado do rate limit e dos circuit breakers da Steam no SQLite local, para
+# que o servidor web e os processos de sincronização dividam o mesmo orçamento
+from typing import Optional
+
+from .local_store import register_schema, thread_connection
+
+CLOSED = "closed"
+PROBE = "probe"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS steam_buckets (
+    endpoint TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steam_breakers (
+    endpoint TEXT PRIMARY KEY,
+    failures INTEGER NOT NULL DEFAULT 0,
+    opened_at REAL,
+    -- Chamada de teste em andamento até este instante (expira se o processo morrer)
+    probe_until REAL
+);
+"""
+register_schema(_SCHEMA)
+
+
+def _transaction(work):
+    # Uma chamada por requisição à Steam: reaproveita a conexão da thread
+    conn = thread_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        result = work(conn)
+        conn.execute("COMMIT")
+        return result
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+def reserve_token(endpoint: str, rate: float, capacity: float, now: float) -> float:
+    """Pega um token do bucket (o saldo pode ficar negativo) e devolve a espera em segundos."""
+    def work(conn):
+        row = conn.execute(
+            "SELECT tokens, updated_at FROM steam_buckets WHERE endpoint = ?", (endpoint,)
+        ).fetchone()
+        if row is None:
+            tokens = capacity
+        else:
+            tokens = min(capacity, row["tokens"] + max(0.0, now - row["updated_at"]) * rate)
+        tokens -= 1
+        conn.execute(
+            "INSERT INTO steam_buckets (endpoint, tokens, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(endpoint) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+            (endpoint, tokens, now),
+        )
+        return 0.0 if tokens >= 0 else -tokens / rate
+
+    return _transaction(work)
+
+
+def breaker_is_open(endpoint: str) -> bool:
+    row = thread_connection().execute(
+        "SELECT opened_at FROM steam_breakers WHERE endpoint = ?", (endpoint,)
+    ).fetchone()
+    return row is not None and row["opened_at"] is not None
+
+
+def breaker_allow(endpoint: str, reset_timeout: float, now: float) -> Optional[str]:
+    """CLOSED, PROBE (esta chamada é o teste do meio-aberto) ou None (recusada)."""
+    def work(conn):
+        row = conn.execute(
+            "SELECT opened_at, probe_until FROM steam_breakers WHERE endpoint = ?", (endpoint,)
+        ).fetchone()
+        if row is None or row["opened_at"] is None:
+            return CLOSED
+        if row["probe_until"] is not None and row["probe_until"] > now:
+            return None
+        if now - row["opened_at"] < reset_timeout:
+            return None
+        conn.execute(
+            "UPDATE steam_breakers SET probe_until = ? WHERE endpoint = ?",
+            (now + reset_timeout, endpoint),
+        )
+        return PROBE
+
+    return _transaction(work)
+
+
+def breaker_success(endpoint: str) -> None:
+    thread_connection().execute(
+        "UPDATE steam_breakers SET failures = 0, opened_at = NULL, probe_until = NULL "
+        "WHERE endpoint = ? AND (failures > 0 OR opened_at IS NOT NULL OR probe_until IS NOT NULL)",
+        (endpoint,),
+    )
+
+
+def breaker_failure(endpoint: str, failure_threshold: int, now: float) -> None:
+    def work(conn):
+        row = conn.execute(
+            "SELECT failures, probe_until FROM steam_breakers WHERE endpoint = ?", (endpoint,)
+        ).fetchone()
+        if row is not None and row["probe_until"] is not None:
+            # Teste falhou: volta a ficar aberto por mais reset_timeout
+            conn.execute(
+                "UPDATE steam_breakers SET opened_at = ?, probe_until = NULL WHERE endpoint = ?",
+                (now, endpoint),
+            )
+            return
+
+        failures = (row["failures"] if row else 0) + 1
+        conn.execute(
+            "INSERT INTO steam_breakers (endpoint, failures, opened_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(endpoint) DO UPDATE SET failures = excluded.failures, "
+            "opened_at = COALESCE(excluded.opened_at, opened_at)",
+            (endpoint, failures, now if failures >= failure_threshold else None),
+        )
+
+    _transaction(work)
+
+
+def breaker_release_probe(endpoint: str) -> None:
+    thread_connection().execute(
+        "UPDATE steam_breakers SET probe_until = NULL WHERE endpoint = ?", (endpoint,)
+    )
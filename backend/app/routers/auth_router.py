@@ -1,11 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+import hashlib
+import time
+
+from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 from firebase_admin import auth
-import requests
 from ..config import settings
 from ..schemas.user_schema import UserCreate
-from ..services import user_service, steam_services
+from ..services import user_service, steam_services, job_service
+from ..utils.http_client import get_http_client
+from ..utils.ttl_cache import TTLCache
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 security = HTTPBearer()
@@ -22,20 +26,35 @@ class LoginRequest(BaseModel):
     password: str
 
 
+# Tokens já verificados: {sha256 do token: claims}. Cada entrada expira junto
+# com o token (exp), então a assinatura é checada uma vez por token.
+verified_token_cache = TTLCache(maxsize=settings.token_cache_max_entries)
+
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
+    key = hashlib.sha256(token.encode()).hexdigest()
+
+    cached = verified_token_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
         decoded = auth.verify_id_token(token, clock_skew_seconds=30)
-        return decoded
     except Exception:
         raise HTTPException(status_code=401, detail="Token inválido ou expirado")
 
+    ttl = decoded.get("exp", 0) - time.time()
+    if ttl > 0:
+        verified_token_cache.set(key, decoded, ttl=ttl)
+    return decoded
+
 
 # ============================================================
 # REGISTER COM VALIDAÇÃO DE STEAM ID
 # ============================================================
 @router.post("/register")
-async def register_user(body: RegisterRequest, background_tasks: BackgroundTasks):
+async def register_user(body: RegisterRequest):
 
     # 1) VALIDA O STEAM ID ANTES DE QUALQUER COISA
     try:
@@ -67,18 +86,15 @@ async def register_user(body: RegisterRequest, background_tasks: BackgroundTasks
             user_id_firebase=user_firebase.uid
         )
 
-        # 5) AGENDA A SINCRONIZAÇÃO EM BACKGROUND
+        # 5) COLOCA A SINCRONIZAÇÃO NA FILA DO WORKER
         print(f"Agendando sincronização em background para {user_firebase.uid}...")
-        background_tasks.add_task(
-            steam_services.sync_steam_library,
-            user_id=user_firebase.uid,
-            steam_id=body.steam_id
-        )
+        job, _ = job_service.enqueue_steam_sync(user_firebase.uid, body.steam_id)
 
         return {
             "message": "Conta criada! Seus jogos aparecerão na biblioteca em breve.",
             "uid": user_firebase.uid,
-            "background_sync": "Iniciado"
+            "background_sync": "Iniciado",
+            "sync_job_id": job["id"]
         }
 
     except HTTPException as e:
@@ -100,7 +116,7 @@ def login_user(body: LoginRequest):
         "returnSecureToken": True
     }
 
-    resp = requests.post(url, json=payload)
+    resp = get_http_client().post(url, json=payload)
     data = resp.json()
 
     if resp.status_code != 200:
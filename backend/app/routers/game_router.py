@@ -1,5 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Literal, Optional
 from .. import database
+from ..config import settings
+from ..models import game_model
+from ..services import steam_services, training_service
+from ..models.library_version_model import bump_library_version
 from .auth_router import verify_token
 
 router = APIRouter(
@@ -11,13 +16,32 @@ db = database.db
 
 
 @router.get("/{user_id}")
-def list_games(user_id: str, token: dict = Depends(verify_token)):
+def list_games(
+    user_id: str,
+    limit: int = Query(settings.games_page_default_limit, ge=1, le=settings.games_page_max_limit),
+    start_after: Optional[str] = Query(None, description="next_cursor da página anterior"),
+    sort: Literal["name", "horas_jogadas", "status"] = "name",
+    order: Literal["asc", "desc"] = "asc",
+    status: Optional[str] = None,
+    genero: Optional[str] = None,
+    token: dict = Depends(verify_token),
+):
     
     if token['uid'] != user_id:
         raise HTTPException(status_code=403, detail="Acesso negado.")
-        
-    docs = db.collection("users").document(user_id).collection("games").stream()
-    return [doc.to_dict() for doc in docs]
+
+    # Só os campos dos cards; detalhes completos ficam em GET /{user_id}/{game_id}
+    try:
+        games, next_cursor = game_model.list_user_games_page(
+            user_id, limit, start_after=start_after, sort=sort,
+            descending=order == "desc", status=status, genero=genero,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {"games": games, "next_cursor": next_cursor}
 
 
 @router.post("/{user_id}")
@@ -40,9 +64,17 @@ def add_game(user_id: str, game: dict = None, token: dict = None):
     if not token:
         raise HTTPException(status_code=401, detail="Token ausente.")
 
+    if "genero" in game:
+        game["generos"] = game_model.split_generos(game["genero"])
+    # Sem esses campos o jogo some da listagem ordenada por eles
+    for field, default in game_model.LIST_FIELD_DEFAULTS.items():
+        game.setdefault(field, default)
+
     try:
         ref = db.collection("users").document(user_id).collection("games").document()
         ref.set(game)
+        bump_library_version(user_id)
+        training_service.schedule_retrain_if_relevant(user_id, game.keys())
         return {"message": "Jogo adicionado com sucesso!", "id": ref.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -54,9 +86,15 @@ def update_game(user_id: str, game_id: str, game: dict, token: dict = Depends(ve
     if token['uid'] != user_id:
         raise HTTPException(status_code=403, detail="Acesso negado.")
 
+    if "genero" in game:
+        game["generos"] = game_model.split_generos(game["genero"])
+
     try:
         ref = db.collection("users").document(user_id).collection("games").document(game_id)
         ref.update(game)
+        bump_library_version(user_id)
+        # Rajadas de edições viram um treino só (debounce por usuário)
+        training_service.schedule_retrain_if_relevant(user_id, game.keys())
         return {"message": "Jogo atualizado com sucesso!"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -70,6 +108,8 @@ def delete_game(user_id: str, game_id: str, token: dict = Depends(verify_token))
 
     try:
         db.collection("users").document(user_id).collection("games").document(game_id).delete()
+        bump_library_version(user_id)
+        training_service.schedule_retrain(user_id)
         return {"message": "Jogo deletado com sucesso!"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -78,7 +118,8 @@ def delete_game(user_id: str, game_id: str, token: dict = Depends(verify_token))
 def get_game(user_id: str, game_id: str, token: dict = Depends(verify_token)):
     """
     Busca os detalhes de um único jogo da biblioteca do utilizador.
-    Essencial para a página de Detalhes do frontend.
+    Essencial para a página de Detalhes do frontend. Descrições, requisitos
+    e afins vêm do cache compartilhado da loja (apps/{appid}).
     """
     # Verifica se o utilizador está a tentar aceder aos seus próprios dados
     if token['uid'] != user_id:
@@ -92,7 +133,16 @@ def get_game(user_id: str, game_id: str, token: dict = Depends(verify_token)):
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Jogo não encontrado.")
             
-        # Retorna os dados do jogo
-        return doc.to_dict()
+        game = doc.to_dict()
+
+        # Jogos da Steam: junta os dados pesados da loja, sem sobrescrever o que o usuário tem
+        if game_id.isdigit():
+            for field, value in steam_services.get_store_detail_fields(int(game_id)).items():
+                if game.get(field) is None:
+                    game[field] = value
+
+        return game
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from .. import database
+from ..models.meta_model import MetaModel
 
 router = APIRouter(
     prefix="/metas",
@@ -25,6 +26,15 @@ def create_meta(user_id: str, meta: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/{user_id}/refresh")
+def refresh_metas(user_id: str):
+    """Recalcula o progresso das metas (conquistas só dos jogos citados nelas)."""
+    try:
+        atualizadas = MetaModel.update_goals(user_id)
+        return {"message": "Metas recalculadas.", "atualizadas": atualizadas}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.put("/{user_id}/{meta_id}")
 def update_meta(user_id: str, meta_id: str, meta: dict):
     try:
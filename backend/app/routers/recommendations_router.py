@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Path, HTTPException
+from fastapi import APIRouter, Path, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from ..services.ai_services import generate_recommendations, prepare_data_for_ai, train_and_save_model
-from ..models import game_model
-from typing import List, Dict, Any, Union
+from ..config import settings
+from ..services.ai_services import (
+    describe_model,
+    get_cached_recommendations,
+    get_recommendations,
+    has_trained_model,
+    iter_export_frames,
+)
+from ..services import training_service
+from ..utils import executors
+from typing import List, Dict, Any, Literal, Union
+import importlib.util
 import io
-import pandas as pd
-from fastapi import BackgroundTasks
+import itertools
 
 router = APIRouter(
     prefix="/recommendations",
@@ -17,7 +25,16 @@ async def get_game_recommendations(
 ):
 
     try:
-        result = generate_recommendations(user_id)
+        # Cache válido responde direto; senão Firestore + pandas + predição
+        # rodam no pool da IA, fora do event loop
+        result = get_cached_recommendations(user_id)
+        if result is None:
+            # Sem modelo salvo, o primeiro pedido também treina (no pool de
+            # processos): o limite cobre a leitura e o treino
+            timeout = None
+            if not has_trained_model(user_id):
+                timeout = settings.ai_request_timeout_seconds + settings.ai_training_timeout_seconds
+            result = await executors.run_io_bound(get_recommendations, user_id, timeout=timeout)
         recommendations = result.get("recommendations")
         
         if not recommendations:
@@ -30,40 +47,112 @@ async def get_game_recommendations(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno ao gerar recomendações de IA: {e}")
 
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _open_export(user_id: str):
+    # Lê o vocabulário e o primeiro pedaço antes de responder: biblioteca
+    # vazia ainda vira 404 em vez de um arquivo vazio
+    frames = iter_export_frames(user_id)
+    first = next(frames, None)
+    if first is None:
+        raise HTTPException(status_code=404, detail="Nenhum jogo encontrado.")
+    return itertools.chain([first], frames)
+
+
+def _csv_chunks(frames):
+    for i, frame in enumerate(frames):
+        yield frame.to_csv(index=False, header=i == 0)
+
+
+class _ParquetSink(io.RawIOBase):
+    """Destino do ParquetWriter que guarda só os bytes ainda não enviados."""
+
+    def __init__(self):
+        self._pending = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._pending += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._pending)
+        self._pending.clear()
+        return data
+
+
+def _parquet_chunks(frames):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Um row group por pedaço; o rodapé do arquivo sai no final
+    sink = _ParquetSink()
+    writer = None
+    for frame in frames:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
 @router.get("/export-csv/{user_id}")
 async def export_user_data_csv(
-    user_id: str = Path(..., title="ID do Usuário", description="UID para exportar dados.")
+    user_id: str = Path(..., title="ID do Usuário", description="UID para exportar dados."),
+    format: Literal["csv", "parquet"] = Query("csv", description="Formato do arquivo."),
 ):
 
     try:
-    
-        games_list = game_model.get_user_games(user_id)
-        if not games_list:
-            raise HTTPException(status_code=404, detail="Nenhum jogo encontrado.")
+        if format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+            raise HTTPException(status_code=501, detail="Exportação parquet indisponível (pyarrow não instalado).")
 
-        df = prepare_data_for_ai(games_list)
-        
-        if df is None or df.empty:
-            raise HTTPException(status_code=404, detail="Erro ao processar dados (DataFrame vazio).")
-
-        stream = io.StringIO()
-        df.to_csv(stream, index=False)
-        stream.seek(0)
-       
-        response = StreamingResponse(iter([stream.getvalue()]), media_type="text/csv")
-        response.headers["Content-Disposition"] = f"attachment; filename=dados_ia_{user_id}.csv"
+        frames = await executors.run_io_bound(_open_export, user_id)
+
+        # O resto dos pedaços é lido enquanto a resposta é enviada
+        chunks = _parquet_chunks(frames) if format == "parquet" else _csv_chunks(frames)
+        response = StreamingResponse(chunks, media_type=EXPORT_MEDIA_TYPES[format])
+        response.headers["Content-Disposition"] = f"attachment; filename=dados_ia_{user_id}.{format}"
         
         return response
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         print(f"Erro ao exportar CSV: {e}")
         raise HTTPException(status_code=500, detail=f"Erro ao exportar CSV: {str(e)}")
     
+@router.get("/model/{user_id}")
+def get_model_info(
+    user_id: str = Path(..., title="ID do Usuário")
+):
+    # Engine, tamanho, tempo de treino e latência de predição do modelo salvo
+    info = describe_model(user_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Modelo ainda não treinado.")
+    return info
+
+
 @router.post("/train/{user_id}")
 async def force_train_model(
-    background_tasks: BackgroundTasks,
-    user_id: str = Path(..., title="ID do Usuário")
+    user_id: str = Path(..., title="ID do Usuário"),
+    full: bool = Query(False, description="Ignora o modelo salvo e treina do zero."),
 ):
 
-    background_tasks.add_task(train_and_save_model, user_id)
+    # Treino roda no pool de processos (limitado), não no servidor web; cliques
+    # repetidos enquanto um treino espera ou roda se juntam num treino só
+    training_service.schedule_retrain(user_id, full=full, delay=0)
     return {"message": "Treinamento de IA agendado.", "status": "processing"}
\ No newline at end of file
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Path, HTTPException, BackgroundTasks
-from ..services import steam_services
+from fastapi import APIRouter, Path, Query, HTTPException
+from ..services import job_service
 
 router = APIRouter(
     prefix="/steam",
@@ -7,18 +7,33 @@ router = APIRouter(
 )
 
 @router.post("/sync/{user_id}/{steam_id}")
-async def sync_user_steam_library(
-    background_tasks: BackgroundTasks,
+def sync_user_steam_library(
     user_id: str = Path(..., title="ID do Usuário no Firebase"),
-    steam_id: str = Path(..., title="SteamID64 do usuário")
+    steam_id: str = Path(..., title="SteamID64 do usuário"),
+    full: bool = Query(False, description="Reprocessa a biblioteca inteira em vez de só os jogos alterados")
 ):
     try:
+        # Fila persistente: roda no worker, sobrevive a reinícios e não duplica
+        job, created = job_service.enqueue_steam_sync(user_id, steam_id, full=full)
 
-        background_tasks.add_task(steam_services.sync_steam_library, user_id, steam_id)
-        
         return {
-            "message": "Sincronização iniciada em segundo plano! Seus jogos aparecerão gradualmente.",
-            "status": "processing"
+            "message": (
+                "Sincronização iniciada em segundo plano! Seus jogos aparecerão gradualmente."
+                if created else
+                "Já existe uma sincronização em andamento para este usuário."
+            ),
+            "status": "processing",
+            "job_id": job["id"],
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao iniciar sincronização: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Erro ao iniciar sincronização: {e}")
+
+
+@router.get("/sync/{job_id}")
+def get_sync_status(job_id: str = Path(..., title="ID do job de sincronização")):
+    status = job_service.get_sync_job_status(job_id)
+
+    if status is None:
+        raise HTTPException(status_code=404, detail="Sincronização não encontrada.")
+
+    return status
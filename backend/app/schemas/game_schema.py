@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from pydantic import ConfigDict
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Union
 from enum import Enum
 
 class GameStatus(str, Enum):    
@@ -53,6 +53,7 @@ class GameBase(BaseModel):
     appid: int
     name: str
     playtime_forever: int = 0
+    rtime_last_played: Optional[int] = None
     img_icon_url: Optional[str] = None
     img_logo_url: Optional[str] = None
 
@@ -67,6 +68,7 @@ class GameBase(BaseModel):
     conquistas_obtidas: int = 0
 
     genero: Optional[str] = None
+    generos: Optional[List[str]] = None
     desenvolvedor: Optional[str] = None
     publisher: Optional[str] = None
     descricao: Optional[str] = None
@@ -83,6 +85,9 @@ class GameBase(BaseModel):
     data_lancamento: Optional[str] = None
     metacritic: Optional[int] = None
 
+    # False quando alguma chamada à Steam falhou na sincronização (refeito na próxima)
+    enriquecido: Optional[bool] = None
+
     model_config = ConfigDict(
         use_enum_values=True,
         extra="ignore"
@@ -1,31 +1,326 @@
 import pandas as pd
 import numpy as np
+import copy
+import hashlib
 import joblib
 import os
+import pickle
+import threading
+import time
+import warnings
+from scipy import sparse
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import MultiLabelBinarizer
+from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score
 from fastapi import HTTPException
 from typing import List, Dict, Any, Tuple
 from datetime import datetime
 
 from ..models import game_model
+from ..models.library_version_model import get_library_version
+from ..config import settings
+from ..utils import executors
+from ..utils.ttl_cache import TTLCache
 from ..schemas.game_schema import GameStatus, InteresseNivel
 
 MODEL_DIR = "app/models_data"
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# Formato do arquivo do modelo. 1: pickle sem compressão, sem este campo
+# (legado, ainda lido); 2: joblib comprimido, com features, rótulos e
+# fingerprint do treino. Versões mais novas que esta são ignoradas (retreino).
+ARTIFACT_SCHEMA_VERSION = 2
+
+# Modelos já carregados, por usuário: {user_id: (mtime_ns do arquivo, artifact)}.
+# O peso de cada entrada é o tamanho do modelo em memória (o arquivo é comprimido).
+model_cache = TTLCache(
+    maxsize=settings.model_cache_max_entries,
+    max_weight=settings.model_cache_max_bytes,
+)
+
+# Resultados de recomendação: {user_id: ((versão da biblioteca, mtime_ns do modelo), resultado)}.
+# Qualquer escrita nos jogos muda a versão e o próximo pedido recalcula.
+recommendation_cache = TTLCache(
+    maxsize=settings.recommendation_cache_max_entries,
+    ttl=settings.recommendation_cache_ttl_seconds,
+)
+
 def get_model_path(user_id: str):
     return os.path.join(MODEL_DIR, f"model_{user_id}.pkl")
 
-def get_model_instance():
-    return RandomForestClassifier(
-        n_estimators=100, 
-        class_weight="balanced", 
-        random_state=42,
-        max_depth=10
+def save_model_artifact(user_id: str, artifact: dict) -> None:
+    """
+    Grava num arquivo temporário e troca de nome (atômico): quem estiver
+    lendo o modelo nunca vê um arquivo pela metade.
+    """
+    artifact["schema_version"] = ARTIFACT_SCHEMA_VERSION
+    artifact["memory_bytes"] = len(pickle.dumps(artifact["model"], protocol=pickle.HIGHEST_PROTOCOL))
+
+    path = get_model_path(user_id)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        joblib.dump(artifact, tmp_path, compress=settings.model_artifact_compress)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    cache_model_artifact(user_id, artifact)
+
+def cache_model_artifact(user_id: str, artifact: dict) -> None:
+    stat = os.stat(get_model_path(user_id))
+    model_cache.set(user_id, (stat.st_mtime_ns, artifact), weight=artifact.get("memory_bytes", stat.st_size))
+
+def _is_usable_artifact(artifact) -> bool:
+    return (
+        isinstance(artifact, dict)
+        and "model" in artifact
+        and "features" in artifact
+        and artifact.get("schema_version", 1) <= ARTIFACT_SCHEMA_VERSION
     )
 
+def load_model_artifact(user_id: str) -> dict | None:
+    """
+    Devolve o modelo do usuário, lendo do disco só quando não está em memória
+    ou quando o arquivo mudou (ex.: treinado por outro processo).
+    """
+    try:
+        stat = os.stat(get_model_path(user_id))
+    except FileNotFoundError:
+        model_cache.pop(user_id)
+        return None
+
+    cached = model_cache.get(user_id)
+    if cached is not None and cached[0] == stat.st_mtime_ns:
+        return cached[1]
+
+    # joblib lê tanto o formato comprimido quanto o pickle antigo
+    artifact = joblib.load(get_model_path(user_id))
+    if not _is_usable_artifact(artifact):
+        print(f"[IA] Modelo de {user_id} em formato desconhecido, será treinado de novo.")
+        model_cache.pop(user_id)
+        return None
+
+    model_cache.set(user_id, (stat.st_mtime_ns, artifact),
+                    weight=artifact.get("memory_bytes", stat.st_size))
+    return artifact
+
+def _model_mtime(user_id: str) -> int | None:
+    try:
+        return os.stat(get_model_path(user_id)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def has_trained_model(user_id: str) -> bool:
+    return _model_mtime(user_id) is not None
+
+def _recommendation_cache_key(user_id: str) -> tuple:
+    return (get_library_version(user_id), _model_mtime(user_id))
+
+def get_cached_recommendations(user_id: str) -> Dict[str, Any] | None:
+    """Resultado em cache, se a biblioteca e o modelo não mudaram desde o cálculo."""
+    cached = recommendation_cache.get(user_id)
+    if cached is None:
+        return None
+    return cached[1] if cached[0] == _recommendation_cache_key(user_id) else None
+
+def get_recommendations(user_id: str) -> Dict[str, Any]:
+    cached = get_cached_recommendations(user_id)
+    if cached is not None:
+        return cached
+
+    # Versão e modelo lidos antes do cálculo: se um deles mudar durante (edição
+    # ou retreino), o resultado já nasce com a chave antiga e não é servido
+    key = _recommendation_cache_key(user_id)
+    result = generate_recommendations(user_id)
+
+    if key[0] >= 0:
+        recommendation_cache.set(user_id, (key, result))
+    return result
+
+def _balanced_pos_weight(y) -> float:
+    # Mesmo efeito do class_weight="balanced" para duas classes: negativos / positivos
+    if y is None:
+        return 1.0
+    positives = int(np.sum(y))
+    return (len(y) - positives) / positives if positives else 1.0
+
+class ModelEngine:
+    """
+    Interface dos modelos de recomendação. Cada engine cria e treina o modelo,
+    acrescenta árvores a um modelo salvo (treino incremental) e diz quantas
+    árvores ele tem. A predição é sempre predict_proba(X)[:, 1] na matriz esparsa.
+    """
+    name = ""
+
+    def create(self, y=None, n_jobs: int | None = None):
+        raise NotImplementedError
+
+    def fit(self, X, y, n_jobs: int | None = None):
+        model = self.create(y, n_jobs)
+        model.fit(X, y)
+        return model
+
+    def add_trees(self, model, X, y, n_trees: int, n_jobs: int | None = None):
+        """Devolve um modelo novo; `model` pode estar em uso no model_cache e não muda."""
+        raise NotImplementedError
+
+    def tree_count(self, model) -> int:
+        raise NotImplementedError
+
+    def for_serving(self, model):
+        """Ajusta o modelo salvo para predição no servidor web (uma thread)."""
+        return model
+
+class RandomForestEngine(ModelEngine):
+    name = "random_forest"
+
+    def create(self, y=None, n_jobs: int | None = None):
+        return RandomForestClassifier(
+            n_estimators=100, 
+            class_weight="balanced", 
+            random_state=42,
+            max_depth=10,
+            n_jobs=n_jobs
+        )
+
+    def add_trees(self, model, X, y, n_trees: int, n_jobs: int | None = None):
+        # Árvores novas, treinadas com os dados atuais, somadas às antigas. O
+        # warm_start altera o modelo: trabalha numa cópia para não mexer no que
+        # o cache está servindo (se o treino ou a gravação falhar, ele segue valendo)
+        model = copy.deepcopy(model)
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + n_trees, n_jobs=n_jobs)
+        with warnings.catch_warnings():
+            # O aviso de class_weight com warm_start é para dados parciais; aqui é o conjunto todo
+            warnings.filterwarnings("ignore", message="class_weight presets")
+            model.fit(X, y)
+        return model
+
+    def tree_count(self, model) -> int:
+        return model.n_estimators
+
+    def for_serving(self, model):
+        model.set_params(warm_start=False, n_jobs=None)
+        return model
+
+class XGBoostHistEngine(ModelEngine):
+    """Gradient boosting com histogramas: treino mais rápido e modelo bem menor que a floresta."""
+    name = "xgboost_hist"
+
+    def create(self, y=None, n_jobs: int | None = None, n_estimators: int = 100):
+        return XGBClassifier(
+            tree_method="hist",
+            n_estimators=n_estimators,
+            max_depth=6,
+            learning_rate=0.1,
+            scale_pos_weight=_balanced_pos_weight(y),
+            eval_metric="logloss",
+            random_state=42,
+            n_jobs=n_jobs
+        )
+
+    def add_trees(self, model, X, y, n_trees: int, n_jobs: int | None = None):
+        # Mais rodadas de boosting a partir do booster salvo
+        extended = self.create(y, n_jobs, n_estimators=n_trees)
+        extended.fit(X, y, xgb_model=model.get_booster())
+        return extended
+
+    def tree_count(self, model) -> int:
+        return model.get_booster().num_boosted_rounds()
+
+    def for_serving(self, model):
+        model.set_params(n_jobs=1)
+        return model
+
+ENGINES = {engine.name: engine for engine in (RandomForestEngine(), XGBoostHistEngine())}
+
+# Artefatos sem o campo "engine" são anteriores às engines: floresta aleatória
+DEFAULT_ARTIFACT_ENGINE = RandomForestEngine.name
+
+def get_engine(name: str | None = None) -> ModelEngine:
+    """Engine pedida ou a configurada na implantação (settings.ai_model_engine)."""
+    name = name or settings.ai_model_engine
+    if name not in ENGINES:
+        raise ValueError(f"Engine de modelo desconhecida: {name}")
+    return ENGINES[name]
+
+def get_model_instance():
+    return get_engine().create()
+
+# Latência da predição neste processo, por engine: {engine: [predições, jogos, segundos]}
+_inference_stats: Dict[str, list] = {}
+_inference_lock = threading.Lock()
+
+def record_inference(engine_name: str, rows: int, seconds: float) -> None:
+    with _inference_lock:
+        stats = _inference_stats.setdefault(engine_name, [0, 0, 0.0])
+        stats[0] += 1
+        stats[1] += rows
+        stats[2] += seconds
+
+def get_inference_stats(engine_name: str) -> Dict[str, Any]:
+    with _inference_lock:
+        predictions, rows, seconds = _inference_stats.get(engine_name, [0, 0, 0.0])
+    return {
+        "predictions": predictions,
+        "avg_latency_ms": round(seconds / predictions * 1000, 2) if predictions else None,
+        "avg_latency_per_game_us": round(seconds / rows * 1e6, 2) if rows else None,
+    }
+
+def describe_model(user_id: str) -> Dict[str, Any] | None:
+    """Engine, tamanho, tempo de treino e latência de predição do modelo do usuário."""
+    artifact = load_model_artifact(user_id)
+    if artifact is None:
+        return None
+
+    engine_name = artifact.get("engine", DEFAULT_ARTIFACT_ENGINE)
+    return {
+        "engine": engine_name,
+        "configured_engine": settings.ai_model_engine,
+        "schema_version": artifact.get("schema_version", 1),
+        "trees": ENGINES[engine_name].tree_count(artifact["model"]) if engine_name in ENGINES else None,
+        "features": len(artifact["features"]),
+        "train_seconds": artifact.get("train_seconds"),
+        "model_bytes": artifact.get("memory_bytes"),
+        "file_bytes": os.path.getsize(get_model_path(user_id)),
+        "accuracy": artifact.get("accuracy"),
+        "last_trained": artifact.get("last_trained"),
+        "inference": get_inference_stats(engine_name),
+    }
+
+def benchmark_engines(games_list: list, engines: List[str] | None = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Treina cada engine nos mesmos jogos e mede tempo de treino, latência de
+    predição (backlog inteiro) e tamanho do modelo, sem salvar nada.
+    """
+    prepared = prepare_feature_matrix(games_list)
+    if prepared is None:
+        return {}
+
+    frame, X, _ = prepared
+    y = frame["target_finalizado"].to_numpy()
+    if len(np.unique(y)) < 2:
+        return {}
+
+    report = {}
+    for name in engines or list(ENGINES):
+        engine = get_engine(name)
+
+        started = time.perf_counter()
+        model = engine.for_serving(engine.fit(X, y))
+        train_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        model.predict_proba(X)
+        predict_seconds = time.perf_counter() - started
+
+        report[name] = {
+            "train_seconds": round(train_seconds, 3),
+            "inference_ms": round(predict_seconds * 1000, 2),
+            "model_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+            "trees": engine.tree_count(model),
+        }
+    return report
+
 def analyze_data_coverage(games_list: list) -> List[str]:
     df = pd.DataFrame(games_list)
     warnings = []
@@ -64,123 +359,361 @@ def analyze_data_coverage(games_list: list) -> List[str]:
 
     return warnings
 
-def prepare_data_for_ai(games_list: list) -> pd.DataFrame | None:
-    if not games_list:
-        return None
-
-    df = pd.DataFrame(games_list)
-    if "status" not in df.columns:
-        return None
+MESES_PT_EN = {
+    "jan.": "Jan", "fev.": "Feb", "mar.": "Mar", "abr.": "Apr",
+    "mai.": "May", "jun.": "Jun", "jul.": "Jul", "ago.": "Aug",
+    "set.": "Sep", "out.": "Oct", "nov.": "Nov", "dez.": "Dec"
+}
+
+# Campos do jogo que alimentam o modelo (o resto do documento fica de fora)
+FEATURE_SOURCE_FIELDS = [
+    "appid", "name", "status", "genero", "categorias", "playtime_forever",
+    "nota_pessoal", "metacritic", "preco", "data_lancamento", "interesse",
+]
+
+NUMERIC_FEATURES = [
+    "log_playtime", "nota_pessoal", "metacritic",
+    "nivel_interesse_numerico", "idade_lancamento_dias", "log_final_price",
+]
+
+# Formatos comuns lidos direto com strptime; o resto cai no parser genérico
+FORMATOS_DATA = ["%d %b, %Y", "%d %b %Y", "%b %d, %Y", "%Y-%m-%d"]
+
+def _coluna(df: pd.DataFrame, nome: str, padrao) -> pd.Series:
+    if nome in df.columns:
+        return df[nome]
+    return pd.Series(padrao, index=df.index, dtype=object)
+
+def _log_preco_final(precos: pd.Series) -> np.ndarray:
+    # preco é um dict por jogo, então a extração é uma passada só; as contas são vetoriais
+    brutos = [p.get("preco_final") if isinstance(p, dict) else None for p in precos]
+    validos = np.fromiter((isinstance(v, (int, float)) for v in brutos), dtype=bool, count=len(brutos))
+    valores = np.array([v if ok else 0 for v, ok in zip(brutos, validos)], dtype=float)
+    return np.where(validos, np.log1p(valores / 100), 0)
+
+def _parse_datas(textos: pd.Series) -> pd.Series:
+    datas = pd.Series(pd.NaT, index=textos.index, dtype="datetime64[ns]")
+    pendentes = pd.Series(True, index=textos.index)
+
+    for formato in FORMATOS_DATA:
+        if not pendentes.any():
+            break
+        lidas = pd.to_datetime(textos[pendentes], format=formato, errors="coerce").dropna()
+        datas[lidas.index] = lidas
+        pendentes[lidas.index] = False
+
+    if pendentes.any():
+        datas[pendentes] = pd.to_datetime(textos[pendentes], format="mixed", errors="coerce")
+
+    return datas
+
+def _idade_lancamento_dias(datas: pd.Series, agora: datetime) -> pd.Series:
+    idades = pd.Series(0, index=datas.index, dtype="int64")
+
+    eh_texto = datas.map(lambda v: isinstance(v, str)).astype(bool)
+    textos = datas[eh_texto].astype(str)
+    textos = textos[textos.str.strip() != ""]
+    if textos.empty:
+        return idades
+
+    # Bibliotecas repetem muitas datas: cada texto distinto é traduzido e lido uma vez só
+    unicas = pd.Series(textos.unique())
+
+    # Troca só o primeiro mês (na ordem do mapa) encontrado em cada data
+    minusculas = unicas.str.lower()
+    traduzidas = minusculas.copy()
+    pendentes = pd.Series(True, index=minusculas.index)
+    for pt, en in MESES_PT_EN.items():
+        achou = pendentes & minusculas.str.contains(pt, regex=False)
+        if achou.any():
+            traduzidas[achou] = minusculas[achou].str.replace(pt, en, regex=False)
+            pendentes &= ~achou
+
+    lidas = pd.Series(_parse_datas(traduzidas).values, index=unicas.values)
+    dias = (agora - textos.map(lidas)).dt.days
+
+    idades[dias.index] = dias.fillna(0).astype("int64")
+    return idades
+
+def _feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas numéricas e listas de tags usadas pelo modelo (in-place)."""
+    df["target_finalizado"] = (df["status"] == GameStatus.finalizado.value).astype("int64")
+
+    df["playtime_forever"] = _coluna(df, "playtime_forever", 0).fillna(0)
+    df["log_playtime"] = np.log1p(df["playtime_forever"].astype(float))
+    df["nota_pessoal"] = _coluna(df, "nota_pessoal", 0).fillna(0)
+    df["metacritic"] = _coluna(df, "metacritic", 0).fillna(0)
+
+    df["log_final_price"] = _log_preco_final(_coluna(df, "preco", None))
+    df["idade_lancamento_dias"] = _idade_lancamento_dias(_coluna(df, "data_lancamento", ""), datetime.now())
+
+    df["interesse"] = _coluna(df, "interesse", "N/A").fillna("N/A")
+    interesse_map = {"N/A": 0, "Baixo": 1, "Médio": 2, "Alto": 3}
+    df["nivel_interesse_numerico"] = df["interesse"].map(interesse_map).fillna(0)
 
-    df["target_finalizado"] = df["status"].apply(
-        lambda x: 1 if x == GameStatus.finalizado.value else 0
+    df["genero_list"] = _coluna(df, "genero", "").fillna("").astype(str).str.split(", ", regex=False)
+    df["categoria_list"] = _coluna(df, "categorias", "").fillna("").astype(str).str.split(", ", regex=False)
+    return df
+
+def _tag_features(generos, categorias) -> List[str]:
+    return [f"gen_{g}" for g in sorted(generos)] + [f"cat_{c}" for c in sorted(categorias)]
+
+def build_vocabulary(frame: pd.DataFrame) -> List[str]:
+    """Colunas do modelo: numéricas fixas + tags em ordem alfabética (mesmo conjunto, mesma ordem)."""
+    generos = {g for tags in frame["genero_list"] for g in tags if g}
+    categorias = {c for tags in frame["categoria_list"] for c in tags if c}
+    return NUMERIC_FEATURES + _tag_features(generos, categorias)
+
+def build_feature_matrix(frame: pd.DataFrame, features: List[str]) -> sparse.csr_matrix:
+    """
+    Matriz CSR (jogos x features) na ordem de `features`. Só entram valores
+    diferentes de zero; tags fora do vocabulário são ignoradas.
+    """
+    index = {name: i for i, name in enumerate(features)}
+    rows, cols, vals = [], [], []
+
+    for name in NUMERIC_FEATURES:
+        if name not in index:
+            continue
+        values = np.nan_to_num(frame[name].to_numpy(dtype=float))
+        nonzero = np.flatnonzero(values)
+        rows.append(nonzero)
+        cols.append(np.full(len(nonzero), index[name]))
+        vals.append(values[nonzero])
+
+    tag_rows, tag_cols = [], []
+    for prefix, column in (("gen_", "genero_list"), ("cat_", "categoria_list")):
+        for row, tags in enumerate(frame[column]):
+            for tag in set(tags):
+                col = index.get(prefix + tag)
+                if col is not None:
+                    tag_rows.append(row)
+                    tag_cols.append(col)
+
+    rows.append(np.array(tag_rows, dtype=int))
+    cols.append(np.array(tag_cols, dtype=int))
+    vals.append(np.ones(len(tag_rows)))
+
+    return sparse.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(frame), len(features)),
     )
 
-    df["playtime_forever"] = df.get("playtime_forever", 0).fillna(0)
-    df["log_playtime"] = df["playtime_forever"].apply(lambda x: np.log1p(x))
-    df["nota_pessoal"] = df.get("nota_pessoal", 0).fillna(0)
-    df["metacritic"] = df.get("metacritic", 0).fillna(0)
-
-    def extract_log_final_price(price_data):
-        if isinstance(price_data, dict):
-            price_raw = price_data.get("preco_final")
-            if isinstance(price_raw, (int, float)):
-                return np.log1p(price_raw / 100)
-        return 0
-    df["log_final_price"] = df.get("preco", None).apply(extract_log_final_price)
-
-    meses_pt_en = {
-        "jan.": "Jan", "fev.": "Feb", "mar.": "Mar", "abr.": "Apr",
-        "mai.": "May", "jun.": "Jun", "jul.": "Jul", "ago.": "Aug",
-        "set.": "Sep", "out.": "Oct", "nov.": "Nov", "dez.": "Dec"
-    }
-    def calcular_idade(data_str: str) -> int:
-        if not isinstance(data_str, str) or not data_str.strip(): return 0
-        data_lower = data_str.lower()
-        for pt, en in meses_pt_en.items():
-            if pt in data_lower:
-                data_lower = data_lower.replace(pt, en)
-                break
-        try:
-            dt = pd.to_datetime(data_lower, errors="coerce")
-            if pd.isna(dt): return 0
-            return (datetime.now() - dt).days
-        except: return 0
-        
-    df["idade_lancamento_dias"] = df.get("data_lancamento", "").apply(calcular_idade)
-
-    df["interesse"] = df.get("interesse", "N/A").fillna("N/A")
-    interesse_map = {"N/A": 0, "Baixo": 1, "Médio": 2, "Alto": 3}
-    df["nivel_interesse_numerico"] = df["interesse"].map(interesse_map).fillna(0)
+def prepare_feature_matrix(games_list: list, features: List[str] | None = None):
+    """
+    Entrada do modelo: (frame, X, features). Os jogos são reduzidos aos campos
+    de FEATURE_SOURCE_FIELDS antes de virar DataFrame, então textos e dados da
+    loja nunca passam por aqui. Sem `features`, o vocabulário vem dos próprios jogos.
+    """
+    if not games_list:
+        return None
 
-    df["genero_list"] = df.get("genero", "").fillna("").astype(str).str.split(", ")
-    df["categoria_list"] = df.get("categorias", "").fillna("").astype(str).str.split(", ")
+    frame = pd.DataFrame([
+        {field: game[field] for field in FEATURE_SOURCE_FIELDS if field in game}
+        for game in games_list
+    ])
+    if "status" not in frame.columns:
+        return None
 
-    mlb_gen = MultiLabelBinarizer()
-    genero_bin = mlb_gen.fit_transform(df["genero_list"])
-    genero_df = pd.DataFrame(genero_bin, columns=[f"gen_{g}" for g in mlb_gen.classes_])
+    frame = _feature_frame(frame)
+    features = features or build_vocabulary(frame)
+    return frame, build_feature_matrix(frame, features), features
+
+# Colunas da exportação em ordem fixa: o cabeçalho sai antes de ler os jogos
+# e todos os pedaços têm o mesmo esquema (necessário no parquet)
+EXPORT_TEXT_COLUMNS = [
+    "appid", "name", "status", "tipo_cadastro", "interesse", "genero", "categorias", "data_lancamento",
+]
+EXPORT_NUMBER_COLUMNS = [
+    "nota_pessoal", "horas_jogadas", "playtime_forever", "conquistas_totais", "conquistas_obtidas",
+    "metacritic", "preco_final", "target_finalizado", "log_playtime", "nivel_interesse_numerico",
+    "idade_lancamento_dias", "log_final_price",
+]
+
+def _split_tags(value) -> List[str]:
+    # Mesmo corte do _feature_frame, sem tags vazias
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    return [tag for tag in str(value).split(", ") if tag]
+
+def build_tag_vocabulary(user_id: str) -> List[str]:
+    """Colunas gen_/cat_ da biblioteca inteira, lendo só gênero e categorias."""
+    generos, categorias = set(), set()
+    for page in game_model.iter_user_games(user_id, projection="tags"):
+        for game in page:
+            generos.update(_split_tags(game.get("genero")))
+            categorias.update(_split_tags(game.get("categorias")))
+    return _tag_features(generos, categorias)
+
+def iter_export_frames(user_id: str, chunk_size: int | None = None):
+    """
+    Tabela da exportação (jogo + features densas) em pedaços de até
+    `chunk_size` jogos, conforme as páginas chegam do Firestore. O vocabulário
+    de tags é lido antes, numa passada leve, para todos os pedaços terem as
+    mesmas colunas; a memória depende do tamanho do pedaço, não da biblioteca.
+    """
+    chunk_size = chunk_size or settings.export_chunk_size
+    tag_columns = build_tag_vocabulary(user_id)
+
+    for page in game_model.iter_user_games(user_id, projection="export", page_size=chunk_size):
+        frame = pd.DataFrame(page)
+        frame["status"] = _coluna(frame, "status", None)
+        frame = _feature_frame(frame)
+        frame["preco_final"] = [
+            p.get("preco_final") if isinstance(p, dict) else None for p in _coluna(frame, "preco", None)
+        ]
 
-    mlb_cat = MultiLabelBinarizer()
-    cat_bin = mlb_cat.fit_transform(df["categoria_list"])
-    categoria_df = pd.DataFrame(cat_bin, columns=[f"cat_{c}" for c in mlb_cat.classes_])
+        chunk = frame.reindex(columns=EXPORT_TEXT_COLUMNS + EXPORT_NUMBER_COLUMNS)
+        chunk[EXPORT_TEXT_COLUMNS] = chunk[EXPORT_TEXT_COLUMNS].astype("string")
+        chunk[EXPORT_NUMBER_COLUMNS] = chunk[EXPORT_NUMBER_COLUMNS].apply(
+            pd.to_numeric, errors="coerce"
+        ).astype(float)
 
-    df_final = pd.concat([df.reset_index(drop=True), genero_df, categoria_df], axis=1)
-    
-    return df_final
+        tags = build_feature_matrix(frame, tag_columns).toarray().astype("int8")
+        yield pd.concat(
+            [chunk, pd.DataFrame(tags, columns=tag_columns, index=chunk.index)], axis=1
+        )
 
-def train_and_save_model(user_id: str) -> Dict[str, Any]:
+def _training_fingerprint(X: sparse.csr_matrix, y: np.ndarray, features: List[str]) -> str:
+    """
+    Hash do conjunto de treino (valores e rótulos), para saber se algo mudou.
+    A idade de lançamento fica de fora: ela muda todo dia sozinha.
+    """
+    stable = X[:, [i for i, name in enumerate(features) if name != "idade_lancamento_dias"]]
+    stable.sort_indices()
+    digest = hashlib.sha256()
+    for part in (stable.indptr, stable.indices, stable.data, y):
+        digest.update(np.ascontiguousarray(part).tobytes())
+    return digest.hexdigest()
+
+def choose_training_mode(previous: dict | None, features: List[str],
+                         labels: Dict[str, int], fingerprint: str,
+                         engine: ModelEngine | None = None) -> str:
+    """
+    "unchanged": mesmo conjunto de treino do modelo salvo, nada a fazer;
+    "incremental": algumas árvores novas sobre o modelo salvo (warm start);
+    "full": modelo novo. Vale quando não há modelo compatível (ou a engine
+    configurada mudou), quando o vocabulário mudou, quando o modelo já
+    cresceu demais ou quando muitos rótulos mudaram desde o último treino completo.
+    """
+    engine = engine or get_engine()
+    if not previous or "base_labels" not in previous or previous.get("features") != features:
+        return "full"
+
+    if previous.get("engine", DEFAULT_ARTIFACT_ENGINE) != engine.name:
+        return "full"
+
+    if previous.get("fingerprint") == fingerprint:
+        return "unchanged"
+
+    if engine.tree_count(previous["model"]) + settings.ai_incremental_trees > settings.ai_max_trees:
+        return "full"
+
+    base = previous["base_labels"]
+    changed = sum(1 for appid, label in labels.items() if base.get(appid) != label)
+    changed += sum(1 for appid in base if appid not in labels)
+    if changed > settings.ai_incremental_max_changed_fraction * max(len(base), 1):
+        return "full"
+
+    return "incremental"
+
+def train_and_save_model(user_id: str, full: bool = False) -> Dict[str, Any]:
 
     print(f"[IA] Iniciando treinamento para {user_id}...")
-    games_list = game_model.get_user_games(user_id)
-    
+    games_list = game_model.get_user_games(user_id, projection="features")
+    return train_from_games(user_id, games_list, full)
+
+def train_from_games(user_id: str, games_list: list, full: bool = False,
+                     n_jobs: int | None = None) -> Dict[str, Any]:
+    """
+    Treina com jogos já lidos (projeção "features"). Separado da leitura para
+    o treino em lote buscar no Firestore em threads e treinar em processos.
+    """
     if not games_list:
         return {"status": "error", "message": "Sem dados para treinar."}
 
     try:
-        df = prepare_data_for_ai(games_list)
+        prepared = prepare_feature_matrix(games_list)
     except Exception as e:
         print(f"[IA] Erro ao preparar dados: {e}")
         return {"status": "error", "message": "Erro no processamento de dados."}
 
+    if prepared is None:
+        return {"status": "error", "message": "Erro no processamento de dados."}
+
+    frame, X_all, feature_cols = prepared
+
     status_ignorados = [
         GameStatus.nao_iniciado.value, 
         GameStatus.quero_jogar.value,
         GameStatus.nao_tenho_interesse.value
     ]
     
-    df_train = df[~df["status"].isin(status_ignorados)]
+    train_mask = ~frame["status"].isin(status_ignorados).to_numpy()
 
-    if len(df_train) < 5:
+    if train_mask.sum() < 5:
         return {"status": "skipped", "message": "Poucos jogos jogados para treinar IA."}
 
-    feature_cols = [
-        col for col in df.columns
-        if col.startswith("gen_") or col.startswith("cat_") or col in [
-            "log_playtime", "nota_pessoal", "metacritic", 
-            "nivel_interesse_numerico", "idade_lancamento_dias", "log_final_price"
-        ]
-    ]
-
-    X = df_train[feature_cols]
-    y = df_train["target_finalizado"]
+    X = X_all[train_mask]
+    y = frame["target_finalizado"].to_numpy()[train_mask]
 
     if len(np.unique(y)) < 2:
         return {"status": "skipped", "message": "Necessário ter jogos finalizados E não finalizados para aprender."}
 
+    labels = dict(zip(frame["appid"].astype(str)[train_mask], y.tolist()))
+    fingerprint = _training_fingerprint(X, y, feature_cols)
+
+    previous = None
+    if not full:
+        try:
+            previous = load_model_artifact(user_id)
+        except Exception:
+            print("[IA] Modelo salvo ilegível, refazendo do zero.")
+
+    engine = get_engine()
+    mode = choose_training_mode(previous, feature_cols, labels, fingerprint, engine)
+
+    if mode == "unchanged":
+        print(f"[IA] Nada mudou desde o último treino de {user_id}.")
+        return {"status": "success", "mode": mode, "accuracy": previous.get("accuracy")}
+
     try:
-        model = get_model_instance()
-        model.fit(X, y)
-        
+        started = time.perf_counter()
+        if mode == "incremental":
+            model = engine.add_trees(previous["model"], X, y, settings.ai_incremental_trees, n_jobs)
+            base_labels = previous["base_labels"]
+        else:
+            model = engine.fit(X, y, n_jobs)
+            base_labels = labels
+        train_seconds = round(time.perf_counter() - started, 3)
+
+        # Predição roda no servidor web: o modelo salvo volta a usar uma thread
+        model = engine.for_serving(model)
+
+        accuracy = round(model.score(X, y), 2)
         artifact = {
             "model": model,
+            "engine": engine.name,
+            "train_seconds": train_seconds,
             "features": feature_cols,
+            "labels": labels,
+            "base_labels": base_labels,
+            "fingerprint": fingerprint,
+            "accuracy": accuracy,
             "last_trained": datetime.now().isoformat()
         }
         
-        joblib.dump(artifact, get_model_path(user_id))
-        print(f"[IA] Modelo salvo com sucesso em {get_model_path(user_id)}")
+        save_model_artifact(user_id, artifact)
+        print(f"[IA] Modelo salvo com sucesso em {get_model_path(user_id)} ({engine.name}, {mode})")
         
-        return {"status": "success", "accuracy": round(model.score(X, y), 2)}
+        return {
+            "status": "success",
+            "mode": mode,
+            "engine": engine.name,
+            "accuracy": accuracy,
+            "train_seconds": train_seconds,
+            "model_bytes": artifact["memory_bytes"],
+        }
 
     except Exception as e:
         print(f"[IA] Erro no treinamento: {e}")
@@ -188,30 +721,34 @@ def train_and_save_model(user_id: str) -> Dict[str, Any]:
 
 def generate_recommendations(user_id: str) -> Dict[str, Any]:
 
-    games_list = game_model.get_user_games(user_id)
+    games_list = game_model.get_user_games(user_id, projection="features")
     warnings = analyze_data_coverage(games_list)
     
     if not games_list:
         raise HTTPException(status_code=404, detail="Biblioteca vazia.")
 
-    model_path = get_model_path(user_id)
     artifact = None
     
-    if os.path.exists(model_path):
-        try:
-            artifact = joblib.load(model_path)
-        except:
-            print("[IA] Arquivo de modelo corrompido. Treinando novo...")
+    try:
+        artifact = load_model_artifact(user_id)
+    except:
+        print("[IA] Arquivo de modelo corrompido. Treinando novo...")
     
     if artifact is None:
-        train_result = train_and_save_model(user_id)
+        # Treino é CPU pesada: vai para o pool de processos em vez de travar esta thread
+        train_result = executors.run_cpu_bound(train_and_save_model, user_id)
         if train_result["status"] == "success":
-            artifact = joblib.load(model_path)
+            artifact = load_model_artifact(user_id)
     
     try:
-        df = prepare_data_for_ai(games_list)
+        prepared = prepare_feature_matrix(games_list, artifact["features"] if artifact else None)
     except:
         raise HTTPException(status_code=400, detail="Erro dados.")
+
+    if prepared is None:
+        raise HTTPException(status_code=400, detail="Erro dados.")
+
+    frame, X, _ = prepared
     
     status_games = [
         GameStatus.nao_iniciado.value, 
@@ -222,7 +759,8 @@ def generate_recommendations(user_id: str) -> Dict[str, Any]:
         GameStatus.jogando.value
     ]
 
-    df_predict = df[df["status"].isin(status_games)].copy()
+    predict_mask = frame["status"].isin(status_games).to_numpy()
+    df_predict = frame[predict_mask].copy()
 
     if df_predict.empty:
         return {"recommendations": [], "warnings": ["Backlog vazio!"]}
@@ -238,16 +776,13 @@ def generate_recommendations(user_id: str) -> Dict[str, Any]:
 
     if artifact:
         model = artifact["model"]
-        trained_features = artifact["features"]
-        
-        for col in trained_features:
-            if col not in df_predict.columns:
-                df_predict[col] = 0
-        
-        X_pred = df_predict[trained_features].fillna(0)
+        X_pred = X[predict_mask]
         
         try:
+            started = time.perf_counter()
             probs = model.predict_proba(X_pred)[:, 1]
+            record_inference(artifact.get("engine", DEFAULT_ARTIFACT_ENGINE), X_pred.shape[0],
+                             time.perf_counter() - started)
             df_predict["probabilidade_finalizar"] = probs
             
             for status, peso in pesos_status.items():
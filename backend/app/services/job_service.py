@@ -0,0 +1,84 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from ..config import settings
+from ..models import job_model
+from . import steam_services
+
+SYNC_JOB = "steam_sync"
+
+
+# ============================================================
+# ENFILEIRAR / CONSULTAR (USADO PELAS ROTAS)
+# ============================================================
+def enqueue_steam_sync(user_id: str, steam_id: str, full: bool = False) -> tuple:
+    """
+    Coloca a sincronização na fila persistente. Dois cliques seguidos não
+    criam dois jobs: se já houver um ativo para o usuário, ele é devolvido.
+    Retorna (job, criado_agora).
+    """
+    return job_model.enqueue_job(SYNC_JOB, user_id, {"steam_id": steam_id, "full": full})
+
+
+def get_sync_job_status(job_id: str) -> Optional[Dict]:
+    job = job_model.get_job(job_id)
+    if job is None or job["kind"] != SYNC_JOB:
+        return None
+
+    eta_seconds = None
+    if job["status"] == job_model.STATUS_RUNNING and job["processed"] and job["total"]:
+        elapsed = time.time() - job["started_at"]
+        rate = job["processed"] / elapsed if elapsed > 0 else 0
+        if rate > 0:
+            eta_seconds = round((job["total"] - job["processed"]) / rate, 1)
+
+    return {
+        "job_id": job["id"],
+        "user_id": job["user_id"],
+        "status": job["status"],
+        "processed": job["processed"],
+        "total": job["total"],
+        "eta_seconds": eta_seconds,
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+# ============================================================
+# EXECUÇÃO (RODA DENTRO DOS PROCESSOS DO WORKER)
+# ============================================================
+def run_sync_job(job_id: str) -> None:
+    job = job_model.get_job(job_id)
+    if job is None:
+        return
+
+    # Heartbeat: mostra que o worker está vivo mesmo em fases sem progresso
+    # (treino da IA, metas). Jobs sem heartbeat voltam para a fila.
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(settings.sync_job_heartbeat_seconds):
+            job_model.update_progress(job_id)
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+
+    def progress(processed: int, total: int):
+        job_model.update_progress(job_id, processed, total)
+
+    try:
+        steam_services.sync_steam_library(
+            job["user_id"],
+            job["payload"]["steam_id"],
+            full=job["payload"].get("full", False),
+            progress=progress,
+            raise_errors=True,
+        )
+        job_model.finish_job(job_id)
+    except Exception as e:
+        print(f"[Jobs] Sincronização {job_id} falhou: {e}")
+        job_model.fail_job(job_id, str(e))
+    finally:
+        stop.set()
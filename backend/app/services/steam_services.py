@@ -1,5 +1,8 @@
-import requests
+import asyncio
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 import httpx
 from fastapi import HTTPException
 from pydantic import ValidationError
@@ -7,7 +10,18 @@ from pydantic import ValidationError
 from app.services import ai_services
 from ..config import settings
 from ..schemas import game_schema
-from ..models import game_model
+from ..models import game_model, app_model
+from ..utils.ttl_cache import TTLCache
+from ..utils.steam_achievements import (
+    achievement_schema_cache,
+    fetch_player_achievements,
+    fetch_total_achievements,
+    parse_achievement_schema,
+    parse_player_achievements,
+    warm_achievement_schema_cache,
+)
+from ..utils.steam_client import SteamAPIError, steam_get, steam_get_async
+from ..utils.http_client import aclose_async_http_client, get_async_http_client
 
 # Tentativa de import do MetaModel
 try:
@@ -15,7 +29,7 @@ try:
 except ImportError:
     class MetaModel:
         @staticmethod
-        def update_goals(user_id):
+        def update_goals(user_id, snapshot=None):
             print(f"Aviso: MetaModel não encontrado. Ignorando update de metas para {user_id}.")
 
 
@@ -27,13 +41,17 @@ async def validate_steam_id(steam_id: str):
     Verifica se o Steam ID existe e se o perfil é público.
     Se inválido, lança HTTPException com mensagem clara.
     """
-    url = (
-        f"http://api.steampowered.com/ISteamUser/GetPlayerSummaries/v0002/"
-        f"?key={settings.steam_api_key}&steamids={steam_id}"
-    )
+    url = "http://api.steampowered.com/ISteamUser/GetPlayerSummaries/v0002/"
+    params = {"key": settings.steam_api_key, "steamids": steam_id}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
+    try:
+        # Está no caminho da requisição do usuário: falha rápido em vez de esperar retries
+        response = await steam_get_async(
+            get_async_http_client(), "GetPlayerSummaries", url, params,
+            timeout=settings.steam_validate_timeout_seconds, retries=0,
+        )
+    except SteamAPIError:
+        raise HTTPException(status_code=502, detail="Erro ao comunicar com a Steam")
 
     if response.status_code != 200:
         raise HTTPException(status_code=502, detail="Erro ao comunicar com a Steam")
@@ -61,22 +79,103 @@ STEAM_PLAYER_API_URL = "http://api.steampowered.com"
 STEAM_STORE_API_URL = "https://store.steampowered.com/api/appdetails"
 
 
+# Erro da loja que não adianta repetir (appid sem página na loja)
+STORE_NOT_FOUND = "Jogo não encontrado"
+
+
+class SteamSyncError(Exception):
+    """Falha que impede a sincronização (perfil privado, chave inválida...)."""
+
+
 class SteamService:
     """Wrapper simples usado no Auth Router."""
     @staticmethod
-    def sync_library(user_id: str, steam_id: str):
-        return sync_steam_library(user_id, steam_id)
+    def sync_library(user_id: str, steam_id: str, full: bool = False):
+        return sync_steam_library(user_id, steam_id, full=full)
+
+
+# ===========================================================
+# CACHE COMPARTILHADO DOS DETALHES DA LOJA (TODOS OS USUÁRIOS)
+# ===========================================================
+# Memória (LRU + TTL) na frente da coleção "apps" do Firestore, que
+# sobrevive a reinícios. Os dados da loja não dependem do usuário.
+store_details_cache = TTLCache(
+    maxsize=settings.store_cache_max_entries,
+    ttl=settings.store_cache_ttl_seconds,
+)
+
+
+def get_cached_store_details(appid: int):
+    """Retorna os dados da loja em cache (memória ou Firestore) ou None."""
+    appid = int(appid)
+    details = store_details_cache.get(appid)
+    if details is None:
+        details = app_model.get_store_details(
+            [appid], max_age=settings.store_cache_ttl_seconds
+        ).get(appid)
+        if details:
+            store_details_cache.set(appid, details)
+    return details
+
+
+# Página de detalhes com cópia vencida: a resposta sai na hora com a cópia e
+# a loja é consultada em segundo plano (uma vez por appid).
+_store_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="store-refresh")
+_store_refreshing = set()
+_store_refresh_lock = threading.Lock()
+
+
+def refresh_store_details_in_background(appid: int) -> bool:
+    """Agenda a atualização dos dados da loja; False se já há uma em andamento."""
+    appid = int(appid)
+    with _store_refresh_lock:
+        if appid in _store_refreshing:
+            return False
+        _store_refreshing.add(appid)
+
+    def refresh():
+        try:
+            details = download_store_details(appid)
+            if "error" in details:
+                print(f"[Steam] Atualização da loja de {appid} falhou: {details['error']}")
+        finally:
+            with _store_refresh_lock:
+                _store_refreshing.discard(appid)
+
+    try:
+        _store_refresh_executor.submit(refresh)
+    except Exception:
+        with _store_refresh_lock:
+            _store_refreshing.discard(appid)
+        raise
+    return True
+
+
+def warm_store_details_cache(appids) -> int:
+    """Carrega do Firestore, em uma única leitura em lote, os appids que não estão em memória."""
+    missing = [int(a) for a in appids if int(a) not in store_details_cache]
+    persisted = app_model.get_store_details(missing, max_age=settings.store_cache_ttl_seconds)
+    for appid, details in persisted.items():
+        store_details_cache.set(appid, details)
+    return len(persisted)
 
 
 # ===========================================================
 # BUSCAR DETALHES DO JOGO NA LOJA STEAM
 # ===========================================================
 def fetch_game_details_from_store(appid: int) -> dict:
+    cached = get_cached_store_details(appid)
+    if cached is not None:
+        return cached
+    return download_store_details(appid)
+
+
+def download_store_details(appid: int) -> dict:
+    """Consulta a loja Steam e, se der certo, grava na memória e em apps/{appid}."""
     params = {"appids": appid, "cc": "br", "l": "brazilian"}
 
     try:
-        time.sleep(0.1)
-        response = requests.get(STEAM_STORE_API_URL, params=params, timeout=10)
+        response = steam_get("appdetails", STEAM_STORE_API_URL, params, timeout=10)
 
         if response.status_code != 200:
             return {"error": f"HTTP {response.status_code}"}
@@ -85,158 +184,474 @@ def fetch_game_details_from_store(appid: int) -> dict:
         game_data = data.get(str(appid), {})
 
         if not game_data.get("success"):
-            return {"error": "Jogo não encontrado"}
+            return {"error": STORE_NOT_FOUND}
 
-        return game_data.get("data", {})
+        details = game_data.get("data", {})
+        store_details_cache.set(int(appid), details)
+        app_model.save_store_details({int(appid): details})
+        return details
 
     except Exception as e:
         return {"error": f"Erro loja: {e}"}
 
 
 # ===========================================================
-# CONQUISTAS — TOTAL E OBTIDAS PELO JOGADOR
+# VERSÕES ASSÍNCRONAS (USADAS NA SINCRONIZAÇÃO EM LOTE)
 # ===========================================================
-def fetch_total_achievements(appid: int) -> int:
-    url = (
-        f"{STEAM_PLAYER_API_URL}/ISteamUserStats/GetSchemaForGame/v2/"
-        f"?key={settings.steam_api_key}&appid={appid}"
-    )
+class HostLimiter:
+    """
+    Limita o número de requisições simultâneas por host da Steam.
+    A loja (store.steampowered.com) é bem mais restritiva que a Web API.
+    """
+
+    def __init__(self, limits: dict, default: int = 8):
+        self._semaphores = {host: asyncio.Semaphore(n) for host, n in limits.items()}
+        self._default = default
+
+    def for_url(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self._default)
+        return self._semaphores[host]
+
+
+def build_host_limiter() -> HostLimiter:
+    return HostLimiter({
+        httpx.URL(STEAM_STORE_API_URL).host: settings.steam_store_max_concurrency,
+        httpx.URL(STEAM_PLAYER_API_URL).host: settings.steam_api_max_concurrency,
+    })
+
+
+async def _limited_get(client: httpx.AsyncClient, limiter: HostLimiter, endpoint: str,
+                       url: str, params: dict = None, timeout: float = 10) -> httpx.Response:
+    async with limiter.for_url(url):
+        return await steam_get_async(client, endpoint, url, params, timeout=timeout)
+
+
+async def fetch_game_details_from_store_async(client: httpx.AsyncClient, limiter: HostLimiter,
+                                              appid: int) -> dict:
+    params = {"appids": appid, "cc": "br", "l": "brazilian"}
+
     try:
-        r = requests.get(url, timeout=5)
-        if r.status_code == 200:
-            data = r.json()
-            ach = (
-                data.get("game", {})
-                .get("availableGameStats", {})
-                .get("achievements")
-            )
-            return len(ach) if ach else 0
-    except:
-        pass
-    return 0
-
-
-def fetch_player_achievements(steam_id: str, appid: int) -> int:
-    url = (
-        f"{STEAM_PLAYER_API_URL}/ISteamUserStats/GetPlayerAchievements/v1/"
-        f"?key={settings.steam_api_key}&steamid={steam_id}&appid={appid}"
-    )
+        response = await _limited_get(client, limiter, "appdetails", STEAM_STORE_API_URL, params, timeout=10)
+
+        if response.status_code != 200:
+            return {"error": f"HTTP {response.status_code}"}
+
+        game_data = response.json().get(str(appid), {})
+
+        if not game_data.get("success"):
+            return {"error": STORE_NOT_FOUND}
+
+        return game_data.get("data", {})
+
+    except Exception as e:
+        return {"error": f"Erro loja: {e}"}
+
+
+async def fetch_achievement_schema_async(client: httpx.AsyncClient, limiter: HostLimiter,
+                                         appid: int) -> dict | None:
+    url = f"{STEAM_PLAYER_API_URL}/ISteamUserStats/GetSchemaForGame/v2/"
+    params = {"key": settings.steam_api_key, "appid": appid}
     try:
-        r = requests.get(url, timeout=5)
+        r = await _limited_get(client, limiter, "GetSchemaForGame", url, params, timeout=5)
         if r.status_code == 200:
-            data = r.json()
-            ach = data.get("playerstats", {}).get("achievements")
-            if ach:
-                return sum(1 for a in ach if a.get("achieved") == 1)
-    except:
-        pass
-    return 0
+            return parse_achievement_schema(r.json())
+        print(f"[Steam] GetSchemaForGame {appid}: HTTP {r.status_code}")
+    except Exception as e:
+        print(f"[Steam] GetSchemaForGame {appid}: {e}")
+    return None
+
+
+async def fetch_player_achievements_async(client: httpx.AsyncClient, limiter: HostLimiter,
+                                          steam_id: str, appid: int) -> int | None:
+    url = f"{STEAM_PLAYER_API_URL}/ISteamUserStats/GetPlayerAchievements/v1/"
+    params = {"key": settings.steam_api_key, "steamid": steam_id, "appid": appid}
+    try:
+        r = await _limited_get(client, limiter, "GetPlayerAchievements", url, params, timeout=5)
+        return parse_player_achievements(r, appid)
+    except Exception as e:
+        print(f"[Steam] GetPlayerAchievements {appid}: {e}")
+    return None
 
 
 # ===========================================================
 # SINCRONIZAÇÃO DA BIBLIOTECA
 # ===========================================================
-def sync_steam_library(user_id: str, steam_id: str) -> list:
-    print(f"Iniciando sincronização completa para {user_id}...")
+# Intervalo (em jogos) entre atualizações de progresso do job
+BATCH_SIZE = 10
 
-    if not settings.steam_api_key:
-        print("ERRO: steam_api_key não encontrada.")
-        return []
+# Campos por appid repassados às metas ao fim da sincronização
+GOAL_SNAPSHOT_FIELDS = ["name", "horas_jogadas", "conquistas_totais", "conquistas_obtidas"]
 
-    url = (
-        f"{STEAM_PLAYER_API_URL}/IPlayerService/GetOwnedGames/v1/"
-        f"?key={settings.steam_api_key}&steamid={steam_id}&format=json"
-        f"&include_appinfo=true&include_played_free_games=true"
-    )
 
+def apply_store_details(game_dict: dict, full_details: dict) -> None:
+    """
+    Copia para o documento do jogo só os campos leves (card + features da IA).
+    O payload completo da loja fica uma vez por appid na coleção "apps" e é
+    juntado sob demanda no detalhe do jogo (store_detail_fields).
+    """
+    game_dict["img_logo_url"] = full_details.get("header_image")
+
+    if "genres" in full_details:
+        game_dict["generos"] = [g["description"] for g in full_details["genres"]]
+        game_dict["genero"] = ", ".join(game_dict["generos"])
+
+    if "categories" in full_details:
+        game_dict["categorias"] = ", ".join(c["description"] for c in full_details["categories"])
+
+    if isinstance(full_details.get("metacritic"), dict):
+        game_dict["metacritic"] = full_details["metacritic"].get("score")
+
+    if isinstance(full_details.get("release_date"), dict):
+        game_dict["data_lancamento"] = full_details["release_date"].get("date")
+
+    price = full_details.get("price_overview")
+    if isinstance(price, dict):
+        game_dict["preco"] = {
+            "moeda": price.get("currency"),
+            "preco_original": price.get("initial"),
+            "preco_final": price.get("final"),
+            "desconto_percentual": price.get("discount_percent"),
+        }
+
+
+def store_detail_fields(full_details: dict) -> dict:
+    """Campos pesados do detalhe do jogo, montados a partir do payload da loja."""
+    fields = {
+        "descricao": full_details.get("short_description"),
+        "descricao_completa": full_details.get("detailed_description"),
+        "sobre": full_details.get("about_the_game"),
+        "linguas": full_details.get("supported_languages"),
+    }
+
+    if "developers" in full_details:
+        fields["desenvolvedor"] = ", ".join(full_details["developers"])
+
+    if "publishers" in full_details:
+        fields["publisher"] = ", ".join(full_details["publishers"])
+
+    requirements = full_details.get("pc_requirements")
+    if isinstance(requirements, dict):
+        fields["requisitos_minimos"] = requirements.get("minimum")
+        fields["requisitos_recomendados"] = requirements.get("recommended")
+
+    return {k: v for k, v in fields.items() if v is not None}
+
+
+def get_store_detail_fields(appid: int) -> dict:
+    """
+    Detalhes pesados de um appid para a página do jogo. A cópia salva em
+    apps/{appid} é servida seja qual for a idade (vencida, é atualizada em
+    segundo plano); só espera a Steam quando não existe cópia nenhuma.
+    """
+    appid = int(appid)
+    details = store_details_cache.get(appid)
+
+    if details is None:
+        stored = app_model.get_store_details_with_timestamp([appid]).get(appid)
+        if stored is None:
+            details = download_store_details(appid)
+        else:
+            details, updated_at = stored
+            if time.time() - updated_at > settings.store_cache_ttl_seconds:
+                refresh_store_details_in_background(appid)
+            else:
+                store_details_cache.set(appid, details)
+
+    if not details or "error" in details:
+        return {}
+    return store_detail_fields(details)
+
+
+async def enrich_game_async(client: httpx.AsyncClient, limiter: HostLimiter,
+                            steam_id: str, game_dict: dict, new_app_data: dict):
+    """
+    Completa um jogo do GetOwnedGames com loja + conquistas.
+    Retorna None se o app não for um jogo ou não passar na validação.
+    Dados por appid baixados agora (loja e schema de conquistas) vão para
+    new_app_data, que é persistido em lote no fim da sincronização.
+
+    Se alguma chamada à Steam falhar, o jogo volta com enriquecido=False e
+    sem os campos que faltaram: a próxima sincronização incremental o trata
+    como novo e tenta de novo.
+    """
+    appid = int(game_dict["appid"])
+    game_dict["appid"] = appid
+    completo = True
+
+    # Detalhes da loja (cache compartilhado primeiro)
+    full_details = store_details_cache.get(appid)
+    if full_details is None:
+        full_details = await fetch_game_details_from_store_async(client, limiter, appid)
+        if not full_details.get("error"):
+            store_details_cache.set(appid, full_details)
+            new_app_data["store"][appid] = full_details
+
+    # "Jogo não encontrado" é definitivo; HTTP/rede/circuit breaker não
+    if full_details.get("error") and full_details["error"] != STORE_NOT_FOUND:
+        completo = False
+
+    if not full_details.get("error"):
+        app_type = full_details.get("type", "").lower()
+        if app_type != "game":
+            return None
+        apply_store_details(game_dict, full_details)
+
+    # Status
+    if "playtime_forever" in game_dict:
+        game_dict["horas_jogadas"] = round(game_dict["playtime_forever"] / 60)
+        game_dict["status"] = (
+            "Iniciado" if game_dict["horas_jogadas"] > 0 else "Não Iniciado"
+        )
+
+    # Conquistas (schema em cache compartilhado)
+    schema = achievement_schema_cache.get(appid)
+    if schema is None:
+        schema = await fetch_achievement_schema_async(client, limiter, appid)
+        if schema is not None:
+            achievement_schema_cache.set(appid, schema)
+            new_app_data["achievements"][appid] = schema
+
+    # Se a Steam falhar, o campo fica fora do payload em vez de virar 0
+    if schema is not None:
+        game_dict["conquistas_totais"] = schema["total"]
+        if schema["total"] > 0:
+            obtidas = await fetch_player_achievements_async(client, limiter, steam_id, appid)
+            if obtidas is not None:
+                game_dict["conquistas_obtidas"] = obtidas
+            else:
+                completo = False
+    else:
+        completo = False
+
+    game_dict["enriquecido"] = completo
+
+    # Validação Pydantic
     try:
-        response = requests.get(url, timeout=15)
+        return game_schema.GameBase(**game_dict)
+    except ValidationError as e:
+        print(f"Erro validação jogo {appid}: {e}")
+        return None
 
-        if response.status_code == 403:
-            print("Erro 403: SteamID privado ou chave inválida.")
-            return []
 
-        response.raise_for_status()
-        data = response.json()
+def build_goal_snapshot(stored_state: dict, synced_games: list, updates: dict) -> dict:
+    """
+    Estado de cada appid logo após a sincronização ({appid: {name, horas_jogadas,
+    conquistas_*}}): o que já estava salvo + jogos novos + campos alterados.
+    As metas são calculadas em cima disso, sem voltar à Steam.
+    """
+    snapshot = {appid: dict(state) for appid, state in stored_state.items()}
+
+    for game in synced_games:
+        snapshot[int(game.appid)] = game.model_dump(include=set(GOAL_SNAPSHOT_FIELDS), exclude_unset=True)
+
+    for appid, fields in updates.items():
+        snapshot.setdefault(int(appid), {}).update(fields)
+
+    return snapshot
+
 
-        if "response" not in data or "games" not in data["response"]:
-            print("Biblioteca vazia ou perfil privado.")
-            return []
+def split_library_changes(steam_games: list, stored_state: dict) -> tuple:
+    """
+    Compara o GetOwnedGames com o que já está no Firestore.
+    Retorna (jogos novos, [(jogo alterado, estado salvo), ...]); jogos sem
+    mudança de playtime_forever / rtime_last_played ficam de fora. Jogos
+    salvos com enriquecido=False (a Steam falhou) contam como novos.
+    """
+    new_games, changed_games = [], []
+
+    for game_dict in steam_games:
+        stored = stored_state.get(int(game_dict["appid"]))
+        if stored is None or stored.get("enriquecido") is False:
+            new_games.append(game_dict)
+        elif (
+            stored.get("playtime_forever") != game_dict.get("playtime_forever", 0)
+            or stored.get("rtime_last_played") != game_dict.get("rtime_last_played")
+        ):
+            changed_games.append((game_dict, stored))
+
+    return new_games, changed_games
 
-        steam_games = data["response"]["games"]
-        print(f"{len(steam_games)} jogos encontrados. Processando...")
 
-        batch_buffer = []
-        BATCH_SIZE = 10
+async def refresh_changed_game_async(client: httpx.AsyncClient, limiter: HostLimiter,
+                                     steam_id: str, game_dict: dict, stored: dict) -> dict:
+    """
+    Recalcula apenas os campos que dependem do jogador (loja e schema não mudam)
+    e devolve somente os que diferem do documento salvo.
+    """
+    playtime = game_dict.get("playtime_forever", 0)
+    fields = {
+        "playtime_forever": playtime,
+        "rtime_last_played": game_dict.get("rtime_last_played"),
+        "horas_jogadas": round(playtime / 60),
+    }
+
+    if (stored.get("conquistas_totais") or 0) > 0:
+        obtidas = await fetch_player_achievements_async(
+            client, limiter, steam_id, int(game_dict["appid"])
+        )
+        if obtidas is not None:
+            fields["conquistas_obtidas"] = obtidas
+
+    return {k: v for k, v in fields.items() if stored.get(k) != v}
 
-        for game_dict in steam_games:
-            if "appid" not in game_dict:
+
+async def sync_steam_library_async(user_id: str, steam_id: str, full: bool = False,
+                                   progress=None) -> list:
+    """
+    Sincroniza a biblioteca processando vários jogos em paralelo.
+    A concorrência é limitada por host (ver settings.steam_*_max_concurrency)
+    e os jogos são gravados a cada settings.sync_write_flush_size, com o
+    BulkWriter dividindo cada gravação em lotes paralelos.
+
+    Por padrão a sincronização é incremental: só jogos novos são enriquecidos
+    por completo e jogos com tempo de jogo alterado recebem apenas os campos
+    que mudaram. Com full=True a biblioteca inteira é reprocessada.
+
+    progress(processados, total) é chamado a cada lote gravado. Erros sobem
+    para quem chamou (ver sync_steam_library).
+    """
+    modo = "completa" if full else "incremental"
+    print(f"Iniciando sincronização {modo} para {user_id}...")
+
+    if not settings.steam_api_key:
+        raise SteamSyncError("steam_api_key não encontrada.")
+
+    url = f"{STEAM_PLAYER_API_URL}/IPlayerService/GetOwnedGames/v1/"
+    params = {
+        "key": settings.steam_api_key,
+        "steamid": steam_id,
+        "format": "json",
+        "include_appinfo": "true",
+        "include_played_free_games": "true",
+    }
+
+    limiter = build_host_limiter()
+    synced_games = []
+
+    client = get_async_http_client()
+    response = await _limited_get(client, limiter, "GetOwnedGames", url, params, timeout=15)
+
+    if response.status_code == 403:
+        raise SteamSyncError("Erro 403: SteamID privado ou chave inválida.")
+
+    response.raise_for_status()
+    data = response.json()
+
+    if "response" not in data or "games" not in data["response"]:
+        print("Biblioteca vazia ou perfil privado.")
+        return []
+
+    steam_games = [g for g in data["response"]["games"] if "appid" in g]
+    print(f"{len(steam_games)} jogos encontrados. Processando...")
+
+    stored_state = {} if full else await asyncio.to_thread(game_model.get_steam_sync_state, user_id)
+    steam_games, changed_games = split_library_changes(steam_games, stored_state)
+    print(f"{len(steam_games)} jogos novos e {len(changed_games)} alterados desde a última sincronização.")
+
+    total = len(steam_games) + len(changed_games)
+    if progress:
+        await asyncio.to_thread(progress, 0, total)
+
+    appids = [g["appid"] for g in steam_games]
+    cached = await asyncio.gather(
+        asyncio.to_thread(warm_store_details_cache, appids),
+        asyncio.to_thread(warm_achievement_schema_cache, appids),
+    )
+    print(f"Cache persistente: {cached[0]} lojas e {cached[1]} schemas de conquistas recuperados.")
+
+    new_app_data = {"store": {}, "achievements": {}}
+    tasks = [
+        asyncio.create_task(
+            enrich_game_async(client, limiter, steam_id, game_dict, new_app_data)
+        )
+        for game_dict in steam_games
+    ]
+
+    batch_buffer = []
+    processed = 0
+    try:
+        for finished in asyncio.as_completed(tasks):
+            game_data = await finished
+            processed += 1
+            if progress and processed % BATCH_SIZE == 0:
+                await asyncio.to_thread(progress, processed, total)
+            if game_data is None:
                 continue
 
-            appid = int(game_dict["appid"])
-            game_dict["appid"] = appid
-
-            # Detalhes da loja
-            full_details = fetch_game_details_from_store(appid)
-
-            if not full_details.get("error"):
-                app_type = full_details.get("type", "").lower()
-                if app_type != "game":
-                    continue
-
-                game_dict["img_logo_url"] = full_details.get("header_image")
-                game_dict["dados_loja"] = full_details
-                game_dict["descricao"] = full_details.get("short_description")
-                game_dict["descricao_completa"] = full_details.get("detailed_description")
-
-                if "genres" in full_details:
-                    game_dict["genero"] = ", ".join(g["description"] for g in full_details["genres"])
-
-                if "developers" in full_details:
-                    game_dict["desenvolvedor"] = ", ".join(full_details["developers"])
-
-                if "publishers" in full_details:
-                    game_dict["publisher"] = ", ".join(full_details["publishers"])
-
-            # Status
-            if "playtime_forever" in game_dict:
-                game_dict["horas_jogadas"] = round(game_dict["playtime_forever"] / 60)
-                game_dict["status"] = (
-                    "Iniciado" if game_dict["horas_jogadas"] > 0 else "Não Iniciado"
-                )
-
-            # Conquistas
-            game_dict["conquistas_totais"] = fetch_total_achievements(appid)
-            if game_dict["conquistas_totais"] > 0:
-                game_dict["conquistas_obtidas"] = fetch_player_achievements(steam_id, appid)
-
-            # Validação Pydantic
-            try:
-                game_data = game_schema.GameBase(**game_dict)
-                batch_buffer.append(game_data)
-            except ValidationError as e:
-                print(f"Erro validação jogo {appid}: {e}")
-
-            # Salvar lote
-            if len(batch_buffer) >= BATCH_SIZE:
-                game_model.sync_steam_games_batch(user_id, batch_buffer)
+            batch_buffer.append(game_data)
+            synced_games.append(game_data)
+
+            # Salvar lote (Firestore é síncrono, então roda fora do event loop);
+            # o BulkWriter divide e paraleliza os commits
+            if len(batch_buffer) >= settings.sync_write_flush_size:
+                await asyncio.to_thread(game_model.sync_steam_games_batch, user_id, batch_buffer)
                 batch_buffer = []
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    # Último lote
+    if batch_buffer:
+        await asyncio.to_thread(game_model.sync_steam_games_batch, user_id, batch_buffer)
+
+    # Jogos já existentes que mudaram: grava só os campos diferentes
+    changed_fields = await asyncio.gather(*(
+        refresh_changed_game_async(client, limiter, steam_id, game_dict, stored)
+        for game_dict, stored in changed_games
+    ))
+    updates = {
+        int(game_dict["appid"]): fields
+        for (game_dict, _), fields in zip(changed_games, changed_fields)
+        if fields
+    }
+    await asyncio.to_thread(game_model.update_steam_games_fields, user_id, updates)
+
+    if progress:
+        await asyncio.to_thread(progress, total, total)
+
+    # Novos dados por appid vão para o cache compartilhado
+    await asyncio.gather(
+        asyncio.to_thread(app_model.save_store_details, new_app_data["store"]),
+        asyncio.to_thread(app_model.save_achievement_schemas, new_app_data["achievements"]),
+    )
 
-        # Último lote
-        if batch_buffer:
-            game_model.sync_steam_games_batch(user_id, batch_buffer)
+    if not synced_games and not updates:
+        print("Nenhuma mudança desde a última sincronização.")
+        return synced_games
 
-        print("Atualizando metas...")
-        MetaModel.update_goals(user_id)
+    print("Atualizando metas...")
+    snapshot = build_goal_snapshot(stored_state, synced_games, updates)
+    await asyncio.to_thread(MetaModel.update_goals, user_id, snapshot)
 
-        print("Treinando IA...")
-        ai_services.train_and_save_model(user_id)
+    print("Treinando IA...")
+    await asyncio.to_thread(ai_services.train_and_save_model, user_id)
+
+    print("Sincronização concluída.")
+    return synced_games
 
-        print("Sincronização concluída.")
-        return []
 
+def sync_steam_library(user_id: str, steam_id: str, full: bool = False,
+                       progress=None, raise_errors: bool = False) -> list:
+    """
+    Ponto de entrada síncrono (o worker de jobs roda isto em um processo
+    separado, então aqui podemos abrir um event loop próprio).
+    Com raise_errors=False os erros são apenas logados e a lista volta vazia.
+    """
+    async def _run():
+        try:
+            return await sync_steam_library_async(user_id, steam_id, full=full, progress=progress)
+        finally:
+            # O loop desta sincronização acaba aqui; libera o pool de conexões dele
+            await aclose_async_http_client()
+
+    try:
+        return asyncio.run(_run())
     except Exception as e:
         print(f"Erro fatal na sincronização: {e}")
+        if raise_errors:
+            raise
         return []
 
 
@@ -251,7 +666,7 @@ def fetch_steam_user_profile(steam_id: str) -> dict:
     params = {"key": settings.steam_api_key, "steamids": steam_id}
 
     try:
-        r = requests.get(url, params=params, timeout=5)
+        r = steam_get("GetPlayerSummaries", url, params, timeout=5)
         r.raise_for_status()
         data = r.json()
 
@@ -275,7 +690,12 @@ def fetch_steam_user_profile(steam_id: str) -> dict:
 
 __all__ = [
     "sync_steam_library",
+    "sync_steam_library_async",
+    "SteamSyncError",
     "fetch_steam_user_profile",
     "validate_steam_id",
+    "fetch_game_details_from_store",
+    "fetch_total_achievements",
+    "fetch_player_achievements",
     "SteamService"
 ]
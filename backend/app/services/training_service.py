@@ -0,0 +1,123 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+from ..config import settings
+from ..utils import executors
+from . import ai_services
+
+# Retreino da IA disparado por edições na biblioteca. Uma rajada de edições
+# (ex.: marcar 20 jogos como "Finalizado") vira um treino só: cada pedido
+# adia o treino do usuário (debounce), pedidos repetidos se juntam e há um
+# limite de treinos rodando ao mesmo tempo no processo.
+
+# Campos do jogo que mudam o conjunto de treino (features ou rótulo)
+TRAINING_FIELDS = set(ai_services.FEATURE_SOURCE_FIELDS) - {"appid", "name"}
+
+
+def _submit_training(user_id: str, full: bool) -> Future:
+    return executors.submit_cpu_bound(ai_services.train_and_save_model, user_id, full)
+
+
+class RetrainScheduler:
+    def __init__(self, submit: Callable[[str, bool], Future] = None, delay: float = None,
+                 max_delay: float = None, max_running: int = None):
+        self._submit = submit or _submit_training
+        self._delay = settings.ai_retrain_debounce_seconds if delay is None else delay
+        self._max_delay = settings.ai_retrain_max_delay_seconds if max_delay is None else max_delay
+        self._max_running = max_running or settings.ai_retrain_max_concurrent
+
+        self._cond = threading.Condition()
+        # {user_id: {"first": primeiro pedido, "due": quando treinar, "full": bool}}
+        self._pending: Dict[str, dict] = {}
+        self._running = set()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def request(self, user_id: str, full: bool = False, delay: float = None) -> None:
+        """Agenda (ou adia) o treino do usuário. Nunca espera o treino."""
+        now = time.monotonic()
+        delay = self._delay if delay is None else delay
+
+        with self._cond:
+            entry = self._pending.setdefault(user_id, {"first": now, "full": False})
+            entry["full"] = entry["full"] or full
+            # Edições contínuas não adiam para sempre: no máximo max_delay após o primeiro pedido
+            entry["due"] = min(now + delay, entry["first"] + self._max_delay)
+            self._stopped = False
+            self._ensure_thread()
+            self._cond.notify()
+
+    def status(self, user_id: str) -> Optional[str]:
+        with self._cond:
+            if user_id in self._running:
+                return "running"
+            if user_id in self._pending:
+                return "scheduled"
+            return None
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="ai-retrain", daemon=True)
+            self._thread.start()
+
+    def _loop(self) -> None:
+        with self._cond:
+            while not self._stopped:
+                now = time.monotonic()
+
+                # Usuário com treino rodando espera ele acabar: o pedido novo vira o próximo treino
+                waiting = {u: e for u, e in self._pending.items() if u not in self._running}
+                ready = sorted((u for u, e in waiting.items() if e["due"] <= now),
+                               key=lambda u: waiting[u]["due"])
+
+                for user_id in ready:
+                    if len(self._running) >= self._max_running:
+                        break
+                    self._start(user_id, self._pending.pop(user_id))
+
+                future_dues = [e["due"] - now for u, e in self._pending.items()
+                               if u not in self._running and e["due"] > now]
+                self._cond.wait(min(future_dues) if future_dues else None)
+
+    def _start(self, user_id: str, entry: dict) -> None:
+        try:
+            future = self._submit(user_id, entry["full"])
+        except Exception as e:
+            print(f"[IA] Retreino de {user_id} adiado: {e}")
+            entry["due"] = time.monotonic() + self._delay
+            self._pending[user_id] = entry
+            return
+
+        self._running.add(user_id)
+        future.add_done_callback(lambda f: self._finished(user_id, f))
+
+    def _finished(self, user_id: str, future: Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[IA] Erro no retreino de {user_id}: {future.exception()}")
+
+        with self._cond:
+            self._running.discard(user_id)
+            self._cond.notify()
+
+
+retrain_scheduler = RetrainScheduler()
+
+
+def schedule_retrain(user_id: str, full: bool = False, delay: float = None) -> None:
+    retrain_scheduler.request(user_id, full=full, delay=delay)
+
+
+def schedule_retrain_if_relevant(user_id: str, changed_fields) -> bool:
+    """Só edições que mexem nas features ou no rótulo (status) pedem retreino."""
+    if not set(changed_fields) & TRAINING_FIELDS:
+        return False
+    schedule_retrain(user_id)
+    return True
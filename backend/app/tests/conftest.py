@@ -1,11 +1,246 @@
 # app/tests/conftest.py
 
+import itertools
+import threading
+import time
+
 import pytest
 from fastapi.testclient import TestClient
+from firebase_admin import firestore
+from google.api_core import exceptions as google_exceptions
 
+from app.config import settings
 from app.main import app
 
 
 @pytest.fixture(scope="session")
 def client() -> TestClient:
     return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def local_db(tmp_path, monkeypatch):
+    # Cada teste usa um SQLite local próprio, nunca app/local_data.
+    monkeypatch.setattr(settings, "local_db_path", str(tmp_path / "gametrack.sqlite3"))
+
+
+# ===========================================================
+# FIRESTORE EM MEMÓRIA (compartilhado pelos testes dos models)
+# ===========================================================
+class FakeSnapshot:
+    def __init__(self, path, data):
+        self.path = path
+        self.id = path.split("/")[-1]
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocumentRef:
+    def __init__(self, db, path):
+        self._db = db
+        self.path = path
+        self.id = path.split("/")[-1]
+
+    def collection(self, name):
+        return FakeQuery(self._db, f"{self.path}/{name}")
+
+    def get(self):
+        self._db.reads += 1
+        return FakeSnapshot(self.path, self._db.docs.get(self.path))
+
+    def set(self, data, merge=False):
+        batch = self._db.batch()
+        batch.set(self, data, merge=merge)
+        batch.commit()
+
+    def update(self, data):
+        batch = self._db.batch()
+        batch.update(self, data)
+        batch.commit()
+
+    def delete(self):
+        batch = self._db.batch()
+        batch.delete(self)
+        batch.commit()
+
+
+class FakeQuery:
+    """Coleção/consulta: filtros, ordenação, cursor e projeção como no Firestore."""
+
+    def __init__(self, db, path, filters=(), orders=(), cursor=None, count=None, fields=None):
+        self._db = db
+        self.path = path
+        self._filters = filters
+        self._orders = orders
+        self._cursor = cursor
+        self._count = count
+        self._fields = fields
+
+    def _with(self, **changes):
+        state = {
+            "filters": self._filters, "orders": self._orders, "cursor": self._cursor,
+            "count": self._count, "fields": self._fields,
+        }
+        state.update(changes)
+        return FakeQuery(self._db, self.path, **state)
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            doc_id = f"auto{next(self._db.auto_ids)}"
+        return FakeDocumentRef(self._db, f"{self.path}/{doc_id}")
+
+    def select(self, fields):
+        self._db.select_calls.append(list(fields))
+        return self._with(fields=list(fields))
+
+    def where(self, filter):
+        return self._with(filters=self._filters + (filter,))
+
+    def order_by(self, field, direction=firestore.Query.ASCENDING):
+        return self._with(orders=self._orders + ((field, direction),))
+
+    def start_after(self, snapshot):
+        return self._with(cursor=snapshot.path)
+
+    def limit(self, count):
+        return self._with(count=count)
+
+    def _matches(self, data):
+        for f in self._filters:
+            value = data.get(f.field_path)
+            if f.op_string == "==" and value != f.value:
+                return False
+            if f.op_string == "in" and value not in f.value:
+                return False
+            if f.op_string == "array_contains" and f.value not in (value or []):
+                return False
+        return True
+
+    def stream(self):
+        db = self._db
+        db.reads += 1
+        prefix = self.path + "/"
+        docs = [
+            (path, data) for path, data in sorted(db.docs.items())
+            if path.startswith(prefix) and "/" not in path[len(prefix):] and self._matches(data)
+        ]
+
+        # Como no Firestore, ordenar por um campo exclui quem não tem o campo
+        for field, direction in reversed(self._orders):
+            docs = [d for d in docs if field in d[1]]
+            docs.sort(key=lambda d: (d[1][field], d[0]), reverse=direction == firestore.Query.DESCENDING)
+
+        if self._cursor is not None:
+            paths = [path for path, _ in docs]
+            docs = docs[paths.index(self._cursor) + 1:]
+        if self._count is not None:
+            docs = docs[:self._count]
+
+        # Projeção só na leitura: filtros e ordenação enxergam o documento inteiro
+        if self._fields is not None:
+            roots = {f.split(".")[0] for f in self._fields}
+            docs = [(path, {k: v for k, v in data.items() if k in roots}) for path, data in docs]
+
+        return iter([FakeSnapshot(path, data) for path, data in docs])
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._ops = []
+
+    def set(self, ref, data, merge=False):
+        self._ops.append(("set_merge" if merge else "set", ref.path, data))
+
+    def update(self, ref, data):
+        self._ops.append(("update", ref.path, data))
+
+    def delete(self, ref):
+        self._ops.append(("delete", ref.path, None))
+
+    def commit(self):
+        db = self._db
+        with db._lock:
+            db.active += 1
+            db.max_active = max(db.max_active, db.active)
+        try:
+            time.sleep(db.commit_delay)
+            with db._lock:
+                db.attempts += 1
+                self._check_failures()
+                for kind, path, data in self._ops:
+                    db.apply(kind, path, data)
+                db.commits.append(list(self._ops))
+        finally:
+            with db._lock:
+                db.active -= 1
+
+    def _check_failures(self):
+        db = self._db
+        if db.error:
+            raise db.error
+        if db.aborts:
+            db.aborts -= 1
+            raise google_exceptions.Aborted("contenção")
+        # Como no Firestore, update em documento inexistente falha o lote inteiro
+        if any(kind == "update" and path not in db.docs for kind, path, _ in self._ops):
+            raise google_exceptions.NotFound("documento não existe")
+
+
+class FakeFirestore:
+    """
+    Firestore em memória, documentos indexados pelo caminho completo
+    ("users/u1/games/730"). Conta leituras e commits para os testes de
+    round-trips e permite injetar falhas nos commits (aborts, error, commit_delay).
+    """
+
+    def __init__(self, docs=None):
+        self.docs = {path: dict(data) for path, data in (docs or {}).items()}
+        self.reads = 0
+        self.commits = []
+        self.select_calls = []
+        self.get_all_calls = []
+        self.auto_ids = itertools.count(1)
+
+        self.attempts = 0
+        self.aborts = 0
+        self.error = None
+        self.commit_delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def collection(self, name):
+        return FakeQuery(self, name)
+
+    def document(self, path):
+        return FakeDocumentRef(self, path)
+
+    def get_all(self, refs):
+        refs = list(refs)
+        self.reads += 1
+        self.get_all_calls.append([ref.path for ref in refs])
+        return [FakeSnapshot(ref.path, self.docs.get(ref.path)) for ref in refs]
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def apply(self, kind, path, data):
+        if kind == "delete":
+            self.docs.pop(path, None)
+            return
+        stored = {} if kind == "set" else dict(self.docs.get(path, {}))
+        for field, value in data.items():
+            if value is firestore.DELETE_FIELD:
+                stored.pop(field, None)
+            else:
+                stored[field] = value
+        self.docs[path] = stored
+
+
+@pytest.fixture
+def fake_firestore() -> FakeFirestore:
+    return FakeFirestore()
@@ -0,0 +1,378 @@
+# app/tests/test_ai_features.py
+
+import random
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import MultiLabelBinarizer
+
+from app.schemas.game_schema import GameStatus
+from app.services import ai_services
+
+
+def legacy_prepare_data_for_ai(games_list):
+    """Implementação original (linha a linha), usada como referência."""
+    df = pd.DataFrame(games_list)
+
+    df["target_finalizado"] = df["status"].apply(
+        lambda x: 1 if x == GameStatus.finalizado.value else 0
+    )
+
+    df["playtime_forever"] = df.get("playtime_forever", 0).fillna(0)
+    df["log_playtime"] = df["playtime_forever"].apply(lambda x: np.log1p(x))
+    df["nota_pessoal"] = df.get("nota_pessoal", 0).fillna(0)
+    df["metacritic"] = df.get("metacritic", 0).fillna(0)
+
+    def extract_log_final_price(price_data):
+        if isinstance(price_data, dict):
+            price_raw = price_data.get("preco_final")
+            if isinstance(price_raw, (int, float)):
+                return np.log1p(price_raw / 100)
+        return 0
+    df["log_final_price"] = df.get("preco", None).apply(extract_log_final_price)
+
+    meses_pt_en = {
+        "jan.": "Jan", "fev.": "Feb", "mar.": "Mar", "abr.": "Apr",
+        "mai.": "May", "jun.": "Jun", "jul.": "Jul", "ago.": "Aug",
+        "set.": "Sep", "out.": "Oct", "nov.": "Nov", "dez.": "Dec"
+    }
+    def calcular_idade(data_str):
+        if not isinstance(data_str, str) or not data_str.strip(): return 0
+        data_lower = data_str.lower()
+        for pt, en in meses_pt_en.items():
+            if pt in data_lower:
+                data_lower = data_lower.replace(pt, en)
+                break
+        try:
+            dt = pd.to_datetime(data_lower, errors="coerce")
+            if pd.isna(dt): return 0
+            return (datetime.now() - dt).days
+        except: return 0
+
+    df["idade_lancamento_dias"] = df.get("data_lancamento", "").apply(calcular_idade)
+
+    df["interesse"] = df.get("interesse", "N/A").fillna("N/A")
+    interesse_map = {"N/A": 0, "Baixo": 1, "Médio": 2, "Alto": 3}
+    df["nivel_interesse_numerico"] = df["interesse"].map(interesse_map).fillna(0)
+
+    df["genero_list"] = df.get("genero", "").fillna("").astype(str).str.split(", ")
+    df["categoria_list"] = df.get("categorias", "").fillna("").astype(str).str.split(", ")
+
+    mlb_gen = MultiLabelBinarizer()
+    genero_bin = mlb_gen.fit_transform(df["genero_list"])
+    genero_df = pd.DataFrame(genero_bin, columns=[f"gen_{g}" for g in mlb_gen.classes_])
+
+    mlb_cat = MultiLabelBinarizer()
+    cat_bin = mlb_cat.fit_transform(df["categoria_list"])
+    categoria_df = pd.DataFrame(cat_bin, columns=[f"cat_{c}" for c in mlb_cat.classes_])
+
+    return pd.concat([df.reset_index(drop=True), genero_df, categoria_df], axis=1)
+
+
+DATAS = [
+    "12 nov., 2020", "3 mar. 2018", "21 ago. 2012", "1 jan. 2000", "5 dez., 2023",
+    "12 Nov, 2020", "Nov 3, 2019", "2020-01-05", "01/02/2020", "2020", "Mar 2018",
+    "21 de ago. de 2012", "Em breve", "", "   ", None, 20200101,
+]
+
+
+def prepare_data_for_ai(games_list):
+    """Tabela densa (jogo + features) com as funções vetorizadas; referência da matriz esparsa."""
+    df = ai_services._feature_frame(pd.DataFrame(games_list))
+
+    mlb_gen = MultiLabelBinarizer()
+    genero_bin = mlb_gen.fit_transform(df["genero_list"])
+    genero_df = pd.DataFrame(genero_bin, columns=[f"gen_{g}" for g in mlb_gen.classes_])
+
+    mlb_cat = MultiLabelBinarizer()
+    cat_bin = mlb_cat.fit_transform(df["categoria_list"])
+    categoria_df = pd.DataFrame(cat_bin, columns=[f"cat_{c}" for c in mlb_cat.classes_])
+
+    return pd.concat([df.reset_index(drop=True), genero_df, categoria_df], axis=1)
+
+
+def make_library(n, seed=42):
+    rnd = random.Random(seed)
+    generos = ["Ação", "RPG", "Indie", "Estratégia", "Aventura"]
+    categorias = ["Um jogador", "Multijogador", "Conquistas Steam", "Co-op"]
+    status = [s.value for s in GameStatus]
+    games = []
+    for i in range(n):
+        preco = rnd.choice([
+            {"preco_final": rnd.randint(0, 30000), "moeda": "BRL"},
+            {"preco_final": None},
+            {"preco_final": "grátis"},
+            {},
+            None,
+        ])
+        games.append({
+            "appid": str(i),
+            "name": f"Jogo {i}",
+            "status": rnd.choice(status),
+            "playtime_forever": rnd.choice([0, rnd.randint(1, 50000), None]),
+            "nota_pessoal": rnd.choice([None, 0, rnd.randint(1, 10)]),
+            "metacritic": rnd.choice([None, rnd.randint(40, 99)]),
+            "preco": preco,
+            "data_lancamento": rnd.choice(DATAS),
+            "interesse": rnd.choice([None, "N/A", "Baixo", "Médio", "Alto"]),
+            "genero": rnd.choice([None, ", ".join(rnd.sample(generos, rnd.randint(1, 3)))]),
+            "categorias": rnd.choice([None, ", ".join(rnd.sample(categorias, rnd.randint(1, 2)))]),
+        })
+    return games
+
+
+def test_vectorized_features_match_legacy_implementation():
+    games = make_library(500)
+
+    expected = legacy_prepare_data_for_ai(games)
+    result = prepare_data_for_ai(games)
+
+    assert list(result.columns) == list(expected.columns)
+
+    numeric_cols = [
+        c for c in expected.columns
+        if c.startswith(("gen_", "cat_")) or c in (
+            "target_finalizado", "log_playtime", "nota_pessoal", "metacritic",
+            "nivel_interesse_numerico", "idade_lancamento_dias", "log_final_price",
+        )
+    ]
+    np.testing.assert_array_equal(
+        result[numeric_cols].to_numpy(dtype=float),
+        expected[numeric_cols].to_numpy(dtype=float),
+    )
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_release_age_ignores_invalid_dates():
+    idades = ai_services._idade_lancamento_dias(
+        pd.Series(["Em breve", None, "", "1 jan. 2000"]), datetime(2000, 1, 11)
+    )
+    assert idades.tolist() == [0, 0, 0, 10]
+
+
+def test_feature_matrix_is_sparse_and_matches_dense_features():
+    games = make_library(300)
+    for game in games:
+        game["dados_loja"] = {"detailed_description": "x" * 1000}
+        game["descricao_completa"] = "texto longo"
+
+    frame, X, features = ai_services.prepare_feature_matrix(games)
+    dense = prepare_data_for_ai(games)
+
+    assert sparse.issparse(X) and X.format == "csr"
+    assert X.shape == (len(games), len(features))
+    assert "dados_loja" not in frame.columns
+    assert "descricao_completa" not in frame.columns
+    assert features[:len(ai_services.NUMERIC_FEATURES)] == ai_services.NUMERIC_FEATURES
+
+    np.testing.assert_array_equal(
+        X.toarray(), dense[features].fillna(0).to_numpy(dtype=float)
+    )
+
+
+def test_feature_matrix_uses_given_vocabulary():
+    games = make_library(50)
+    _, _, features = ai_services.prepare_feature_matrix(games)
+
+    novos = make_library(10, seed=7)
+    novos[0]["genero"] = "Gênero Inédito"
+    _, X, same_features = ai_services.prepare_feature_matrix(novos, features)
+
+    assert same_features == features
+    assert X.shape == (10, len(features))
+    assert "gen_Gênero Inédito" not in features
+
+
+def test_train_and_predict_on_sparse_features(tmp_path, monkeypatch):
+    games = make_library(80)
+    monkeypatch.setattr(ai_services.game_model, "get_user_games", lambda user_id, projection=None: games)
+    monkeypatch.setattr(ai_services, "MODEL_DIR", str(tmp_path))
+
+    trained = ai_services.train_and_save_model("user_1")
+    assert trained["status"] == "success"
+
+    result = ai_services.generate_recommendations("user_1")
+    assert 0 < len(result["recommendations"]) <= 10
+
+
+
+def test_export_frames_are_chunked_with_a_fixed_schema(monkeypatch):
+    games = make_library(45)
+    games[-1]["genero"] = "Só no fim"
+
+    def fake_iter(user_id, projection=None, page_size=500):
+        for i in range(0, len(games), page_size):
+            yield [dict(g) for g in games[i:i + page_size]]
+
+    monkeypatch.setattr(ai_services.game_model, "iter_user_games", fake_iter)
+
+    frames = list(ai_services.iter_export_frames("user_1", chunk_size=20))
+
+    assert [len(f) for f in frames] == [20, 20, 5]
+    # Tag que só aparece no último pedaço já tem coluna desde o primeiro
+    assert all(list(f.columns) == list(frames[0].columns) for f in frames)
+    assert "gen_Só no fim" in frames[0].columns
+    assert all(list(f.dtypes) == list(frames[0].dtypes) for f in frames)
+
+    exported = pd.concat(frames, ignore_index=True)
+    reference = prepare_data_for_ai([dict(g) for g in games])
+    for column in ["target_finalizado", "log_playtime", "log_final_price", "gen_RPG", "cat_Co-op"]:
+        np.testing.assert_allclose(exported[column].to_numpy(dtype=float), reference[column].to_numpy(dtype=float))
+
+
+def test_retraining_is_incremental_until_vocabulary_or_labels_drift(tmp_path, monkeypatch):
+    games = make_library(200, seed=7)
+    for i, game in enumerate(games[:40]):
+        game["status"] = GameStatus.finalizado.value if i % 2 else GameStatus.abandonado.value
+    monkeypatch.setattr(ai_services.game_model, "get_user_games", lambda user_id, projection=None: [dict(g) for g in games])
+    monkeypatch.setattr(ai_services, "MODEL_DIR", str(tmp_path))
+    ai_services.model_cache.clear()
+
+    def trees():
+        return ai_services.load_model_artifact("user_1")["model"].n_estimators
+
+    assert ai_services.train_and_save_model("user_1")["mode"] == "full"
+    assert ai_services.train_and_save_model("user_1")["mode"] == "unchanged"
+
+    # Um rótulo mudou: só algumas árvores novas
+    games[0]["status"] = GameStatus.finalizado.value
+    assert ai_services.train_and_save_model("user_1")["mode"] == "incremental"
+    assert trees() == 100 + ai_services.settings.ai_incremental_trees
+
+    # Muitos rótulos mudaram desde o último treino completo
+    for game in games[:40]:
+        game["status"] = GameStatus.finalizado.value if game["status"] != GameStatus.finalizado.value else GameStatus.abandonado.value
+    assert ai_services.train_and_save_model("user_1")["mode"] == "full"
+    assert trees() == 100
+
+    # Tag nova muda o vocabulário
+    games[1]["genero"] = "Gênero Novo"
+    assert ai_services.train_and_save_model("user_1")["mode"] == "full"
+
+    assert ai_services.train_and_save_model("user_1", full=True)["mode"] == "full"
+
+
+def test_incremental_training_does_not_touch_the_served_model(tmp_path, monkeypatch):
+    games = make_library(200, seed=7)
+    for i, game in enumerate(games[:40]):
+        game["status"] = GameStatus.finalizado.value if i % 2 else GameStatus.abandonado.value
+    monkeypatch.setattr(ai_services, "MODEL_DIR", str(tmp_path))
+    ai_services.model_cache.clear()
+
+    assert ai_services.train_from_games("user_1", games)["mode"] == "full"
+    served = ai_services.load_model_artifact("user_1")
+    served_model = served["model"]
+
+    def failing_dump(*args, **kwargs):
+        raise OSError("disco cheio")
+
+    games[0]["status"] = GameStatus.finalizado.value
+    monkeypatch.setattr(ai_services.joblib, "dump", failing_dump)
+    assert ai_services.train_from_games("user_1", games)["status"] == "error"
+
+    # A gravação falhou: o cache continua com o mesmo modelo, sem árvores novas
+    assert ai_services.load_model_artifact("user_1") is served
+    assert served_model.n_estimators == 100
+    assert len(served_model.estimators_) == 100
+    assert served_model.get_params()["warm_start"] is False
+
+    monkeypatch.undo()
+    monkeypatch.setattr(ai_services, "MODEL_DIR", str(tmp_path))
+    assert ai_services.train_from_games("user_1", games)["mode"] == "incremental"
+    assert ai_services.load_model_artifact("user_1")["model"] is not served_model
+    assert served_model.n_estimators == 100
+
+
+def test_artifact_is_compressed_and_versioned(tmp_path, monkeypatch):
+    import os
+    import pickle
+
+    import joblib
+
+    games = make_library(300, seed=3)
+    monkeypatch.setattr(ai_services, "MODEL_DIR", str(tmp_path))
+    ai_services.model_cache.clear()
+
+    assert ai_services.train_from_games("user_1", games)["status"] == "success"
+
+    path = ai_services.get_model_path("user_1")
+    artifact = joblib.load(path)
+    assert artifact["schema_version"] == ai_services.ARTIFACT_SCHEMA_VERSION
+    assert artifact["features"][:len(ai_services.NUMERIC_FEATURES)] == ai_services.NUMERIC_FEATURES
+    assert os.path.getsize(path) * 3 < len(pickle.dumps(artifact))
+
+
+def test_legacy_and_unknown_artifacts(tmp_path, monkeypatch):
+    import joblib
+
+    games = make_library(300, seed=3)
+    monkeypatch.setattr(ai_services, "MODEL_DIR", str(tmp_path))
+    ai_services.model_cache.clear()
+    path = ai_services.get_model_path("user_1")
+
+    # Formato antigo: pickle sem compressão, só modelo e features
+    frame, X, features = ai_services.prepare_feature_matrix(games)
+    legacy_model = ai_services.get_model_instance().fit(X, frame["target_finalizado"].to_numpy())
+    joblib.dump({"model": legacy_model, "features": features, "last_trained": "2024-01-01"}, path)
+
+    assert ai_services.load_model_artifact("user_1")["model"] is not None
+    assert ai_services.train_from_games("user_1", games)["mode"] == "full"
+    assert joblib.load(path)["schema_version"] == ai_services.ARTIFACT_SCHEMA_VERSION
+
+    # Formato de uma versão futura: ignorado, como se não houvesse modelo
+    artifact = joblib.load(path)
+    artifact["schema_version"] = ai_services.ARTIFACT_SCHEMA_VERSION + 1
+    joblib.dump(artifact, path)
+    ai_services.model_cache.clear()
+    assert ai_services.load_model_artifact("user_1") is None
+
+
+def test_xgboost_engine_trains_incrementally_and_reports_metrics(tmp_path, monkeypatch):
+    games = make_library(200, seed=11)
+    for i, game in enumerate(games[:40]):
+        game["status"] = GameStatus.finalizado.value if i % 2 else GameStatus.abandonado.value
+    monkeypatch.setattr(ai_services.game_model, "get_user_games", lambda user_id, projection=None: [dict(g) for g in games])
+    monkeypatch.setattr(ai_services, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(ai_services.settings, "ai_model_engine", "xgboost_hist")
+    ai_services.model_cache.clear()
+
+    trained = ai_services.train_and_save_model("user_1")
+    assert trained["engine"] == "xgboost_hist"
+    assert trained["mode"] == "full"
+    assert trained["train_seconds"] >= 0 and trained["model_bytes"] > 0
+
+    games[0]["status"] = GameStatus.finalizado.value
+    assert ai_services.train_and_save_model("user_1")["mode"] == "incremental"
+
+    result = ai_services.generate_recommendations("user_1")
+    assert 0 < len(result["recommendations"]) <= 10
+
+    info = ai_services.describe_model("user_1")
+    assert info["engine"] == "xgboost_hist"
+    assert info["trees"] == 100 + ai_services.settings.ai_incremental_trees
+    assert info["inference"]["predictions"] >= 1
+
+    # Trocar a engine da implantação força um treino completo
+    monkeypatch.setattr(ai_services.settings, "ai_model_engine", "random_forest")
+    retrained = ai_services.train_and_save_model("user_1")
+    assert (retrained["engine"], retrained["mode"]) == ("random_forest", "full")
+
+
+def test_benchmark_compares_engines():
+    report = ai_services.benchmark_engines(make_library(300, seed=5))
+
+    assert set(report) == set(ai_services.ENGINES)
+    for metrics in report.values():
+        assert metrics["train_seconds"] > 0
+        assert metrics["inference_ms"] > 0
+        assert metrics["model_bytes"] > 0
+    assert report["xgboost_hist"]["model_bytes"] < report["random_forest"]["model_bytes"]
+
+
+def test_unknown_engine_is_rejected():
+    import pytest
+
+    with pytest.raises(ValueError):
+        ai_services.get_engine("svm")
@@ -0,0 +1,45 @@
+# app/tests/test_app_model.py
+
+import time
+
+import pytest
+
+from app.models import app_model
+
+
+@pytest.fixture
+def apps_db(fake_firestore, monkeypatch):
+    monkeypatch.setattr(app_model, "db", fake_firestore)
+    return fake_firestore
+
+
+def test_reads_are_batched_in_get_all_chunks(apps_db, monkeypatch):
+    monkeypatch.setattr(app_model, "GET_ALL_CHUNK", 2)
+    app_model.save_store_details({a: {"name": f"Jogo {a}"} for a in range(5)})
+
+    found = app_model.get_store_details(range(5))
+
+    assert sorted(found) == list(range(5))
+    assert [len(call) for call in apps_db.get_all_calls] == [2, 2, 1]
+
+
+def test_max_age_skips_old_entries(apps_db):
+    app_model.save_store_details({730: {"name": "CS"}, 440: {"name": "TF2"}})
+    apps_db.docs["apps/440"]["dados_loja_atualizado_em"] -= 3600
+
+    assert list(app_model.get_store_details([730, 440], max_age=60)) == [730]
+    assert sorted(app_model.get_store_details([730, 440])) == [440, 730]
+
+    details, updated_at = app_model.get_store_details_with_timestamp([440])[440]
+    assert details == {"name": "TF2"}
+    assert time.time() - updated_at > 3000
+
+
+def test_store_and_achievement_fields_share_the_app_document(apps_db):
+    app_model.save_store_details({730: {"name": "CS"}})
+    app_model.save_achievement_schemas({730: {"total": 1, "nomes": ["a"]}})
+
+    # merge=True: gravar um campo não apaga o outro
+    assert app_model.get_store_details([730]) == {730: {"name": "CS"}}
+    assert app_model.get_achievement_schemas([730]) == {730: {"total": 1, "nomes": ["a"]}}
+    assert app_model.get_achievement_schemas([999]) == {}
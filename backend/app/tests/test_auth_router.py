@@ -1,5 +1,7 @@
 # app/tests/test_auth_router.py
 
+import time
+
 from fastapi.routing import APIRoute
 
 def _find_route(client, contains: str, method: str):
@@ -36,3 +38,43 @@ def test_register_returns_400_when_invalid_email(client):
 
     # EmailStr vai explodir 422 se JSON for inválido
     assert resp.status_code in {400, 422}
+
+
+def test_verify_token_checks_signature_once_per_token(monkeypatch):
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app.routers import auth_router
+
+    auth_router.verified_token_cache.clear()
+    calls = []
+
+    def fake_verify(token, clock_skew_seconds=0):
+        calls.append(token)
+        return {"uid": "user_1", "exp": time.time() + 3600}
+
+    monkeypatch.setattr(auth_router.auth, "verify_id_token", fake_verify)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token-a")
+
+    for _ in range(5):
+        assert auth_router.verify_token(credentials)["uid"] == "user_1"
+
+    assert calls == ["token-a"]
+
+
+def test_verify_token_does_not_cache_expired_claims(monkeypatch):
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app.routers import auth_router
+
+    auth_router.verified_token_cache.clear()
+    calls = []
+
+    def fake_verify(token, clock_skew_seconds=0):
+        calls.append(token)
+        return {"uid": "user_1", "exp": time.time() - 1}
+
+    monkeypatch.setattr(auth_router.auth, "verify_id_token", fake_verify)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token-b")
+
+    auth_router.verify_token(credentials)
+    auth_router.verify_token(credentials)
+
+    assert len(calls) == 2
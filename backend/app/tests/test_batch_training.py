@@ -0,0 +1,44 @@
+# app/tests/test_batch_training.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app import batch_training
+from app.services import ai_services
+from app.tests.test_ai_features import make_library
+
+
+def test_trains_every_user_and_writes_artifacts(tmp_path, monkeypatch):
+    libraries = {f"user_{i}": make_library(60, seed=i) for i in range(6)}
+    libraries["vazio"] = []
+    fetched = []
+
+    def fake_get_user_games(user_id, projection=None):
+        fetched.append((user_id, projection))
+        return [dict(g) for g in libraries[user_id]]
+
+    monkeypatch.setattr(batch_training.game_model, "get_user_games", fake_get_user_games)
+    monkeypatch.setattr(ai_services, "MODEL_DIR", str(tmp_path))
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        report = batch_training.train_all_users(
+            workers=2, n_jobs=1, user_ids=list(libraries), pool=pool
+        )
+
+    assert sorted(u for u, _ in fetched) == sorted(libraries)
+    assert all(projection == "features" for _, projection in fetched)
+    assert report["results"]["vazio"]["status"] == "error"
+    assert report["summary"]["full"] == 6
+
+    # Só os modelos finais: nenhum arquivo temporário sobra no diretório
+    assert sorted(os.listdir(tmp_path)) == sorted(f"model_user_{i}.pkl" for i in range(6))
+    artifact = ai_services.load_model_artifact("user_0")
+    assert artifact["model"].n_jobs is None
+
+
+def test_plan_workers_splits_cores():
+    cpus = batch_training.available_cpus()
+
+    assert batch_training.plan_workers(workers=1) == (1, cpus)
+    assert batch_training.plan_workers(workers=cpus * 2, n_jobs=3) == (cpus * 2, 3)
+    assert batch_training.plan_workers(workers=cpus)[1] == 1
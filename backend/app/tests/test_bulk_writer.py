@@ -0,0 +1,88 @@
+# app/tests/test_bulk_writer.py
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.config import settings
+from app.models.bulk_writer import FIRESTORE_MAX_BATCH, BulkWriter
+
+
+def _seed_games(db, count):
+    for i in range(count):
+        db.docs[f"games/{i}"] = {"n": 0}
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "firestore_bulk_backoff_base_seconds", 0.0)
+
+
+def test_splits_into_batches_under_the_firestore_limit(fake_firestore):
+    writer = BulkWriter(fake_firestore)
+    for i in range(1200):
+        writer.set(fake_firestore.document(f"games/{i}"), {"n": i})
+
+    result = writer.commit()
+
+    assert result.ok and result.written == 1200
+    assert len(fake_firestore.commits) == 3
+    assert max(len(batch) for batch in fake_firestore.commits) <= FIRESTORE_MAX_BATCH
+    assert len(writer) == 0
+
+
+def test_large_payloads_split_by_size(fake_firestore):
+    writer = BulkWriter(fake_firestore, max_batch_bytes=1024 * 1024)
+    for i in range(10):
+        writer.set(fake_firestore.document(f"apps/{i}"), {"dados_loja": "x" * 300 * 1024})
+
+    assert writer.commit().written == 10
+    assert all(len(batch) <= 3 for batch in fake_firestore.commits)
+
+
+def test_retries_on_contention(fake_firestore):
+    _seed_games(fake_firestore, 2)
+    fake_firestore.aborts = 2
+    writer = BulkWriter(fake_firestore)
+    writer.update(fake_firestore.document("games/1"), {"n": 1})
+
+    result = writer.commit()
+
+    assert result.ok and result.written == 1
+
+
+def test_reports_only_the_failing_document(fake_firestore):
+    _seed_games(fake_firestore, 20)
+    # update em documento que não existe: NotFound só para ele
+    del fake_firestore.docs["games/7"]
+    writer = BulkWriter(fake_firestore)
+    for i in range(20):
+        writer.update(fake_firestore.document(f"games/{i}"), {"n": i})
+
+    result = writer.commit()
+
+    assert result.written == 19
+    assert list(result.failures) == ["games/7"]
+
+
+def test_batch_wide_error_fails_fast_without_splitting(fake_firestore):
+    _seed_games(fake_firestore, 20)
+    fake_firestore.error = google_exceptions.PermissionDenied("sem permissão")
+    writer = BulkWriter(fake_firestore)
+    for i in range(20):
+        writer.update(fake_firestore.document(f"games/{i}"), {"n": i})
+
+    result = writer.commit()
+
+    assert fake_firestore.attempts == 1
+    assert result.written == 0
+    assert len(result.failures) == 20
+
+
+def test_commits_batches_in_parallel(fake_firestore):
+    fake_firestore.commit_delay = 0.05
+    writer = BulkWriter(fake_firestore, max_batch=10, parallel=4)
+    for i in range(40):
+        writer.delete(fake_firestore.document(f"games/{i}"))
+
+    assert writer.commit().written == 40
+    assert fake_firestore.max_active > 1
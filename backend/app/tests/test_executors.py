@@ -0,0 +1,37 @@
+# app/tests/test_executors.py
+
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils import executors
+
+
+def test_run_io_bound_returns_result_without_blocking_loop():
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result = await executors.run_io_bound(lambda: time.sleep(0.2) or "ok")
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+
+    assert result == "ok"
+    assert ticks >= 5
+
+
+def test_run_io_bound_times_out_with_504():
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(executors.run_io_bound(time.sleep, 0.5, timeout=0.05))
+
+    assert exc.value.status_code == 504
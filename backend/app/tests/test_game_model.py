@@ -0,0 +1,168 @@
+# app/tests/test_game_model.py
+
+import pytest
+from app.models import game_model
+
+
+GAMES = "users/user_1/games"
+
+
+@pytest.fixture
+def fake_db(fake_firestore, monkeypatch):
+    monkeypatch.setattr(game_model, "db", fake_firestore)
+    return fake_firestore
+
+
+def _seed(db, games):
+    for doc_id, data in games.items():
+        db.docs[f"{GAMES}/{doc_id}"] = data
+    return db
+
+
+def _library():
+    return {"730": {
+        "appid": 730, "name": "CS", "status": "Jogando", "horas_jogadas": 10,
+        "dados_loja": {"detailed_description": "x" * 5000},
+        "descricao_completa": "<p>longo</p>",
+    }}
+
+
+def _big_library(size):
+    status = ["Jogando", "Finalizado", "Não Iniciado"]
+    return {
+        str(i): {
+            "appid": i, "name": f"Jogo {i:03d}", "status": status[i % 3],
+            "horas_jogadas": i % 7, "generos": ["RPG"] if i % 2 else ["Ação"],
+            "descricao_completa": "<p>longo</p>",
+        }
+        for i in range(size)
+    }
+
+
+def test_card_projection_skips_heavy_fields(fake_db):
+    _seed(fake_db, _library())
+
+    games = game_model.get_user_games("user_1", projection="card")
+
+    assert fake_db.select_calls == [game_model.PROJECTIONS["card"]]
+    assert games == [{"appid": "730", "name": "CS", "status": "Jogando", "horas_jogadas": 10}]
+
+
+def test_full_read_without_projection(fake_db):
+    _seed(fake_db, _library())
+
+    games = game_model.get_user_games("user_1")
+
+    assert fake_db.select_calls == []
+    assert "dados_loja" in games[0]
+
+
+def test_pages_follow_cursor_until_the_end(fake_db):
+    _seed(fake_db, _big_library(25))
+
+    names, cursor, pages = [], None, 0
+    while True:
+        games, cursor = game_model.list_user_games_page("user_1", 10, start_after=cursor)
+        names += [g["name"] for g in games]
+        pages += 1
+        assert len(games) <= 10
+        assert all("descricao_completa" not in g for g in games)
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert names == sorted(f"Jogo {i:03d}" for i in range(25))
+
+
+def test_page_filters_and_sort(fake_db):
+    _seed(fake_db, _big_library(30))
+
+    games, cursor = game_model.list_user_games_page(
+        "user_1", 50, sort="horas_jogadas", descending=True, status="Jogando", genero="RPG"
+    )
+
+    assert cursor is None
+    assert games
+    assert all(g["status"] == "Jogando" for g in games)
+    horas = [g["horas_jogadas"] for g in games]
+    assert horas == sorted(horas, reverse=True)
+
+
+def test_invalid_cursor_and_sort_are_rejected(fake_db):
+    _seed(fake_db, _big_library(5))
+
+    with pytest.raises(ValueError):
+        game_model.list_user_games_page("user_1", 10, start_after="nao-existe")
+    with pytest.raises(ValueError):
+        game_model.list_user_games_page("user_1", 10, sort="descricao")
+
+
+def test_split_generos():
+    assert game_model.split_generos("Ação, RPG") == ["Ação", "RPG"]
+    assert game_model.split_generos(None) == []
+
+
+def test_iter_user_games_reads_in_pages(fake_db):
+    _seed(fake_db, _big_library(25))
+
+    pages = list(game_model.iter_user_games("user_1", projection="card", page_size=10))
+
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert sorted(g["appid"] for page in pages for g in page) == sorted(str(i) for i in range(25))
+    assert all("descricao_completa" not in g for page in pages for g in page)
+
+
+def test_backfill_puts_old_and_manual_games_in_filters_and_sorts(fake_db, monkeypatch):
+    monkeypatch.setattr(game_model, "bump_library_version", lambda user_id: 1)
+    _seed(fake_db, {
+        "730": {"name": "CS", "status": "Jogando", "horas_jogadas": 10, "genero": "Ação"},
+        "manual1": {"name": "Manual", "genero": "RPG, Indie"},
+        "440": {"name": "TF2", "status": "Jogando", "horas_jogadas": 3,
+                "genero": "Ação", "generos": ["Ação"]},
+    })
+
+    assert game_model.list_user_games_page("user_1", 10, genero="Ação")[0] == [
+        {"appid": "440", "name": "TF2", "status": "Jogando", "horas_jogadas": 3, "genero": "Ação"}
+    ]
+
+    assert game_model.backfill_list_fields("user_1") == 2
+    # Segunda execução não tem o que fazer
+    assert game_model.backfill_list_fields("user_1") == 0
+
+    acao, _ = game_model.list_user_games_page("user_1", 10, genero="Ação")
+    assert sorted(g["name"] for g in acao) == ["CS", "TF2"]
+    by_hours, _ = game_model.list_user_games_page("user_1", 10, sort="horas_jogadas")
+    assert [g["name"] for g in by_hours] == ["Manual", "TF2", "CS"]
+    assert game_model.list_user_games_page("user_1", 10, genero="Indie")[0][0]["status"] == "Não Iniciado"
+
+
+def test_incremental_update_keeps_generos_in_sync_and_drops_heavy_fields(fake_db, monkeypatch):
+    monkeypatch.setattr(game_model, "bump_library_version", lambda user_id: 1)
+    _seed(fake_db, {"730": {
+        "name": "CS", "genero": "Ação", "generos": ["Ação"],
+        "dados_loja": {"detailed_description": "x" * 5000}, "descricao_completa": "<p>longo</p>",
+    }})
+
+    game_model.update_steam_games_fields("user_1", {730: {"genero": "Ação, Estratégia"}})
+
+    assert fake_db.docs[f"{GAMES}/730"] == {
+        "name": "CS", "genero": "Ação, Estratégia", "generos": ["Ação", "Estratégia"],
+    }
+
+
+def test_migration_removes_heavy_fields_from_unchanged_games(fake_db):
+    manual = {"name": "Jogo Indie", "descricao": "Escrita pelo usuário", "desenvolvedor": "Eu"}
+    _seed(fake_db, {
+        **_library(),
+        "440": {"name": "TF2", "status": "Jogando"},
+        "aB3xYmanual": dict(manual),
+    })
+
+    assert game_model.remove_heavy_store_fields("user_1") == 1
+    assert game_model.remove_heavy_store_fields("user_1") == 0
+
+    assert fake_db.docs[f"{GAMES}/730"] == {
+        "appid": 730, "name": "CS", "status": "Jogando", "horas_jogadas": 10,
+    }
+    # Jogo manual: descrição e desenvolvedor são do usuário e não voltam de apps/{appid}
+    assert fake_db.docs[f"{GAMES}/aB3xYmanual"] == manual
@@ -0,0 +1,51 @@
+# app/tests/test_job_service.py
+
+import time
+
+from app.models import job_model
+from app.services import job_service
+
+
+def test_enqueue_deduplicates_active_sync_per_user():
+    first, created_first = job_service.enqueue_steam_sync("user_1", "765")
+    second, created_second = job_service.enqueue_steam_sync("user_1", "765")
+    other, _ = job_service.enqueue_steam_sync("user_2", "999")
+
+    assert created_first is True
+    assert created_second is False
+    assert second["id"] == first["id"]
+    assert other["id"] != first["id"]
+
+
+def test_finished_job_allows_new_sync():
+    first, _ = job_service.enqueue_steam_sync("user_1", "765")
+    claimed = job_model.claim_next_job(job_service.SYNC_JOB)
+    job_model.finish_job(claimed["id"])
+
+    second, created = job_service.enqueue_steam_sync("user_1", "765")
+
+    assert created is True
+    assert second["id"] != first["id"]
+
+
+def test_status_reports_progress_and_eta():
+    job, _ = job_service.enqueue_steam_sync("user_1", "765")
+    job_model.claim_next_job(job_service.SYNC_JOB)
+    time.sleep(0.2)
+    job_model.update_progress(job["id"], 50, 200)
+
+    status = job_service.get_sync_job_status(job["id"])
+
+    assert status["status"] == job_model.STATUS_RUNNING
+    assert (status["processed"], status["total"]) == (50, 200)
+    assert status["eta_seconds"] is not None and status["eta_seconds"] > 0
+
+
+def test_stale_running_job_goes_back_to_queue():
+    job, _ = job_service.enqueue_steam_sync("user_1", "765")
+    job_model.claim_next_job(job_service.SYNC_JOB)
+
+    requeued = job_model.requeue_stale_jobs(job_service.SYNC_JOB, stale_after=-1, max_attempts=3)
+
+    assert requeued == 1
+    assert job_model.get_job(job["id"])["status"] == job_model.STATUS_QUEUED
@@ -0,0 +1,82 @@
+# app/tests/test_meta_model.py
+
+import pytest
+
+from app.models import game_model, meta_model
+from app.models.meta_model import MetaModel
+
+
+@pytest.fixture
+def fake_db(fake_firestore, monkeypatch):
+    fake_firestore.docs.update({
+        "users/user_1": {"steam_id": "765"},
+        "users/user_1/metas/m1": {"tipo": "TEMPO", "game_name": "Hades", "valor_meta": "Chegar a 100 horas"},
+        "users/user_1/metas/m2": {"tipo": "CONCLUSAO", "game_name": "Celeste"},
+        "users/user_1/metas/m3": {"tipo": "TEMPO", "game_name": "Inexistente", "valor_meta": "10"},
+        "users/user_1/metas/m4": {"tipo": "TEMPO", "game_name": "Hades", "valor_meta": "50h",
+                                  "progresso_atual": "60h de 50h", "percentual": 100, "status": "CONCLUIDA"},
+        "users/user_1/games/1145360": {"appid": 1145360, "name": "Hades", "horas_jogadas": 60},
+        "users/user_1/games/504230": {"appid": 504230, "name": "Celeste", "horas_jogadas": 20},
+    })
+    monkeypatch.setattr(meta_model, "db", fake_firestore)
+    monkeypatch.setattr(game_model, "db", fake_firestore)
+    monkeypatch.setattr(meta_model, "fetch_player_achievements", lambda steam_id, appid: 30)
+    monkeypatch.setattr(meta_model, "fetch_total_achievements", lambda appid: 30)
+    return fake_firestore
+
+
+def _written(fake_db):
+    """{meta_id: campos} gravados no primeiro commit."""
+    return {path.split("/")[-1]: data for _, path, data in fake_db.commits[0]}
+
+
+def test_update_goals_reads_once_and_commits_once(fake_db):
+    changed = MetaModel.update_goals("user_1")
+
+    # metas + jogos + documento do usuário; um commit só
+    assert fake_db.reads == 3
+    assert len(fake_db.commits) == 1
+    assert changed == 2
+
+    written = _written(fake_db)
+    assert written["m1"] == {"progresso_atual": "60h de 100h", "percentual": 60.0, "status": "EM ANDAMENTO"}
+    assert written["m2"] == {"progresso_atual": "30/30", "percentual": 100.0, "status": "CONCLUIDA"}
+    assert "m4" not in written  # já estava em dia
+
+
+def test_completion_goal_keeps_progress_when_steam_fails(fake_db, monkeypatch):
+    monkeypatch.setattr(meta_model, "fetch_player_achievements", lambda steam_id, appid: None)
+
+    MetaModel.update_goals("user_1")
+
+    assert "m2" not in _written(fake_db)
+
+
+def test_sync_snapshot_scores_goals_without_reads_or_steam_calls(fake_db, monkeypatch):
+    def no_steam(*args):
+        raise AssertionError("não deveria chamar a Steam")
+
+    monkeypatch.setattr(meta_model, "fetch_player_achievements", no_steam)
+    monkeypatch.setattr(meta_model, "fetch_total_achievements", no_steam)
+
+    snapshot = {
+        1145360: {"name": "Hades", "horas_jogadas": 120},
+        504230: {"name": "Celeste", "horas_jogadas": 20, "conquistas_obtidas": 10, "conquistas_totais": 40},
+    }
+    MetaModel.update_goals("user_1", snapshot)
+
+    # Só as metas; "Inexistente" não está no snapshot e é buscado no Firestore
+    assert fake_db.reads == 2
+    written = _written(fake_db)
+    assert written["m1"]["status"] == "CONCLUIDA"
+    assert written["m2"]["progresso_atual"] == "10/40"
+
+
+def test_standalone_refresh_fetches_each_goal_appid_once(fake_db, monkeypatch):
+    calls = []
+    fake_db.docs["users/user_1/metas/m5"] = {"tipo": "CONCLUSAO", "game_name": "Celeste"}
+    monkeypatch.setattr(meta_model, "fetch_player_achievements", lambda steam_id, appid: calls.append(appid) or 5)
+
+    MetaModel.update_goals("user_1")
+
+    assert calls == [504230]
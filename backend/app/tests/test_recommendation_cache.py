@@ -0,0 +1,90 @@
+# app/tests/test_recommendation_cache.py
+
+import time
+
+import pytest
+
+from app.models import library_version_model, local_store
+from app.services import ai_services
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_services, "MODEL_DIR", str(tmp_path))
+    ai_services.recommendation_cache.clear()
+
+    calls = []
+
+    def fake_generate(user_id):
+        calls.append(user_id)
+        return {"recommendations": [{"appid": len(calls)}], "warnings": []}
+
+    monkeypatch.setattr(ai_services, "generate_recommendations", fake_generate)
+    return calls
+
+
+def test_repeated_calls_hit_cache(isolated_cache):
+    first = ai_services.get_recommendations("user_1")
+
+    start = time.perf_counter()
+    second = ai_services.get_recommendations("user_1")
+    elapsed = time.perf_counter() - start
+
+    assert second is first
+    assert isolated_cache == ["user_1"]
+    assert elapsed < 0.01
+
+
+def test_library_change_invalidates_only_that_user(isolated_cache):
+    ai_services.get_recommendations("user_1")
+    ai_services.get_recommendations("user_2")
+
+    library_version_model.bump_library_version("user_1")
+
+    assert ai_services.get_cached_recommendations("user_1") is None
+    assert ai_services.get_cached_recommendations("user_2") is not None
+
+    refreshed = ai_services.get_recommendations("user_1")
+    assert refreshed["recommendations"][0]["appid"] == 3
+
+
+def test_new_model_invalidates_cache(isolated_cache, tmp_path):
+    ai_services.get_recommendations("user_1")
+
+    with open(ai_services.get_model_path("user_1"), "wb") as f:
+        f.write(b"modelo")
+
+    assert ai_services.get_cached_recommendations("user_1") is None
+
+
+def test_retrain_during_computation_is_not_cached_as_new(isolated_cache, monkeypatch):
+    def generate_while_retraining(user_id):
+        isolated_cache.append(user_id)
+        # Retreino termina enquanto as recomendações do modelo antigo são calculadas
+        with open(ai_services.get_model_path(user_id), "wb") as f:
+            f.write(b"modelo novo")
+        return {"recommendations": [{"appid": 1}], "warnings": []}
+
+    monkeypatch.setattr(ai_services, "generate_recommendations", generate_while_retraining)
+
+    ai_services.get_recommendations("user_1")
+
+    assert ai_services.get_cached_recommendations("user_1") is None
+
+
+def test_bump_counts_versions():
+    assert library_version_model.get_library_version("novo") == 0
+    assert library_version_model.bump_library_version("novo") == 1
+    assert library_version_model.bump_library_version("novo") == 2
+
+
+def test_version_lookup_reuses_the_thread_connection(monkeypatch):
+    library_version_model.bump_library_version("user_1")
+    opened = []
+    real_connect = local_store.sqlite3.connect
+    monkeypatch.setattr(local_store.sqlite3, "connect", lambda *a, **k: opened.append(a) or real_connect(*a, **k))
+
+    # Caminho do cache no event loop: nada de abrir o arquivo de novo
+    for _ in range(3):
+        assert library_version_model.get_library_version("user_1") == 1
+    assert opened == []
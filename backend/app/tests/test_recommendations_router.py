@@ -23,3 +23,86 @@ def test_recommendations_does_not_crash(client):
 
     # Respostas aceitáveis:
     assert resp.status_code in {200, 404, 500}
+
+
+def test_export_streams_csv_in_chunks(client, monkeypatch):
+    import pandas as pd
+    from app.routers import recommendations_router
+
+    def fake_frames(user_id):
+        for start in (0, 2, 4):
+            yield pd.DataFrame({"appid": [str(start), str(start + 1)], "gen_RPG": [1, 0]})
+
+    monkeypatch.setattr(recommendations_router, "iter_export_frames", fake_frames)
+
+    resp = client.get(f"/api/recommendations/export-csv/{FAKE_USER_ID}")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert resp.text.splitlines() == ["appid,gen_RPG"] + [f"{i},{1 - i % 2}" for i in range(6)]
+
+
+def test_export_of_empty_library_is_404(client, monkeypatch):
+    from app.routers import recommendations_router
+
+    monkeypatch.setattr(recommendations_router, "iter_export_frames", lambda user_id: iter([]))
+
+    resp = client.get(f"/api/recommendations/export-csv/{FAKE_USER_ID}")
+
+    assert resp.status_code == 404
+
+
+def test_export_streams_parquet_row_groups(client, monkeypatch):
+    import io
+    import pandas as pd
+    import pytest
+    pq = pytest.importorskip("pyarrow.parquet")
+    from app.routers import recommendations_router
+
+    def fake_frames(user_id):
+        for start in (0, 2, 4):
+            yield pd.DataFrame({"appid": [str(start), str(start + 1)], "gen_RPG": [1, 0]})
+
+    monkeypatch.setattr(recommendations_router, "iter_export_frames", fake_frames)
+
+    resp = client.get(f"/api/recommendations/export-csv/{FAKE_USER_ID}?format=parquet")
+
+    assert resp.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(resp.content))
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.read().to_pandas()["appid"].tolist() == [str(i) for i in range(6)]
+
+
+def test_model_info_reports_engine_or_404(client, monkeypatch):
+    from app.routers import recommendations_router
+
+    monkeypatch.setattr(recommendations_router, "describe_model", lambda user_id: None)
+    assert client.get(f"/api/recommendations/model/{FAKE_USER_ID}").status_code == 404
+
+    info = {"engine": "xgboost_hist", "train_seconds": 0.1, "model_bytes": 1024}
+    monkeypatch.setattr(recommendations_router, "describe_model", lambda user_id: info)
+    resp = client.get(f"/api/recommendations/model/{FAKE_USER_ID}")
+    assert resp.status_code == 200
+    assert resp.json()["engine"] == "xgboost_hist"
+
+
+def test_first_recommendation_gets_time_to_train(client, monkeypatch):
+    from app.config import settings
+    from app.routers import recommendations_router
+
+    timeouts = []
+
+    async def fake_run_io_bound(func, user_id, timeout=None):
+        timeouts.append(timeout)
+        return {"recommendations": [{"appid": "730"}]}
+
+    monkeypatch.setattr(recommendations_router, "get_cached_recommendations", lambda user_id: None)
+    monkeypatch.setattr(recommendations_router.executors, "run_io_bound", fake_run_io_bound)
+
+    monkeypatch.setattr(recommendations_router, "has_trained_model", lambda user_id: False)
+    assert client.get(f"/api/recommendations/{FAKE_USER_ID}").status_code == 200
+    monkeypatch.setattr(recommendations_router, "has_trained_model", lambda user_id: True)
+    assert client.get(f"/api/recommendations/{FAKE_USER_ID}").status_code == 200
+
+    # Sem modelo: leitura + treino; com modelo: o limite normal do pool
+    assert timeouts == [settings.ai_request_timeout_seconds + settings.ai_training_timeout_seconds, None]
@@ -0,0 +1,101 @@
+# app/tests/test_steam_achievements.py
+
+import time
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.models import app_model
+from app.utils import steam_achievements
+from app.utils.steam_client import SteamAPIError
+from app.utils.ttl_cache import TTLCache
+
+SCHEMA_RESPONSE = {"game": {"availableGameStats": {"achievements": [{"name": "a"}, {"name": "b"}]}}}
+
+
+class _FakeSchemaAPI:
+    """steam_get do GetSchemaForGame: conta as chamadas; `error` simula a Steam fora."""
+
+    def __init__(self):
+        self.calls = []
+        self.error = None
+
+    def __call__(self, endpoint, url, params=None, timeout=10):
+        self.calls.append(params["appid"])
+        if self.error:
+            raise self.error
+        return httpx.Response(200, json=SCHEMA_RESPONSE)
+
+
+@pytest.fixture
+def steam(fake_firestore, monkeypatch):
+    monkeypatch.setattr(app_model, "db", fake_firestore)
+    monkeypatch.setattr(steam_achievements, "achievement_schema_cache", TTLCache(maxsize=100, ttl=60))
+    api = _FakeSchemaAPI()
+    monkeypatch.setattr(steam_achievements, "steam_get", api)
+    return api
+
+
+def _stored_schema(db, appid, total, age=0.0):
+    db.docs[f"apps/{appid}"] = {
+        "schema_conquistas": {"total": total, "nomes": []},
+        "schema_conquistas_atualizado_em": time.time() - age,
+    }
+
+
+def test_memory_hit_skips_firestore_and_steam(steam, fake_firestore):
+    steam_achievements.achievement_schema_cache.set(730, {"total": 7, "nomes": []})
+
+    assert steam_achievements.fetch_total_achievements(730) == 7
+    assert fake_firestore.reads == 0
+    assert steam.calls == []
+
+
+def test_firestore_hit_fills_memory(steam, fake_firestore):
+    _stored_schema(fake_firestore, 730, total=5)
+
+    for _ in range(3):
+        assert steam_achievements.fetch_total_achievements(730) == 5
+
+    assert fake_firestore.reads == 1
+    assert steam.calls == []
+
+
+def test_expired_schema_is_fetched_and_saved(steam, fake_firestore):
+    _stored_schema(fake_firestore, 730, total=5, age=settings.achievement_cache_ttl_seconds + 60)
+
+    assert steam_achievements.fetch_achievement_schema(730) == {"total": 2, "nomes": ["a", "b"]}
+    assert steam.calls == [730]
+    saved = fake_firestore.docs["apps/730"]
+    assert saved["schema_conquistas"]["total"] == 2
+    assert time.time() - saved["schema_conquistas_atualizado_em"] < 60
+
+
+def test_failed_fetch_is_not_cached(steam, fake_firestore):
+    steam.error = SteamAPIError("GetSchemaForGame", "HTTP 503", status_code=503)
+
+    assert steam_achievements.fetch_total_achievements(730) is None
+    assert steam_achievements.fetch_total_achievements(730) is None
+
+    # Sem "0 conquistas" gravado: a próxima chamada tenta a Steam de novo
+    assert steam.calls == [730, 730]
+    assert 730 not in steam_achievements.achievement_schema_cache
+    assert "apps/730" not in fake_firestore.docs
+
+    steam.error = None
+    assert steam_achievements.fetch_total_achievements(730) == 2
+
+
+def test_warm_reads_missing_appids_in_one_batch(steam, fake_firestore):
+    _stored_schema(fake_firestore, 10, total=1)
+    _stored_schema(fake_firestore, 20, total=2)
+    _stored_schema(fake_firestore, 30, total=3, age=settings.achievement_cache_ttl_seconds + 60)
+    steam_achievements.achievement_schema_cache.set(40, {"total": 4, "nomes": []})
+
+    assert steam_achievements.warm_achievement_schema_cache([10, 20, 30, 40, 50]) == 2
+
+    assert fake_firestore.get_all_calls == [["apps/10", "apps/20", "apps/30", "apps/50"]]
+    assert [steam_achievements.fetch_total_achievements(a) for a in (10, 20, 40)] == [1, 2, 4]
+    assert fake_firestore.reads == 1
+    assert steam.calls == []
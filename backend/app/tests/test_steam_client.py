@@ -0,0 +1,195 @@
+# app/tests/test_steam_client.py
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.utils import steam_client
+from app.utils.steam_client import CircuitBreaker, SteamAPIError, TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "steam_max_retries", 2)
+    monkeypatch.setattr(settings, "steam_backoff_base_seconds", 0)
+    monkeypatch.setattr(steam_client, "_buckets", {})
+    monkeypatch.setattr(steam_client, "_breakers", {})
+
+
+class _FakeClient:
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(url)
+        return httpx.Response(self.statuses[min(len(self.calls), len(self.statuses)) - 1], json={})
+
+
+def _fake_get(statuses):
+    client = _FakeClient(statuses)
+    return (lambda: client), client.calls
+
+
+def test_steam_get_retries_on_429_then_succeeds(monkeypatch):
+    fake_get, calls = _fake_get([429, 503, 200])
+    monkeypatch.setattr(steam_client, "get_http_client", fake_get)
+
+    response = steam_client.steam_get("GetSchemaForGame", "http://steam.test/schema")
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+def test_steam_get_raises_after_exhausting_retries(monkeypatch):
+    fake_get, calls = _fake_get([429])
+    monkeypatch.setattr(steam_client, "get_http_client", fake_get)
+
+    with pytest.raises(SteamAPIError) as exc:
+        steam_client.steam_get("GetSchemaForGame", "http://steam.test/schema")
+
+    assert exc.value.status_code == 429
+    assert len(calls) == 3
+
+
+def test_steam_get_does_not_retry_client_errors(monkeypatch):
+    fake_get, calls = _fake_get([403])
+    monkeypatch.setattr(steam_client, "get_http_client", fake_get)
+
+    response = steam_client.steam_get("GetPlayerAchievements", "http://steam.test/ach")
+
+    assert response.status_code == 403
+    assert len(calls) == 1
+
+
+def test_circuit_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("GetSchemaForGame", failure_threshold=2, reset_timeout=60)
+
+    breaker.record_failure()
+    assert not breaker.is_open
+
+    breaker.record_failure()
+    assert breaker.is_open
+
+    breaker.record_success()
+    assert not breaker.is_open
+
+
+def test_token_bucket_makes_callers_wait_when_empty():
+    bucket = TokenBucket("appdetails", rate=10, capacity=1)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+
+
+def test_breaker_counts_one_failure_per_call_not_per_retry(monkeypatch):
+    monkeypatch.setattr(settings, "steam_breaker_failure_threshold", 3)
+    fake_get, calls = _fake_get([429])
+    monkeypatch.setattr(steam_client, "get_http_client", fake_get)
+
+    for _ in range(2):
+        with pytest.raises(SteamAPIError):
+            steam_client.steam_get("GetSchemaForGame", "http://steam.test/schema")
+
+    # 2 chamadas x 3 tentativas = 6 respostas 429, mas só 2 falhas registradas
+    assert len(calls) == 6
+    assert not steam_client._breaker_for("GetSchemaForGame").is_open
+
+    with pytest.raises(SteamAPIError):
+        steam_client.steam_get("GetSchemaForGame", "http://steam.test/schema")
+    assert steam_client._breaker_for("GetSchemaForGame").is_open
+
+
+def test_half_open_breaker_lets_a_single_probe_through(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(steam_client.time, "time", lambda: now[0])
+    breaker = CircuitBreaker("GetSchemaForGame", failure_threshold=1, reset_timeout=60)
+
+    breaker.record_failure()
+    assert breaker.allow_request() is None
+
+    now[0] += 61
+    assert breaker.allow_request() == CircuitBreaker.PROBE
+    # Enquanto o teste não termina, ninguém mais passa
+    assert breaker.allow_request() is None
+    assert breaker.allow_request() is None
+
+    breaker.record_failure()
+    assert breaker.allow_request() is None
+
+    now[0] += 61
+    assert breaker.allow_request() == CircuitBreaker.PROBE
+    breaker.record_success()
+    assert breaker.allow_request() == CircuitBreaker.CLOSED
+
+
+def test_probe_call_is_a_single_attempt(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(steam_client.time, "time", lambda: now[0])
+    fake_get, calls = _fake_get([503])
+    monkeypatch.setattr(steam_client, "get_http_client", fake_get)
+    breaker = steam_client._breaker_for("appdetails")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    now[0] += settings.steam_breaker_reset_seconds + 1
+
+    with pytest.raises(SteamAPIError):
+        steam_client.steam_get("appdetails", "http://steam.test/store")
+
+    assert len(calls) == 1
+    assert breaker.is_open
+
+
+def test_token_buckets_share_budget_across_instances():
+    # Cada processo tem seu próprio objeto; o saldo é o do SQLite local
+    web = TokenBucket("appdetails", rate=10, capacity=2)
+    worker = TokenBucket("appdetails", rate=10, capacity=2)
+
+    assert web.reserve() == 0
+    assert worker.reserve() == 0
+    assert web.reserve() == pytest.approx(0.1, abs=0.02)
+    assert worker.reserve() == pytest.approx(0.2, abs=0.02)
+
+
+def test_breaker_state_is_shared_across_instances(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(steam_client.time, "time", lambda: now[0])
+    web = CircuitBreaker("appdetails", failure_threshold=2, reset_timeout=60)
+    worker = CircuitBreaker("appdetails", failure_threshold=2, reset_timeout=60)
+
+    web.record_failure()
+    worker.record_failure()
+    assert web.is_open
+    assert worker.allow_request() is None
+
+    now[0] += 61
+    assert web.allow_request() == CircuitBreaker.PROBE
+    assert worker.allow_request() is None
+
+    web.record_success()
+    assert worker.allow_request() == CircuitBreaker.CLOSED
+
+
+def test_abandoned_probe_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(steam_client.time, "time", lambda: now[0])
+    breaker = CircuitBreaker("appdetails", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+
+    now[0] += 61
+    assert breaker.allow_request() == CircuitBreaker.PROBE
+    # O processo da chamada de teste morreu sem registrar resultado
+    now[0] += 30
+    assert breaker.allow_request() is None
+    now[0] += 31
+    assert breaker.allow_request() == CircuitBreaker.PROBE
+
+
+def test_steam_get_with_zero_retries_is_a_single_attempt(monkeypatch):
+    fake_get, calls = _fake_get([503, 200])
+    monkeypatch.setattr(steam_client, "get_http_client", fake_get)
+
+    with pytest.raises(SteamAPIError):
+        steam_client.steam_get("GetPlayerSummaries", "http://steam.test/player", retries=0)
+
+    assert len(calls) == 1
@@ -0,0 +1,371 @@
+# app/tests/test_steam_services.py
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.models import app_model, game_model
+from app.models.game_model import HEAVY_STORE_FIELDS
+from app.schemas.game_schema import GameBase
+from app.services import steam_services
+from app.services.steam_services import (
+    apply_store_details,
+    build_goal_snapshot,
+    split_library_changes,
+    store_detail_fields,
+)
+from app.utils.steam_client import SteamAPIError
+from app.utils.ttl_cache import TTLCache
+
+STORE_DETAILS = {
+    "header_image": "https://cdn/header.jpg",
+    "short_description": "Curta",
+    "detailed_description": "<p>" + "longa " * 2000 + "</p>",
+    "about_the_game": "<p>Sobre</p>",
+    "supported_languages": "Português",
+    "developers": ["Valve"],
+    "publishers": ["Valve"],
+    "genres": [{"description": "Ação"}, {"description": "RPG"}],
+    "categories": [{"description": "Um jogador"}],
+    "metacritic": {"score": 88},
+    "release_date": {"date": "21 ago. 2012"},
+    "price_overview": {"currency": "BRL", "initial": 5000, "final": 2500, "discount_percent": 50},
+    "pc_requirements": {"minimum": "<b>Mínimo</b>"},
+}
+
+
+def test_split_library_changes_only_returns_new_and_played_games():
+    steam_games = [
+        {"appid": 10, "playtime_forever": 120, "rtime_last_played": 1700000000},
+        {"appid": 20, "playtime_forever": 300, "rtime_last_played": 1700000500},
+        {"appid": 30, "playtime_forever": 0},
+    ]
+    stored_state = {
+        10: {"playtime_forever": 120, "rtime_last_played": 1700000000},
+        20: {"playtime_forever": 240, "rtime_last_played": 1690000000},
+    }
+
+    new_games, changed_games = split_library_changes(steam_games, stored_state)
+
+    assert [g["appid"] for g in new_games] == [30]
+    assert [(g["appid"], stored["playtime_forever"]) for g, stored in changed_games] == [(20, 240)]
+
+
+def test_split_library_changes_without_state_treats_everything_as_new():
+    steam_games = [{"appid": 1}, {"appid": 2}]
+
+    new_games, changed_games = split_library_changes(steam_games, {})
+
+    assert new_games == steam_games
+    assert changed_games == []
+
+
+def test_game_document_keeps_only_light_store_fields():
+    game_dict = {"appid": 730, "name": "CS"}
+
+    apply_store_details(game_dict, STORE_DETAILS)
+    stored = GameBase(**game_dict).model_dump(exclude=set(HEAVY_STORE_FIELDS))
+
+    assert not set(HEAVY_STORE_FIELDS) & set(stored)
+    assert stored["generos"] == ["Ação", "RPG"]
+    assert stored["metacritic"] == 88
+    assert stored["preco"]["preco_final"] == 2500
+    assert stored["data_lancamento"] == "21 ago. 2012"
+
+
+def test_store_detail_fields_rebuild_heavy_fields_for_details_page():
+    fields = store_detail_fields(STORE_DETAILS)
+
+    assert fields["descricao_completa"] == STORE_DETAILS["detailed_description"]
+    assert fields["desenvolvedor"] == "Valve"
+    assert fields["requisitos_minimos"] == "<b>Mínimo</b>"
+    assert "requisitos_recomendados" not in fields
+
+
+def test_goal_snapshot_merges_stored_new_and_changed_games():
+    stored_state = {
+        10: {"name": "Antigo", "horas_jogadas": 5, "conquistas_obtidas": 1, "conquistas_totais": 10},
+        20: {"name": "Alterado", "horas_jogadas": 1, "conquistas_obtidas": 0, "conquistas_totais": 5},
+    }
+    novo = GameBase(appid=30, name="Novo", horas_jogadas=2, conquistas_totais=8, conquistas_obtidas=3)
+    updates = {20: {"horas_jogadas": 4, "conquistas_obtidas": 2}}
+
+    snapshot = build_goal_snapshot(stored_state, [novo], updates)
+
+    assert snapshot[10] == stored_state[10]
+    assert snapshot[20]["horas_jogadas"] == 4 and snapshot[20]["conquistas_obtidas"] == 2
+    assert snapshot[30] == {"name": "Novo", "horas_jogadas": 2, "conquistas_totais": 8, "conquistas_obtidas": 3}
+
+
+def test_failed_steam_calls_are_not_saved_as_zeros(fake_firestore, monkeypatch):
+    async def failing_get(client, endpoint, url, params=None, timeout=10):
+        raise SteamAPIError(endpoint, "HTTP 429", status_code=429)
+
+    monkeypatch.setattr(steam_services, "steam_get_async", failing_get)
+    monkeypatch.setattr(game_model, "bump_library_version", lambda user_id: 0)
+    monkeypatch.setattr(game_model, "db", fake_firestore)
+
+    appid = 987654321
+    steam_services.store_details_cache.pop(appid)
+    steam_services.achievement_schema_cache.pop(appid)
+    new_app_data = {"store": {}, "achievements": {}}
+
+    game = asyncio.run(steam_services.enrich_game_async(
+        None, steam_services.build_host_limiter(), "steam_1",
+        {"appid": appid, "name": "Jogo", "playtime_forever": 90}, new_app_data,
+    ))
+
+    assert game.enriquecido is False
+    assert game_model.sync_steam_games_batch("user_1", [game]) == 1
+
+    saved = fake_firestore.docs[f"users/user_1/games/{appid}"]
+    assert saved["enriquecido"] is False
+    for field in ("conquistas_totais", "conquistas_obtidas", "genero", "img_logo_url"):
+        assert field not in saved
+    assert saved["horas_jogadas"] == 2
+
+    # Próxima sincronização incremental: o jogo volta a ser tratado como novo
+    stored_state = {appid: {k: saved.get(k) for k in game_model.SYNC_STATE_FIELDS}}
+    new_games, changed = split_library_changes([{"appid": appid, "playtime_forever": 90}], stored_state)
+    assert [g["appid"] for g in new_games] == [appid]
+    assert changed == []
+
+
+class _FakeSteam:
+    """Steam em memória que mede quantas requisições rodam ao mesmo tempo por host."""
+
+    def __init__(self, appids):
+        self.appids = appids
+        self.active = {}
+        self.max_active = {}
+
+    async def get(self, client, endpoint, url, params=None, timeout=10):
+        host = httpx.URL(url).host
+        self.active[host] = self.active.get(host, 0) + 1
+        self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+        try:
+            await asyncio.sleep(0.001)
+            data = self._respond(endpoint, params)
+            return httpx.Response(200, json=data, request=httpx.Request("GET", url))
+        finally:
+            self.active[host] -= 1
+
+    def _respond(self, endpoint, params):
+        if endpoint == "GetOwnedGames":
+            games = [{"appid": a, "name": f"Jogo {a}", "playtime_forever": 120} for a in self.appids]
+            return {"response": {"games": games}}
+        if endpoint == "appdetails":
+            data = dict(STORE_DETAILS, type="game")
+            return {str(params["appids"]): {"success": True, "data": data}}
+        if endpoint == "GetSchemaForGame":
+            achievements = [{"name": "a"}, {"name": "b"}]
+            return {"game": {"availableGameStats": {"achievements": achievements}}}
+        achieved = [{"achieved": 1}, {"achieved": 0}]
+        return {"playerstats": {"achievements": achieved}}
+
+
+def test_sync_library_async_limits_concurrency_and_flushes_in_batches(monkeypatch):
+    appids = list(range(880000, 880025))
+    for appid in appids:
+        steam_services.store_details_cache.pop(appid)
+        steam_services.achievement_schema_cache.pop(appid)
+
+    steam = _FakeSteam(appids)
+    flushed, progress_calls = [], []
+
+    monkeypatch.setattr(settings, "steam_api_key", "chave")
+    monkeypatch.setattr(settings, "steam_store_max_concurrency", 2)
+    monkeypatch.setattr(settings, "steam_api_max_concurrency", 3)
+    monkeypatch.setattr(settings, "sync_write_flush_size", 10)
+    monkeypatch.setattr(steam_services, "steam_get_async", steam.get)
+    monkeypatch.setattr(steam_services, "get_async_http_client", lambda: None)
+    monkeypatch.setattr(steam_services, "warm_store_details_cache", lambda appids: 0)
+    monkeypatch.setattr(steam_services, "warm_achievement_schema_cache", lambda appids: 0)
+    monkeypatch.setattr(game_model, "sync_steam_games_batch",
+                        lambda user_id, games: flushed.append(len(games)) or len(games))
+    monkeypatch.setattr(game_model, "update_steam_games_fields", lambda user_id, updates: 0)
+    monkeypatch.setattr(app_model, "save_store_details", lambda details: None)
+    monkeypatch.setattr(app_model, "save_achievement_schemas", lambda schemas: None)
+    monkeypatch.setattr(steam_services.MetaModel, "update_goals", lambda user_id, snapshot=None: None)
+    monkeypatch.setattr(steam_services.ai_services, "train_and_save_model", lambda user_id: None)
+
+    games = asyncio.run(steam_services.sync_steam_library_async(
+        "user_1", "steam_1", full=True, progress=lambda done, total: progress_calls.append((done, total)),
+    ))
+
+    assert steam.max_active["store.steampowered.com"] == 2
+    assert steam.max_active["api.steampowered.com"] == 3
+
+    assert flushed == [10, 10, 5]
+    assert progress_calls == [(0, 25), (10, 25), (20, 25), (25, 25)]
+
+    assert sorted(g.appid for g in games) == appids
+    assert all(g.enriquecido and g.conquistas_totais == 2 and g.conquistas_obtidas == 1 for g in games)
+    assert all(g.generos == ["Ação", "RPG"] and g.horas_jogadas == 2 for g in games)
+
+
+class _InlineExecutor:
+    """Guarda as tarefas agendadas para o teste rodar quando quiser."""
+
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, fn):
+        self.tasks.append(fn)
+
+
+def test_details_page_serves_stale_copy_and_refreshes_in_background(monkeypatch):
+    appid = 990001
+    steam_services.store_details_cache.pop(appid)
+    old = time.time() - settings.store_cache_ttl_seconds - 60
+    downloads = []
+    executor = _InlineExecutor()
+
+    monkeypatch.setattr(app_model, "get_store_details_with_timestamp",
+                        lambda appids: {appid: (STORE_DETAILS, old)})
+    monkeypatch.setattr(steam_services, "download_store_details",
+                        lambda a: downloads.append(a) or {"error": "HTTP 503"})
+    monkeypatch.setattr(steam_services, "_store_refresh_executor", executor)
+
+    for _ in range(3):
+        fields = steam_services.get_store_detail_fields(appid)
+        assert fields["desenvolvedor"] == "Valve"
+        assert fields["requisitos_minimos"] == "<b>Mínimo</b>"
+
+    # Ninguém esperou a Steam; só uma atualização agendada para os três pedidos
+    assert downloads == []
+    assert len(executor.tasks) == 1
+
+    executor.tasks[0]()
+    assert downloads == [appid]
+    # A atualização falhou: o próximo pedido ainda serve a cópia e agenda outra
+    assert steam_services.get_store_detail_fields(appid)["publisher"] == "Valve"
+    assert len(executor.tasks) == 2
+
+
+def test_details_page_waits_for_steam_only_without_a_stored_copy(monkeypatch):
+    appid = 990002
+    steam_services.store_details_cache.pop(appid)
+    monkeypatch.setattr(app_model, "get_store_details_with_timestamp", lambda appids: {})
+    monkeypatch.setattr(steam_services, "download_store_details", lambda a: STORE_DETAILS)
+
+    assert steam_services.get_store_detail_fields(appid)["descricao"] == "Curta"
+
+    monkeypatch.setattr(steam_services, "download_store_details", lambda a: {"error": "HTTP 503"})
+    steam_services.store_details_cache.pop(appid)
+    assert steam_services.get_store_detail_fields(appid) == {}
+
+
+def test_validate_steam_id_makes_a_single_short_attempt(monkeypatch):
+    calls = []
+
+    class _FailingClient:
+        async def get(self, url, params=None, timeout=None):
+            calls.append(timeout)
+            return httpx.Response(503, json={})
+
+    monkeypatch.setattr(steam_services, "get_async_http_client", lambda: _FailingClient())
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(steam_services.validate_steam_id("765"))
+
+    assert exc.value.status_code == 502
+    assert calls == [settings.steam_validate_timeout_seconds]
+
+
+# ===========================================================
+# CACHE DOS DADOS DA LOJA (memória -> apps/{appid} -> Steam)
+# ===========================================================
+class _FakeStore:
+    """steam_get da loja: conta as chamadas e responde com o status escolhido."""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.calls = []
+
+    def __call__(self, endpoint, url, params=None, timeout=10):
+        appid = params["appids"]
+        self.calls.append(appid)
+        body = {str(appid): {"success": True, "data": dict(STORE_DETAILS, steam_appid=appid)}}
+        return httpx.Response(self.status, json=body)
+
+
+@pytest.fixture
+def store_cache(fake_firestore, monkeypatch):
+    monkeypatch.setattr(app_model, "db", fake_firestore)
+    monkeypatch.setattr(steam_services, "store_details_cache", TTLCache(maxsize=100, ttl=60))
+    store = _FakeStore()
+    monkeypatch.setattr(steam_services, "steam_get", store)
+    return store
+
+
+def _stored_details(db, appid, age=0.0):
+    db.docs[f"apps/{appid}"] = {
+        "dados_loja": {"steam_appid": appid, "short_description": "Do Firestore"},
+        "dados_loja_atualizado_em": time.time() - age,
+    }
+
+
+def test_store_details_memory_hit_skips_firestore_and_steam(store_cache, fake_firestore):
+    steam_services.store_details_cache.set(730, {"short_description": "Da memória"})
+
+    details = steam_services.fetch_game_details_from_store(730)
+
+    assert details["short_description"] == "Da memória"
+    assert fake_firestore.reads == 0
+    assert store_cache.calls == []
+
+
+def test_store_details_firestore_hit_fills_memory(store_cache, fake_firestore):
+    _stored_details(fake_firestore, 730)
+
+    for _ in range(3):
+        assert steam_services.fetch_game_details_from_store(730)["short_description"] == "Do Firestore"
+
+    assert fake_firestore.reads == 1
+    assert store_cache.calls == []
+
+
+def test_expired_store_details_are_fetched_again(store_cache, fake_firestore):
+    _stored_details(fake_firestore, 730, age=settings.store_cache_ttl_seconds + 60)
+    # Entrada da memória também vencida
+    steam_services.store_details_cache.set(730, {"short_description": "Velha"}, ttl=0)
+
+    details = steam_services.fetch_game_details_from_store(730)
+
+    assert details["short_description"] == "Curta"
+    assert store_cache.calls == [730]
+    saved = fake_firestore.docs["apps/730"]
+    assert saved["dados_loja"]["short_description"] == "Curta"
+    assert time.time() - saved["dados_loja_atualizado_em"] < 60
+
+
+def test_failed_store_fetch_is_not_cached(store_cache, fake_firestore):
+    store_cache.status = 503
+
+    for _ in range(2):
+        assert "error" in steam_services.fetch_game_details_from_store(730)
+
+    # Cada pedido tenta de novo: o erro não foi para a memória nem para apps/{appid}
+    assert store_cache.calls == [730, 730]
+    assert 730 not in steam_services.store_details_cache
+    assert "apps/730" not in fake_firestore.docs
+
+
+def test_warm_store_details_cache_reads_missing_appids_in_one_batch(store_cache, fake_firestore):
+    for appid in (10, 20, 30):
+        _stored_details(fake_firestore, appid)
+    _stored_details(fake_firestore, 40, age=settings.store_cache_ttl_seconds + 60)
+    steam_services.store_details_cache.set(50, {"short_description": "Da memória"})
+
+    warmed = steam_services.warm_store_details_cache([10, 20, 30, 40, 50, 60])
+
+    assert warmed == 3
+    assert fake_firestore.get_all_calls == [["apps/10", "apps/20", "apps/30", "apps/40", "apps/60"]]
+    assert all(a in steam_services.store_details_cache for a in (10, 20, 30, 50))
+    assert 40 not in steam_services.store_details_cache
+    assert store_cache.calls == []
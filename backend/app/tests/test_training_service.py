@@ -0,0 +1,114 @@
+# app/tests/test_training_service.py
+
+import threading
+import time
+from concurrent.futures import Future
+
+from app.services.training_service import RetrainScheduler
+
+
+class _FakeTrainer:
+    """Registra os treinos pedidos; cada um só termina quando o teste mandar."""
+
+    def __init__(self):
+        self.calls = []
+        self.futures = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def submit(self, user_id, full):
+        future = Future()
+        with self.lock:
+            self.calls.append((user_id, full))
+            self.futures.append(future)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        return future
+
+    def finish_all(self):
+        with self.lock:
+            pending = [f for f in self.futures if not f.done()]
+            self.running -= len(pending)
+        for future in pending:
+            future.set_result({"status": "success"})
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_burst_of_edits_becomes_one_training():
+    trainer = _FakeTrainer()
+    scheduler = RetrainScheduler(submit=trainer.submit, delay=0.1, max_delay=5)
+
+    for _ in range(20):
+        scheduler.request("user_1")
+
+    assert scheduler.status("user_1") == "scheduled"
+    assert _wait_for(lambda: trainer.calls)
+    time.sleep(0.2)
+    assert trainer.calls == [("user_1", False)]
+    scheduler.stop()
+
+
+def test_request_while_training_runs_once_more_after_it():
+    trainer = _FakeTrainer()
+    scheduler = RetrainScheduler(submit=trainer.submit, delay=0.05, max_delay=5)
+
+    scheduler.request("user_1")
+    assert _wait_for(lambda: len(trainer.calls) == 1)
+    assert scheduler.status("user_1") == "running"
+
+    scheduler.request("user_1")
+    scheduler.request("user_1", full=True)
+    time.sleep(0.15)
+    assert len(trainer.calls) == 1
+
+    trainer.finish_all()
+    assert _wait_for(lambda: len(trainer.calls) == 2)
+    assert trainer.calls[1] == ("user_1", True)
+    scheduler.stop()
+
+
+def test_concurrent_trainings_are_capped():
+    trainer = _FakeTrainer()
+    scheduler = RetrainScheduler(submit=trainer.submit, delay=0, max_delay=5, max_running=2)
+
+    for i in range(5):
+        scheduler.request(f"user_{i}")
+
+    assert _wait_for(lambda: len(trainer.calls) == 2)
+    time.sleep(0.1)
+    assert len(trainer.calls) == 2
+
+    while len(trainer.calls) < 5:
+        trainer.finish_all()
+        assert _wait_for(lambda: trainer.running > 0 or len(trainer.calls) == 5)
+
+    assert trainer.max_running == 2
+    assert sorted(u for u, _ in trainer.calls) == [f"user_{i}" for i in range(5)]
+    scheduler.stop()
+
+
+def test_failed_submit_is_retried_later():
+    trainer = _FakeTrainer()
+    attempts = []
+
+    def flaky_submit(user_id, full):
+        attempts.append(user_id)
+        if len(attempts) == 1:
+            raise RuntimeError("pool cheio")
+        return trainer.submit(user_id, full)
+
+    scheduler = RetrainScheduler(submit=flaky_submit, delay=0.05, max_delay=5)
+    scheduler.request("user_1", delay=0)
+
+    assert _wait_for(lambda: trainer.calls == [("user_1", False)])
+    assert len(attempts) == 2
+    scheduler.stop()
@@ -0,0 +1,38 @@
+# app/tests/test_ttl_cache.py
+
+import time
+
+from app.utils.ttl_cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=10)
+
+    time.sleep(0.06)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_ttl_cache_respects_max_weight():
+    cache = TTLCache(maxsize=10, max_weight=100)
+    cache.set("a", "modelo a", weight=60)
+    cache.set("b", "modelo b", weight=30)
+    cache.set("c", "modelo c", weight=30)
+
+    assert "a" not in cache
+    assert cache.weight == 60
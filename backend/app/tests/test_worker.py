@@ -0,0 +1,66 @@
+# app/tests/test_worker.py
+
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from app import worker
+from app.config import settings
+from app.models import job_model
+from app.services import job_service
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(settings, "sync_job_poll_seconds", 0.01)
+
+
+class _FakePool:
+    def __init__(self, on_submit=None):
+        self.submitted = []
+        self.on_submit = on_submit
+
+    def submit(self, fn, job_id):
+        self.submitted.append(job_id)
+        if self.on_submit:
+            self.on_submit()
+        return Future()
+
+
+def test_dispatch_stops_when_event_is_set():
+    job, _ = job_service.enqueue_steam_sync("user_1", "765")
+    job_service.enqueue_steam_sync("user_2", "999")
+    stop = threading.Event()
+    pool = _FakePool(on_submit=stop.set)
+
+    worker._dispatch(pool, max_workers=2, stop_event=stop)
+
+    # Depois do pedido de parada nenhum job novo é pego da fila
+    assert pool.submitted == [job["id"]]
+    assert job_model.claim_next_job(job_service.SYNC_JOB)["user_id"] == "user_2"
+
+
+def test_job_cancelled_on_shutdown_goes_back_to_queue():
+    job, _ = job_service.enqueue_steam_sync("user_1", "765")
+    job_model.claim_next_job(job_service.SYNC_JOB)
+    future = Future()
+    future.add_done_callback(worker._on_job_done(job["id"]))
+
+    future.cancel()
+
+    stored = job_model.get_job(job["id"])
+    assert stored["status"] == job_model.STATUS_QUEUED
+    assert stored["attempts"] == 0
+
+
+def test_embedded_worker_stops_without_being_killed():
+    worker.start_embedded_worker()
+    process = worker._embedded_process
+    assert process.is_alive()
+
+    worker.stop_embedded_worker(timeout=30)
+
+    assert not process.is_alive()
+    assert process.exitcode == 0
+    assert worker._embedded_process is None
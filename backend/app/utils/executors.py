@@ -0,0 +1,105 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+
+# Executores dedicados para o trabalho pesado da IA, para que uma recomendação
+# ou um treino não congele o event loop (e as outras rotas) do uvicorn.
+#   - threads:   leitura do Firestore + pandas + predição
+#   - processos: treino do modelo (CPU pura, fora do GIL do servidor web)
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_slots = threading.BoundedSemaphore(settings.ai_io_max_pending)
+
+_cpu_executor: Optional[ProcessPoolExecutor] = None
+_cpu_slots = threading.BoundedSemaphore(settings.ai_training_max_pending)
+
+_executors_lock = threading.Lock()
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    with _executors_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(
+                max_workers=settings.ai_io_workers, thread_name_prefix="ai-io"
+            )
+        return _io_executor
+
+
+def _get_cpu_executor() -> ProcessPoolExecutor:
+    global _cpu_executor
+    with _executors_lock:
+        if _cpu_executor is None:
+            _cpu_executor = ProcessPoolExecutor(
+                max_workers=settings.ai_training_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _cpu_executor
+
+
+def _acquire(slots: threading.BoundedSemaphore) -> None:
+    if not slots.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Servidor ocupado com a IA. Tente novamente em instantes.")
+
+
+def _release_when_done(future: Future, slots: threading.BoundedSemaphore) -> None:
+    # A vaga só é liberada quando o trabalho termina de fato (mesmo após timeout)
+    future.add_done_callback(lambda _: slots.release())
+
+
+async def run_io_bound(func, *args, timeout: float = None, **kwargs):
+    """Executa func no pool de threads da IA, com limite de fila e timeout."""
+    _acquire(_io_slots)
+    try:
+        future = _get_io_executor().submit(partial(func, *args, **kwargs))
+    except Exception:
+        _io_slots.release()
+        raise
+    _release_when_done(future, _io_slots)
+
+    try:
+        return await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(future)),
+            timeout or settings.ai_request_timeout_seconds,
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="A IA demorou demais para responder.")
+
+
+def submit_cpu_bound(func, *args) -> Future:
+    """Agenda func no pool de processos de treino (sem esperar o resultado)."""
+    _acquire(_cpu_slots)
+    try:
+        future = _get_cpu_executor().submit(func, *args)
+    except Exception:
+        _cpu_slots.release()
+        raise
+    _release_when_done(future, _cpu_slots)
+    return future
+
+
+def run_cpu_bound(func, *args, timeout: float = None):
+    """Versão bloqueante de submit_cpu_bound, para código que já roda em thread."""
+    future = submit_cpu_bound(func, *args)
+    try:
+        return future.result(timeout=timeout or settings.ai_training_timeout_seconds)
+    except FutureTimeoutError:
+        raise HTTPException(status_code=504, detail="Treinamento da IA excedeu o tempo limite.")
+
+
+def shutdown_executors() -> None:
+    global _io_executor, _cpu_executor
+    with _executors_lock:
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=False, cancel_futures=True)
+            _io_executor = None
+        if _cpu_executor is not None:
+            _cpu_executor.shutdown(wait=False, cancel_futures=True)
+            _cpu_executor = None
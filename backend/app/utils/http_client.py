@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+
+from ..config import settings
+
+# Clientes HTTP compartilhados pelo backend inteiro: mantêm conexões
+# keep-alive (e HTTP/2 quando o pacote h2 está instalado) em vez de abrir
+# um novo handshake TCP+TLS a cada chamada para a Steam/Firebase.
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+# Um AsyncClient só pode ser usado no event loop em que foi criado, então
+# guardamos um por loop (o da aplicação e os loops da sincronização).
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_options() -> dict:
+    return {
+        "http2": settings.http_enable_http2 and _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        "timeout": httpx.Timeout(settings.http_default_timeout_seconds),
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """Cliente síncrono único do processo (thread-safe)."""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        with _sync_lock:
+            if _sync_client is None or _sync_client.is_closed:
+                _sync_client = httpx.Client(**_client_options())
+    return _sync_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Cliente assíncrono do event loop atual (criado na primeira chamada)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_http_client() -> None:
+    """Fecha o cliente do loop atual (fim do lifespan ou de uma sincronização)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def close_http_client() -> None:
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
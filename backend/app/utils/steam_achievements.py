@@ -1,41 +1,97 @@
-import requests
+import httpx
+
 from ..config import settings
+from ..models import app_model
+from .steam_client import SteamAPIError, steam_get
+from .ttl_cache import TTLCache
 
 STEAM_PLAYER_API_URL = "http://api.steampowered.com"
 
+# Schema de conquistas é o mesmo para todos os usuários e quase nunca muda:
+# memória (LRU + TTL) na frente da coleção "apps" do Firestore.
+achievement_schema_cache = TTLCache(
+    maxsize=settings.achievement_cache_max_entries,
+    ttl=settings.achievement_cache_ttl_seconds,
+)
+
+
+def parse_achievement_schema(data: dict) -> dict:
+    """Converte a resposta do GetSchemaForGame em {"total": int, "nomes": [...]}."""
+    ach = (
+        data.get("game", {})
+        .get("availableGameStats", {})
+        .get("achievements")
+    ) or []
+    return {"total": len(ach), "nomes": [a.get("name") for a in ach if a.get("name")]}
 
-def fetch_total_achievements(appid: int) -> int:
-    url = (
-        f"{STEAM_PLAYER_API_URL}/ISteamUserStats/GetSchemaForGame/v2/"
-        f"?key={settings.steam_api_key}&appid={appid}"
+
+def warm_achievement_schema_cache(appids) -> int:
+    """Carrega do Firestore, em lote, os schemas que não estão em memória."""
+    missing = [int(a) for a in appids if int(a) not in achievement_schema_cache]
+    persisted = app_model.get_achievement_schemas(
+        missing, max_age=settings.achievement_cache_ttl_seconds
     )
-    try:
-        r = requests.get(url, timeout=5)
-        if r.status_code == 200:
-            data = r.json()
-            ach = (
-                data.get("game", {})
-                .get("availableGameStats", {})
-                .get("achievements")
-            )
-            return len(ach) if ach else 0
-    except:
-        pass
-    return 0
-
-
-def fetch_player_achievements(steam_id: str, appid: int) -> int:
-    url = (
-        f"{STEAM_PLAYER_API_URL}/ISteamUserStats/GetPlayerAchievements/v1/"
-        f"?key={settings.steam_api_key}&steamid={steam_id}&appid={appid}"
+    for appid, schema in persisted.items():
+        achievement_schema_cache.set(appid, schema)
+    return len(persisted)
+
+
+def fetch_achievement_schema(appid: int) -> dict | None:
+    """Schema de conquistas do appid (cache primeiro). None se a Steam falhar."""
+    appid = int(appid)
+    schema = achievement_schema_cache.get(appid)
+    if schema is not None:
+        return schema
+
+    persisted = app_model.get_achievement_schemas(
+        [appid], max_age=settings.achievement_cache_ttl_seconds
     )
+    if appid in persisted:
+        achievement_schema_cache.set(appid, persisted[appid])
+        return persisted[appid]
+
+    url = f"{STEAM_PLAYER_API_URL}/ISteamUserStats/GetSchemaForGame/v2/"
+    params = {"key": settings.steam_api_key, "appid": appid}
     try:
-        r = requests.get(url, timeout=5)
+        r = steam_get("GetSchemaForGame", url, params, timeout=5)
         if r.status_code == 200:
-            data = r.json()
-            ach = data.get("playerstats", {}).get("achievements")
-            if ach:
-                return sum(1 for a in ach if a.get("achieved") == 1)
-    except:
-        pass
-    return 0
+            schema = parse_achievement_schema(r.json())
+            achievement_schema_cache.set(appid, schema)
+            app_model.save_achievement_schemas({appid: schema})
+            return schema
+        print(f"[Steam] GetSchemaForGame {appid}: HTTP {r.status_code}")
+    except (SteamAPIError, ValueError) as e:
+        print(f"[Steam] GetSchemaForGame {appid}: {e}")
+    return None
+
+
+def fetch_total_achievements(appid: int) -> int | None:
+    """Total de conquistas do jogo, ou None se a Steam não respondeu."""
+    schema = fetch_achievement_schema(appid)
+    return schema["total"] if schema is not None else None
+
+
+def parse_player_achievements(response: httpx.Response, appid: int) -> int | None:
+    """
+    Conta as conquistas obtidas. HTTP 400 é a resposta da Steam para jogos sem
+    stats (0 conquistas); qualquer outro erro vira None para não gravar 0.
+    """
+    if response.status_code == 200:
+        ach = response.json().get("playerstats", {}).get("achievements") or []
+        return sum(1 for a in ach if a.get("achieved") == 1)
+    if response.status_code == 400:
+        return 0
+    print(f"[Steam] GetPlayerAchievements {appid}: HTTP {response.status_code}")
+    return None
+
+
+def fetch_player_achievements(steam_id: str, appid: int) -> int | None:
+    """Conquistas obtidas pelo jogador, ou None se a Steam não respondeu."""
+    url = f"{STEAM_PLAYER_API_URL}/ISteamUserStats/GetPlayerAchievements/v1/"
+    params = {"key": settings.steam_api_key, "steamid": steam_id, "appid": appid}
+    try:
+        r = steam_get("GetPlayerAchievements", url, params, timeout=5)
+        return parse_player_achievements(r, appid)
+    except (SteamAPIError, ValueError) as e:
+        print(f"[Steam] GetPlayerAchievements {appid}: {e}")
+    return None
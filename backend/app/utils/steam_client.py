@@ -0,0 +1,214 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from ..config import settings
+from ..models import steam_limit_model
+from .http_client import get_http_client
+
+# Códigos que valem nova tentativa (throttling da Steam e falhas do lado deles)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+STORE_ENDPOINTS = {"appdetails"}
+
+
+class SteamAPIError(Exception):
+    """Falha definitiva ao falar com a Steam (após retries ou com o circuito aberto)."""
+
+    def __init__(self, endpoint: str, message: str, status_code: Optional[int] = None):
+        super().__init__(f"[{endpoint}] {message}")
+        self.endpoint = endpoint
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    Token bucket por reserva: cada chamada pega um token (o saldo pode ficar
+    negativo) e recebe quanto tempo precisa esperar. O saldo fica no SQLite
+    local, então todos os processos do servidor dividem o mesmo orçamento.
+    """
+
+    def __init__(self, endpoint: str, rate: float, capacity: float):
+        self.endpoint = endpoint
+        self.rate = rate
+        self.capacity = capacity
+
+    def reserve(self) -> float:
+        return steam_limit_model.reserve_token(self.endpoint, self.rate, self.capacity, time.time())
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = await asyncio.to_thread(self.reserve)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Abre depois de `failure_threshold` chamadas seguidas que falharam (cada
+    chamada conta uma vez, já com os retries) e recusa chamadas por
+    `reset_timeout` segundos. Depois disso fica meio-aberto: uma única
+    chamada de teste passa (entre todos os processos); as outras continuam
+    recusadas até ela terminar ou o teste expirar.
+    """
+
+    CLOSED = steam_limit_model.CLOSED
+    PROBE = steam_limit_model.PROBE
+
+    def __init__(self, endpoint: str, failure_threshold: int, reset_timeout: float):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    @property
+    def is_open(self) -> bool:
+        return steam_limit_model.breaker_is_open(self.endpoint)
+
+    def allow_request(self) -> Optional[str]:
+        """CLOSED (chamada normal), PROBE (a chamada de teste) ou None (recusada)."""
+        return steam_limit_model.breaker_allow(self.endpoint, self.reset_timeout, time.time())
+
+    def record_success(self) -> None:
+        steam_limit_model.breaker_success(self.endpoint)
+
+    def record_failure(self) -> None:
+        steam_limit_model.breaker_failure(self.endpoint, self.failure_threshold, time.time())
+
+    def release_probe(self) -> None:
+        """Chamada de teste interrompida sem resultado: libera outra tentativa."""
+        steam_limit_model.breaker_release_probe(self.endpoint)
+
+
+_buckets = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+def _bucket_for(endpoint: str) -> TokenBucket:
+    with _registry_lock:
+        if endpoint not in _buckets:
+            if endpoint in STORE_ENDPOINTS:
+                rate, burst = settings.steam_store_requests_per_second, settings.steam_store_burst
+            else:
+                rate, burst = settings.steam_api_requests_per_second, settings.steam_api_burst
+            _buckets[endpoint] = TokenBucket(endpoint, rate, burst)
+        return _buckets[endpoint]
+
+
+def _breaker_for(endpoint: str) -> CircuitBreaker:
+    with _registry_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(
+                endpoint,
+                settings.steam_breaker_failure_threshold,
+                settings.steam_breaker_reset_seconds,
+            )
+        return _breakers[endpoint]
+
+
+def _backoff_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    """Exponential backoff com jitter total; respeita o Retry-After quando a Steam manda."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), settings.steam_backoff_max_seconds)
+
+    cap = min(settings.steam_backoff_max_seconds, settings.steam_backoff_base_seconds * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+def _admit(endpoint: str, breaker: CircuitBreaker, retries: Optional[int]) -> tuple:
+    """(é a chamada de teste?, tentativas). A chamada de teste do meio-aberto tem uma tentativa só."""
+    state = breaker.allow_request()
+    if state is None:
+        raise SteamAPIError(endpoint, "Circuito aberto: Steam indisponível ou limitando requisições.")
+    probe = state == CircuitBreaker.PROBE
+    if retries is None:
+        retries = settings.steam_max_retries
+    return probe, 1 if probe else retries + 1
+
+
+def steam_get(endpoint: str, url: str, params: dict = None, timeout: float = 10,
+              retries: Optional[int] = None) -> httpx.Response:
+    """
+    GET síncrono para a Steam com rate limit por endpoint, retry/backoff em
+    429/5xx e circuit breaker. Respostas 4xx (exceto 429) voltam para quem
+    chamou, pois costumam ser respostas válidas (perfil privado, app sem stats).
+    O breaker registra uma falha por chamada, só depois de esgotar os retries.
+    `retries` substitui settings.steam_max_retries (0 = uma tentativa só).
+    """
+    bucket, breaker = _bucket_for(endpoint), _breaker_for(endpoint)
+    probe, attempts = _admit(endpoint, breaker, retries)
+    response = None
+
+    try:
+        for attempt in range(attempts):
+            bucket.acquire()
+
+            try:
+                response = get_http_client().get(url, params=params, timeout=timeout)
+            except httpx.HTTPError as e:
+                response = None
+                error = str(e)
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    breaker.record_success()
+                    return response
+                error = f"HTTP {response.status_code}"
+
+            if attempt < attempts - 1:
+                time.sleep(_backoff_delay(attempt, response))
+    except BaseException:
+        if probe:
+            breaker.release_probe()
+        raise
+
+    breaker.record_failure()
+    raise SteamAPIError(endpoint, error, response.status_code if response is not None else None)
+
+
+async def steam_get_async(client: httpx.AsyncClient, endpoint: str, url: str,
+                          params: dict = None, timeout: float = 10,
+                          retries: Optional[int] = None) -> httpx.Response:
+    """
+    Versão assíncrona de steam_get (mesmos buckets e breakers). O estado
+    compartilhado fica no SQLite, então é lido e gravado fora do event loop.
+    """
+    bucket, breaker = _bucket_for(endpoint), _breaker_for(endpoint)
+    probe, attempts = await asyncio.to_thread(_admit, endpoint, breaker, retries)
+    response = None
+
+    try:
+        for attempt in range(attempts):
+            await bucket.acquire_async()
+
+            try:
+                response = await client.get(url, params=params, timeout=timeout)
+            except httpx.HTTPError as e:
+                response = None
+                error = str(e)
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    await asyncio.to_thread(breaker.record_success)
+                    return response
+                error = f"HTTP {response.status_code}"
+
+            if attempt < attempts - 1:
+                await asyncio.sleep(_backoff_delay(attempt, response))
+    except BaseException:
+        # Cancelada (ex.: sincronização interrompida) sem resultado; libera
+        # direto, sem esperar uma thread no meio do cancelamento
+        if probe:
+            breaker.release_probe()
+        raise
+
+    await asyncio.to_thread(breaker.record_failure)
+    raise SteamAPIError(endpoint, error, response.status_code if response is not None else None)
@@ -0,0 +1,131 @@
+# app/worker.py
+# Worker de sincronizações: processo separado do servidor web que consome a
+# fila persistente (app/models/job_model.py) com um pool de processos.
+#
+# Pode rodar sozinho:            python -m app.worker
+# ou embutido no servidor web:   settings.sync_worker_embedded = True
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .config import settings
+from .models import job_model
+from .services import job_service
+
+# "spawn" evita herdar conexões gRPC do Firebase do processo pai via fork
+_mp_context = multiprocessing.get_context("spawn")
+_embedded_process = None
+_embedded_stop = None
+
+
+def _on_job_done(job_id: str):
+    def callback(future):
+        if future.cancelled():
+            # Cancelado no desligamento antes de começar: volta para a fila
+            job_model.release_job(job_id)
+            return
+        exc = future.exception()
+        if exc is not None:
+            # Processo do pool morreu (ex.: falta de memória) antes de registrar o erro
+            print(f"[Worker] Job {job_id} interrompido: {exc}")
+            job_model.fail_job(job_id, f"Worker interrompido: {exc}")
+    return callback
+
+
+def _dispatch(pool: ProcessPoolExecutor, max_workers: int, stop_event) -> None:
+    in_flight = set()
+    last_recovery = 0.0
+
+    while not stop_event.is_set():
+        now = time.monotonic()
+        if now - last_recovery >= settings.sync_job_heartbeat_seconds:
+            requeued = job_model.requeue_stale_jobs(
+                job_service.SYNC_JOB,
+                settings.sync_job_stale_seconds,
+                settings.sync_job_max_attempts,
+            )
+            if requeued:
+                print(f"[Worker] {requeued} jobs sem heartbeat voltaram para a fila.")
+            last_recovery = now
+
+        in_flight = {f for f in in_flight if not f.done()}
+
+        while len(in_flight) < max_workers and not stop_event.is_set():
+            job = job_model.claim_next_job(job_service.SYNC_JOB)
+            if job is None:
+                break
+            print(f"[Worker] Sincronização {job['id']} para {job['user_id']}.")
+            future = pool.submit(job_service.run_sync_job, job["id"])
+            future.add_done_callback(_on_job_done(job["id"]))
+            in_flight.add(future)
+
+        stop_event.wait(settings.sync_job_poll_seconds)
+
+
+def run_dispatcher(max_workers: int = None, stop_event=None) -> None:
+    """Roda até stop_event ser sinalizado; espera os jobs em andamento antes de sair."""
+    max_workers = max_workers or settings.sync_worker_processes
+    stop_event = stop_event or threading.Event()
+    print(f"[Worker] Iniciando com {max_workers} processos.")
+
+    while not stop_event.is_set():
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=_mp_context)
+        try:
+            _dispatch(pool, max_workers, stop_event)
+        except BrokenProcessPool as e:
+            # Jobs que estavam no pool quebrado voltam pela recuperação por heartbeat
+            print(f"[Worker] Pool de processos quebrado ({e}). Recriando...")
+        finally:
+            # Jobs que ainda não começaram são cancelados e voltam para a fila (_on_job_done)
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    print("[Worker] Encerrado.")
+
+
+def _run_embedded(stop_event) -> None:
+    # Ctrl+C chega a todo o grupo de processos; quem desliga o worker embutido é o servidor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_dispatcher(stop_event=stop_event)
+
+
+# ============================================================
+# WORKER EMBUTIDO (INICIADO PELO LIFESPAN DO FASTAPI)
+# ============================================================
+def start_embedded_worker() -> None:
+    global _embedded_process, _embedded_stop
+    if _embedded_process is not None and _embedded_process.is_alive():
+        return
+    _embedded_stop = _mp_context.Event()
+    _embedded_process = _mp_context.Process(
+        target=_run_embedded, args=(_embedded_stop,), name="gametrack-sync-worker"
+    )
+    _embedded_process.start()
+
+
+def stop_embedded_worker(timeout: float = None) -> None:
+    """Pede para o worker parar e espera; só mata o processo se ele não sair a tempo."""
+    global _embedded_process, _embedded_stop
+    if _embedded_process is None:
+        return
+    timeout = settings.sync_worker_shutdown_seconds if timeout is None else timeout
+
+    _embedded_stop.set()
+    _embedded_process.join(timeout=timeout)
+    if _embedded_process.is_alive():
+        # Jobs interrompidos aqui voltam para a fila pela recuperação por heartbeat
+        print(f"[Worker] Não encerrou em {timeout}s. Forçando término.")
+        _embedded_process.terminate()
+        _embedded_process.join(timeout=5)
+
+    _embedded_process = None
+    _embedded_stop = None
+
+
+if __name__ == "__main__":
+    _stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: _stop.set())
+    signal.signal(signal.SIGINT, lambda *_: _stop.set())
+    run_dispatcher(stop_event=_stop)